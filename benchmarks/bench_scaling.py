@@ -0,0 +1,213 @@
+"""Benchmark de passage à l'échelle du matching sur une population synthétique.
+
+Pour chaque taille de population (benchmarks/population.py, graine fixe) :
+
+- tokenisation   : extract_keywords sur les intérêts et descriptions
+- paires         : calculate_compatibility sur des paires tirées au hasard
+- classement     : un profil contre toute la population (score, tri, 8 meilleurs)
+- requête SQL    : get_available_profiles, sans exclusion puis avec 100 exclus
+- /findmatch     : de bout en bout via les cogs et le client factice (loadtest.stubs)
+
+    python benchmarks/bench_scaling.py                       # 1k, 10k, 100k
+    python benchmarks/bench_scaling.py --sizes 1000,5000 --seed 7
+
+Résultats JSON dans benchmarks/results/scaling_<date>.json.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Volume de travail par mesure, indépendant de la taille (sauf classement)
+TOKENIZE_TEXTS = 10000
+SCORED_PAIRS = 20000
+RANKING_QUERIES = 3
+SQL_QUERIES = 20
+SQL_EXCLUDED = 100
+FINDMATCH_USERS = 10
+
+def timed_runs(func: Callable[[], None], runs: int) -> List[float]:
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started)
+    return durations
+
+def describe(durations: List[float]) -> Dict:
+    """Médiane, p95 et max en ms"""
+    ordered = sorted(durations)
+    return {
+        "runs": len(ordered),
+        "median_ms": round(statistics.median(ordered) * 1000, 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+def bench_compute(cog, rows: List, rng: random.Random) -> Dict:
+    """Mesures CPU pures sur les lignes en mémoire"""
+    results = {}
+
+    texts = []
+    for row in rows[:TOKENIZE_TEXTS // 2]:
+        texts.append(cog.normalize_interests(row[4] or ""))
+        texts.append(row[6] or "")
+    started = time.perf_counter()
+    for text in texts:
+        cog.extract_keywords(text)
+    elapsed = time.perf_counter() - started
+    results["tokenize"] = {"calls": len(texts), "per_call_us": round(elapsed / len(texts) * 1e6, 2)}
+
+    pairs = [(rng.choice(rows), rng.choice(rows)) for _ in range(SCORED_PAIRS)]
+    started = time.perf_counter()
+    for left, right in pairs:
+        cog.calculate_compatibility(left, right)
+    elapsed = time.perf_counter() - started
+    results["pair_scoring"] = {"pairs": len(pairs), "per_pair_us": round(elapsed / len(pairs) * 1e6, 2)}
+
+    def rank():
+        user = rng.choice(rows)
+        matches = []
+        for profile in rows:
+            if profile[0] == user[0]:
+                continue
+            compatibility = cog.calculate_compatibility(user, profile)
+            if compatibility >= 10:
+                matches.append((profile, compatibility))
+        matches.sort(key=lambda x: x[1], reverse=True)
+        return matches[:8]
+
+    durations = timed_runs(rank, RANKING_QUERIES)
+    results["one_vs_all"] = {**describe(durations), "profiles": len(rows)}
+    return results
+
+async def bench_database(cog, user_ids: List[str], rng: random.Random) -> Dict:
+    """Requête des candidats puis /findmatch complet, sur la base peuplée"""
+    from cogs.match import Match
+    from loadtest.stubs import StubShardedBot, StubInteraction
+
+    results = {}
+    for excluded_count in (0, SQL_EXCLUDED):
+        durations = []
+        for _ in range(SQL_QUERIES):
+            user_id = rng.choice(user_ids)
+            excluded = rng.sample(user_ids, min(excluded_count, len(user_ids)))
+            started = time.perf_counter()
+            await Match.get_available_profiles(cog, user_id, excluded)
+            durations.append(time.perf_counter() - started)
+        results[f"candidate_sql_excluded_{excluded_count}"] = describe(durations)
+
+    bot = StubShardedBot()
+    async with bot:
+        await bot.load_extension("cogs.match")
+        match = bot.get_cog("Match")
+        durations = []
+        sent = 0
+        for user_id in rng.sample(user_ids, min(FINDMATCH_USERS, len(user_ids))):
+            user = bot.add_user(int(user_id), f"bench{user_id}")
+            interaction = StubInteraction(bot, user)
+            started = time.perf_counter()
+            await match.findmatch.callback(match, interaction)
+            durations.append(time.perf_counter() - started)
+            sent += len(user.dm_channel.messages)
+        await bot.unload_extension("cogs.match")
+    results["findmatch_e2e"] = {**describe(durations), "carousels_sent": sent}
+    return results
+
+async def bench_size(size: int, seed: int) -> Dict:
+    from benchmarks.population import populate_database
+    from cogs.match import Match
+    from cogs.utils import db_instance
+
+    db_path = os.path.join("data", f"population_{size}.db")
+    started = time.perf_counter()
+    await populate_database(db_path, size, seed)
+    populate_s = time.perf_counter() - started
+
+    # Lignes sqlite3.Row, comme celles que reçoivent les cogs via aiosqlite
+    connection = sqlite3.connect(db_path)
+    connection.row_factory = sqlite3.Row
+    rows = connection.execute("SELECT * FROM profiles").fetchall()
+    connection.close()
+
+    rng = random.Random(seed)
+    cog = Match.__new__(Match)  # méthodes de calcul seules, sans tâches de fond
+    result = {"profiles": len(rows), "populate_s": round(populate_s, 3)}
+    result.update(bench_compute(cog, rows, rng))
+
+    db_instance.db_path = db_path
+    await db_instance.connect()
+    try:
+        result.update(await bench_database(cog, [row[0] for row in rows], rng))
+    finally:
+        await db_instance.disconnect()
+    return result
+
+def print_size(size: int, result: Dict):
+    print(f"── {size} profils (peuplement {result['populate_s']:.1f}s)")
+    print(f"   tokenisation      {result['tokenize']['per_call_us']:>10.1f} µs/appel")
+    print(f"   paire             {result['pair_scoring']['per_pair_us']:>10.1f} µs/paire")
+    print(f"   un contre tous    {result['one_vs_all']['median_ms']:>10.1f} ms")
+    for key in ("candidate_sql_excluded_0", f"candidate_sql_excluded_{SQL_EXCLUDED}"):
+        label = f"SQL ({key.rsplit('_', 1)[-1]} exclus)"
+        print(f"   {label:<18}{result[key]['median_ms']:>10.2f} ms (p95 {result[key]['p95_ms']:.2f})")
+    e2e = result["findmatch_e2e"]
+    print(f"   /findmatch        {e2e['median_ms']:>10.1f} ms (p95 {e2e['p95_ms']:.1f}, "
+          f"{e2e['carousels_sent']} carrousels)")
+
+async def run_sizes(sizes: List[int], seed: int) -> Dict:
+    """Toutes les tailles dans la même boucle : les singletons des cogs y restent attachés"""
+    results = {}
+    for size in sizes:
+        results[str(size)] = await bench_size(size, seed)
+        print_size(size, results[str(size)])
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Passage à l'échelle du matching")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Tailles de population, séparées par des virgules")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Fichier JSON (défaut : benchmarks/results/scaling_<date>.json)")
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+
+    # Bases, logs et traces dans un dossier jetable ; seuls les avertissements sont affichés
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    output = os.path.abspath(args.output) if args.output else \
+        os.path.join(RESULTS_DIR, f"scaling_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    workdir = tempfile.TemporaryDirectory()
+    os.chdir(workdir.name)
+
+    try:
+        results = asyncio.run(run_sizes(sizes, args.seed))
+    finally:
+        os.chdir(ROOT)
+        workdir.cleanup()
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "benchmark": "scaling",
+            "timestamp": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "seed": args.seed,
+            "sizes": results,
+        }, f, indent=2)
+    print(f"Résultats : {output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
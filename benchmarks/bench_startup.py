@@ -0,0 +1,163 @@
+"""Benchmark de démarrage à froid du bot (sans connexion à Discord).
+
+Chaque mesure lance un interpréteur neuf dans un dossier temporaire contenant une
+copie de la base, exécute le pipeline de démarrage (cogs/startup.py) jusqu'au point
+où la connexion à la passerelle commencerait, puis attend la fin du préchauffage.
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --save-baseline
+    python benchmarks/bench_startup.py --tolerance 0.25   # code 1 si régression
+"""
+import argparse
+import ast
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "startup_baseline.json")
+RESULT_MARKER = "BENCH_RESULT "
+
+CHILD = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import discord
+from discord.ext import commands
+from cogs.startup import prepare
+from cogs.utils import db_instance
+
+COGS = json.loads(sys.argv[1])
+
+async def main():
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.default())
+    async def load_cogs():
+        for cog in COGS:
+            await bot.load_extension(cog)
+    async with bot:
+        pipeline = await prepare(COGS, load_cogs)
+        await pipeline.wait_background()
+        for cog in list(bot.extensions):
+            await bot.unload_extension(cog)
+    await db_instance.disconnect()
+    return pipeline
+
+pipeline = asyncio.run(main())
+print(RESULT_MARKER + json.dumps({
+    "ready": pipeline.ready_at,
+    "process_ready": time.perf_counter() - started,
+    "phases": pipeline.timings,
+    "errors": {name: repr(error) for name, error in pipeline.errors.items()},
+}))
+""".replace("RESULT_MARKER", repr(RESULT_MARKER))
+
+def read_cogs() -> list:
+    """Liste COGS de bot.py, lue sans l'importer (bot.py exige un token)"""
+    with open(os.path.join(ROOT, "bot.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, "id", None) == "COGS" for t in node.targets):
+            return ast.literal_eval(node.value)
+    raise RuntimeError("COGS introuvable dans bot.py")
+
+def run_once(cogs: list, db_path: str) -> dict:
+    """Un démarrage à froid dans un interpréteur et un dossier neufs"""
+    with tempfile.TemporaryDirectory() as workdir:
+        os.makedirs(os.path.join(workdir, "data"))
+        os.makedirs(os.path.join(workdir, "logs"))
+        if db_path:
+            shutil.copy(db_path, os.path.join(workdir, "data", "matching_bot.db"))
+
+        env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE="1")
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-c", CHILD, json.dumps(cogs)],
+            cwd=workdir, env=env, capture_output=True, text=True, timeout=300
+        )
+        wall = time.perf_counter() - started
+
+    if completed.returncode != 0:
+        raise RuntimeError(f"Échec du démarrage:\n{completed.stderr[-2000:]}")
+
+    line = next(l for l in completed.stdout.splitlines() if l.startswith(RESULT_MARKER))
+    result = json.loads(line[len(RESULT_MARKER):])
+    result["wall"] = wall
+    return result
+
+def summarize(runs: list) -> dict:
+    phases = sorted({name for run in runs for name in run["phases"]})
+    return {
+        "ready_median": statistics.median(run["ready"] for run in runs),
+        "process_ready_median": statistics.median(run["process_ready"] for run in runs),
+        "wall_median": statistics.median(run["wall"] for run in runs),
+        "phases_median": {
+            name: statistics.median(run["phases"][name] for run in runs if name in run["phases"])
+            for name in phases
+        },
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de démarrage à froid")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--db", default=os.path.join(ROOT, "data", "matching_bot.db"),
+                        help="Base copiée pour chaque mesure ('' : base vide)")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Régression tolérée sur la médiane (0.25 = +25 %%)")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    cogs = read_cogs()
+    db_path = args.db if args.db and os.path.exists(args.db) else ""
+
+    runs = []
+    for i in range(args.runs):
+        run = run_once(cogs, db_path)
+        runs.append(run)
+        print(f"#{i + 1}: prêt {run['ready']:.3f}s · processus {run['process_ready']:.3f}s · total {run['wall']:.3f}s")
+        for name, error in run["errors"].items():
+            print(f"   ❌ {name}: {error}")
+
+    summary = summarize(runs)
+    print(f"Médiane : prêt {summary['ready_median']:.3f}s · processus {summary['process_ready_median']:.3f}s")
+    for name, seconds in summary["phases_median"].items():
+        print(f"   - {name}: {seconds:.3f}s")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    result = {
+        "benchmark": "startup",
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "runs": runs,
+        "summary": summary,
+    }
+    path = os.path.join(RESULTS_DIR, f"startup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"Résultats : {path}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"Référence enregistrée : {BASELINE_PATH}")
+        return 0
+
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, encoding="utf-8") as f:
+            baseline = json.load(f)["summary"]["process_ready_median"]
+        current = summary["process_ready_median"]
+        limit = baseline * (1 + args.tolerance)
+        if current > limit:
+            print(f"❌ Régression : {current:.3f}s > {limit:.3f}s (référence {baseline:.3f}s)")
+            return 1
+        print(f"✅ Pas de régression : {current:.3f}s ≤ {limit:.3f}s (référence {baseline:.3f}s)")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
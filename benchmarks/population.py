@@ -0,0 +1,173 @@
+"""Population synthétique reproductible de profils pour les benchmarks.
+
+Vocabulaire d'intérêts français par thème, avec variantes (synonymes, majuscules,
+accents omis) pour exercer la normalisation et le bonus de synonymes du matching ;
+âges 13–30 concentrés sur 15–22 ans ; descriptions vides, courtes ou longues.
+Les lignes suivent la disposition de la table profiles lue par position dans les cogs.
+
+    python benchmarks/population.py --size 10000 --db /tmp/population.db
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Thème -> (intérêt canonique, variantes employées par une partie des utilisateurs)
+INTEREST_THEMES = {
+    "musique": [("musique", ["son", "chanson", "concert", "Musique"]), ("rap", ["hip-hop"]),
+                ("guitare", ["Guitare"]), ("piano", []), ("k-pop", ["kpop"]), ("chant", ["chanter"])],
+    "jeux": [("jeux vidéo", ["gaming", "jeux video", "Jeux vidéo", "game"]), ("jeux de société", ["jeux de plateau"]),
+             ("minecraft", ["Minecraft"]), ("e-sport", ["esport"])],
+    "lecture": [("lecture", ["livre", "lire", "littérature"]), ("manga", ["mangas", "Manga"]),
+                ("bande dessinée", ["bd", "BD"]), ("écriture", ["ecriture", "écrire"])],
+    "écrans": [("cinéma", ["film", "films", "cinema"]), ("séries", ["série", "netflix"]), ("anime", ["animés", "animes"])],
+    "sport": [("sport", ["fitness", "gym", "musculation", "exercice"]), ("football", ["foot"]),
+              ("basket", ["basketball"]), ("natation", ["piscine"]), ("danse", ["chorégraphie", "ballet"]),
+              ("skate", ["skateboard"]), ("escalade", [])],
+    "art": [("dessin", ["art", "peinture", "créatif"]), ("photographie", ["photo", "image"]),
+            ("théâtre", ["theatre", "impro"]), ("couture", [])],
+    "nature": [("randonnée", ["nature", "environnement", "écologie", "rando"]), ("animaux", ["chats", "chiens"]),
+               ("voyage", ["vacances", "tourisme", "aventure"])],
+    "tech": [("programmation", ["code", "informatique", "technologie", "tech"]), ("robotique", []),
+             ("astronomie", ["espace"])],
+    "cuisine": [("cuisine", ["cuisinier", "gastronomie", "cooking", "pâtisserie"])],
+}
+
+# Popularité relative des thèmes (les jeux et la musique dominent)
+THEME_WEIGHTS = {"musique": 20, "jeux": 22, "lecture": 10, "écrans": 16, "sport": 12,
+                 "art": 8, "nature": 6, "tech": 4, "cuisine": 2}
+
+# Âges 13–30 : pic à 15–22 ans
+AGE_WEIGHTS = {age: weight for age, weight in zip(
+    range(13, 31), [4, 7, 10, 11, 11, 10, 9, 8, 7, 6, 4, 3, 3, 2, 2, 1, 1, 1]
+)}
+
+PRENOMS = ["Camille", "Léa", "Hugo", "Inès", "Lucas", "Chloé", "Nathan", "Manon", "Théo", "Jade",
+           "Louis", "Emma", "Noé", "Zoé", "Jules", "Lina", "Enzo", "Sarah", "Tom", "Élise",
+           "Adam", "Louise", "Gabriel", "Alice", "Raphaël", "Rose", "Sacha", "Anna", "Maël", "Lou"]
+PRONOMS = ["il", "elle", "iel", "il/iel", "elle/iel"]
+PRONOM_WEIGHTS = [42, 42, 8, 4, 4]
+
+# Fragments de description : {interet} est remplacé par un intérêt du profil
+SENTENCES = [
+    "Ma grande passion : {interet}.",
+    "Fan de {interet} depuis toujours !",
+    "Plutôt calme, j'aime les soirées tranquilles entre amis.",
+    "Toujours partant pour discuter de {interet} pendant des heures.",
+    "Je cherche des gens sympas avec qui parler de {interet}.",
+    "Au lycée la semaine, {interet} le week-end.",
+    "Étudiant(e), un peu timide au début mais très bavard(e) ensuite.",
+    "J'adore découvrir de nouvelles choses, surtout côté {interet}.",
+    "Mon rêve : voyager partout dans le monde.",
+    "Ajoutez-moi si vous aimez aussi {interet} !",
+    "Je fais de la musique dans ma chambre et j'écoute de tout.",
+    "Grosse passion pour les animaux et la nature.",
+]
+
+# Upsert plutôt que REPLACE : repeupler une base existante ne fausse pas les compteurs globaux
+PROFILE_COLUMNS = ("user_id", "prenom", "pronoms", "age", "interets", "interets_canonical",
+                   "description", "avatar_url", "created_at", "updated_at")
+INSERT_PROFILE = f"""
+    INSERT INTO profiles ({", ".join(PROFILE_COLUMNS)})
+    VALUES ({", ".join("?" * len(PROFILE_COLUMNS))})
+    ON CONFLICT(user_id) DO UPDATE SET {", ".join(f"{c} = excluded.{c}" for c in PROFILE_COLUMNS[1:])}
+"""
+
+def pick_interests(rng: random.Random, synonym_rate: float) -> List[str]:
+    """3 à 12 intérêts, thèmes pondérés ; une partie écrite sous forme de variante"""
+    count = min(12, max(3, int(rng.gauss(6, 2.5))))
+    themes = list(THEME_WEIGHTS)
+    weights = list(THEME_WEIGHTS.values())
+    interests = []
+    seen = set()
+    for _ in range(count * 3):
+        if len(interests) >= count:
+            break
+        canonical, variants = rng.choice(INTEREST_THEMES[rng.choices(themes, weights)[0]])
+        if canonical in seen:
+            continue
+        seen.add(canonical)
+        interests.append(rng.choice(variants) if variants and rng.random() < synonym_rate else canonical)
+    return interests
+
+def make_description(rng: random.Random, interests: List[str]) -> str:
+    """Vide (25 %), courte (1–2 phrases, 50 %) ou longue (jusqu'à ~1000 caractères, 25 %)"""
+    roll = rng.random()
+    if roll < 0.25:
+        return ""
+    sentences = rng.randint(1, 2) if roll < 0.75 else rng.randint(4, 12)
+    text = " ".join(
+        rng.choice(SENTENCES).format(interet=rng.choice(interests).lower()) for _ in range(sentences)
+    )
+    return text[:1000]
+
+def generate_profiles(size: int, seed: int = 42, synonym_rate: float = 0.3) -> Iterator[Tuple]:
+    """Lignes (user_id, prenom, pronoms, age, interets, interets_canonical, description,
+    avatar_url, created_at, updated_at), identiques pour une même graine"""
+    from cogs.utils import serialize_interests
+
+    rng = random.Random(seed)
+    ages = list(AGE_WEIGHTS)
+    age_weights = list(AGE_WEIGHTS.values())
+    start = datetime(2025, 1, 1)
+    for index in range(size):
+        interests = pick_interests(rng, synonym_rate)
+        created = start + timedelta(minutes=index * 7 + rng.randint(0, 6))
+        yield (
+            str(100_000_000_000_000_000 + index),
+            rng.choice(PRENOMS),
+            rng.choices(PRONOMS, PRONOM_WEIGHTS)[0],
+            rng.choices(ages, age_weights)[0],
+            serialize_interests(interests),
+            None,
+            make_description(rng, interests),
+            None,
+            created.strftime("%Y-%m-%d %H:%M:%S"),
+            created.strftime("%Y-%m-%d %H:%M:%S"),
+        )
+
+async def populate_database(db_path: str, size: int, seed: int = 42, synonym_rate: float = 0.3):
+    """Base au schéma réel (DatabaseManager.create_tables) remplie avec la population"""
+    from cogs.utils import DatabaseManager
+
+    manager = DatabaseManager(db_path)
+    if not await manager.connect():
+        raise RuntimeError(f"Connexion impossible à {db_path}")
+    try:
+        batch = []
+        for row in generate_profiles(size, seed, synonym_rate):
+            batch.append(row)
+            if len(batch) >= 5000:
+                await manager.connection.executemany(INSERT_PROFILE, batch)
+                batch.clear()
+        if batch:
+            await manager.connection.executemany(INSERT_PROFILE, batch)
+        await manager.connection.commit()
+    finally:
+        await manager.disconnect()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Population synthétique de profils")
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--synonym-rate", type=float, default=0.3, help="Part des intérêts écrits en variante")
+    parser.add_argument("--db", help="Écrire la population dans cette base SQLite")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        asyncio.run(populate_database(args.db, args.size, args.seed, args.synonym_rate))
+        print(f"✅ {args.size} profils écrits dans {args.db}")
+    else:
+        for row in generate_profiles(min(args.size, 20), args.seed, args.synonym_rate):
+            print(row[:5], repr(row[6][:80]))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,9 @@
 import discord
 from discord.ext import commands
 import os
+import time
 import asyncio
+import logging
 from dotenv import load_dotenv
 
 # ──────────────── CHARGEMENT DES VARIABLES D'ENVIRONNEMENT ────────────────
@@ -14,11 +16,35 @@ if not TOKEN:
 # ──────────────── CONFIGURATION DU BOT ────────────────
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+# commands.Bot, ou AutoShardedBot si BOT_SHARDED=true (voir cogs/sharding.py)
+from cogs.sharding import create_bot
+# Arbre de commandes chronométré (latences de /perf) ; cogs/metrics.py, qui instrumente
+# aussi discord.py, n'est importé que si METRICS_ENABLED=true
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+if METRICS_ENABLED:
+    from cogs.metrics import InstrumentedCommandTree as CommandTree
+else:
+    from cogs.stats_registry import TimedCommandTree as CommandTree
+bot = create_bot(command_prefix="!", intents=intents, tree_cls=CommandTree)
+
+# Journal du bot (file + fichier tournant configurés dans cogs/utils.py)
+log = logging.getLogger("bot")
 
 # Variable pour éviter les synchronisations multiples
 bot.synced = False
 
+# Pipeline de démarrage chronométré (cogs/startup.py), créé dans main()
+bot.startup = None
+
+async def sync_command_tree(force: bool = False) -> str:
+    """Synchroniser les commandes slash si leur définition a changé, résumé lisible"""
+    from cogs.command_sync import sync_commands
+    results = await sync_commands(bot, force=force)
+    return ", ".join(
+        f"{r['count']} commandes {'re-synchronisées' if r['synced'] else 'inchangées (sync ignorée)'}"
+        for r in results
+    )
+
 # ──────────────── LISTE DES COGS À CHARGER ────────────────
 COGS = [
     'cogs.setup',    # Configuration de base
@@ -30,8 +56,12 @@ COGS = [
 # ──────────────── ÉVÉNEMENTS ────────────────
 @bot.event
 async def on_ready():
+    if bot.startup and "connexion" not in bot.startup.timings:
+        bot.startup.record("connexion", time.perf_counter() - bot.connect_started)
     print(f"✅ Bot connecté : {bot.user} (ID: {bot.user.id})")
     print(f"✅ Connecté à {len(bot.guilds)} serveur(s)")
+    if isinstance(bot, commands.AutoShardedBot):
+        print(f"🛰️ Mode shardé : shards {sorted(bot.shards)} sur {bot.shard_count}")
 
     # Initialiser la base de données
     try:
@@ -46,22 +76,26 @@ async def on_ready():
     loaded_cogs = list(bot.extensions.keys())
     print(f"📦 Cogs chargés ({len(loaded_cogs)}) : {loaded_cogs}")
 
-    # Synchroniser les commandes slash UNE SEULE FOIS quand le bot est prêt
+    # Synchroniser les commandes slash UNE SEULE FOIS, et seulement si elles ont changé
     if not bot.synced:
         try:
-            print("🔄 Synchronisation des commandes slash...")
-            synced = await bot.tree.sync()
+            print("🔄 Vérification des commandes slash...")
+            started = time.perf_counter()
+            summary = await sync_command_tree()
+            if bot.startup:
+                bot.startup.record("commandes", time.perf_counter() - started)
             bot.synced = True
-            print(f"✅ {len(synced)} commandes slash synchronisées")
+            print(f"✅ {summary}")
 
             print("📋 Commandes slash disponibles :")
-            for cmd in synced:
+            for cmd in bot.tree.get_commands():
                 print(f" - {cmd.name}")
 
         except Exception as e:
-            print(f"❌ Erreur lors de la synchronisation des commandes: {type(e).__name__}: {e}")
-            import traceback
-            print(f"   Traceback: {traceback.format_exc()}")
+            log.exception(f"❌ Erreur lors de la synchronisation des commandes: {type(e).__name__}: {e}")
+
+        if bot.startup:
+            print(bot.startup.report())
 
     # Changer le statut du bot
     try:
@@ -71,18 +105,17 @@ async def on_ready():
         )
         await bot.change_presence(activity=activity)
     except Exception as e:
-        print(f"⚠️ Erreur changement de statut: {e}")
+        log.error(f"⚠️ Erreur changement de statut: {e}")
 
 # ──────────────── GESTION D'ERREURS AMÉLIORÉE ────────────────
 @bot.event
 async def on_application_command_error(interaction, error):
     """Gestion des erreurs pour les commandes slash"""
-    print(f"❌ Erreur commande slash {interaction.command.name if interaction.command else 'Unknown'}: {error}")
-    print(f"   Type d'erreur: {type(error).__name__}")
-
-    # Log plus détaillé pour le debug
-    import traceback
-    print(f"   Traceback: {traceback.format_exc()}")
+    log.error(
+        f"❌ Erreur commande slash {interaction.command.name if interaction.command else 'Unknown'}: "
+        f"{type(error).__name__}: {error}",
+        exc_info=error
+    )
 
     # Message d'erreur pour l'utilisateur
     embed = discord.Embed(
@@ -97,57 +130,51 @@ async def on_application_command_error(interaction, error):
         else:
             await interaction.response.send_message(embed=embed, ephemeral=True)
     except Exception as e:
-        print(f"❌ Impossible d'envoyer le message d'erreur: {e}")
+        log.error(f"❌ Impossible d'envoyer le message d'erreur: {e}")
 
 # ──────────────── FONCTIONS DE CHARGEMENT / RELOAD AMÉLIORÉES ────────────────
 async def load_cog_safe(cog: str):
     """Charge ou recharge un cog en sécurité avec diagnostics détaillés."""
-    print(f"🔄 Tentative de chargement: {cog}")
+    log.info(f"🔄 Tentative de chargement: {cog}")
 
     try:
         # Vérifier si le fichier existe
         cog_path = cog.replace('.', '/') + '.py'
         if not os.path.exists(cog_path):
-            print(f"❌ Fichier {cog_path} non trouvé")
+            log.error(f"❌ Fichier {cog_path} non trouvé")
             return False
 
         # Recharger si déjà chargé, sinon charger
         if cog in bot.extensions:
             await bot.reload_extension(cog)
-            print(f"♻️ Cog rechargé : {cog}")
+            log.info(f"♻️ Cog rechargé : {cog}")
         else:
             await bot.load_extension(cog)
-            print(f"✅ Cog chargé : {cog}")
+            log.info(f"✅ Cog chargé : {cog}")
 
         return True
 
     except commands.ExtensionNotFound:
-        print(f"❌ Cog `{cog}` non trouvé (ExtensionNotFound)")
-        print(f"   Vérifiez que le fichier {cog_path} existe")
+        log.error(f"❌ Cog `{cog}` non trouvé (ExtensionNotFound) — vérifiez que le fichier {cog_path} existe")
 
     except commands.NoEntryPointError:
-        print(f"❌ Cog `{cog}` ne contient pas de fonction setup()")
-        print(f"   Ajoutez à la fin du fichier:")
-        print(f"   async def setup(bot):")
-        print(f"       await bot.add_cog(VotreClasse(bot))")
+        log.error(
+            f"❌ Cog `{cog}` ne contient pas de fonction setup(). Ajoutez à la fin du fichier:\n"
+            f"   async def setup(bot):\n"
+            f"       await bot.add_cog(VotreClasse(bot))"
+        )
 
     except commands.ExtensionFailed as e:
-        print(f"❌ Échec du chargement de {cog} (ExtensionFailed): {e}")
-        print(f"   Erreur dans le code du cog:")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"❌ Échec du chargement de {cog} (ExtensionFailed): {e}")
 
     except Exception as e:
-        print(f"❌ Erreur inattendue lors du chargement de {cog}: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception(f"❌ Erreur inattendue lors du chargement de {cog}: {type(e).__name__}: {e}")
 
     return False
 
 async def load_cogs():
     """Charge tous les cogs de manière sécurisée avec compteurs."""
-    print("🔧 Chargement des cogs...")
-    print(f"📋 Cogs à charger: {COGS}")
+    log.info(f"🔧 Chargement des cogs: {COGS}")
 
     success_count = 0
     total_count = len(COGS)
@@ -157,21 +184,19 @@ async def load_cogs():
         if success:
             success_count += 1
 
-    print(f"📊 Résultat: {success_count}/{total_count} cogs chargés avec succès")
+    log.info(f"📊 Résultat: {success_count}/{total_count} cogs chargés avec succès")
 
     if success_count == 0:
-        print("🚨 ATTENTION: Aucun cog n'a été chargé !")
-        print("   Le bot sera fonctionnel mais sans commandes personnalisées")
+        log.error("🚨 ATTENTION: Aucun cog n'a été chargé ! Le bot sera fonctionnel mais sans commandes personnalisées")
     elif success_count < total_count:
-        print("⚠️  Certains cogs n'ont pas pu être chargés")
-        print("   Le bot fonctionnera partiellement")
+        log.warning("⚠️  Certains cogs n'ont pas pu être chargés, le bot fonctionnera partiellement")
     else:
-        print("🎉 Tous les cogs ont été chargés avec succès !")
+        log.info("🎉 Tous les cogs ont été chargés avec succès !")
 
 # ──────────────── COMMANDE ADMIN POUR RELOAD À CHAUD ────────────────
 @bot.tree.command(name="reload", description="Recharge un cog sans redémarrer le bot")
 @discord.app_commands.checks.has_permissions(administrator=True)
-async def reload(interaction: discord.Interaction, cog_name: str = None):
+async def reload(interaction: discord.Interaction, cog_name: str = None, force_sync: bool = False):
     await interaction.response.defer(ephemeral=True)
 
     if cog_name:
@@ -183,10 +208,10 @@ async def reload(interaction: discord.Interaction, cog_name: str = None):
             success = await load_cog_safe(cog_name)
             if success:
                 try:
-                    synced = await bot.tree.sync()
+                    summary = await sync_command_tree(force=force_sync)
                     await interaction.followup.send(
                         f"♻️ **Cog `{cog_name}` rechargé avec succès !**\n"
-                        f"🔄 {len(synced)} commandes re-synchronisées"
+                        f"🔄 {summary}"
                     )
                 except Exception as e:
                     await interaction.followup.send(
@@ -204,12 +229,12 @@ async def reload(interaction: discord.Interaction, cog_name: str = None):
         # Recharger tous les cogs
         await load_cogs()
         try:
-            synced = await bot.tree.sync()
+            summary = await sync_command_tree(force=force_sync)
             loaded_count = len(bot.extensions)
             await interaction.followup.send(
                 f"♻️ **Tous les cogs ont été rechargés !**\n"
                 f"📦 {loaded_count} cogs chargés\n"
-                f"🔄 {len(synced)} commandes re-synchronisées"
+                f"🔄 {summary}"
             )
         except Exception as e:
             await interaction.followup.send(f"♻️ Cogs rechargés, mais erreur de sync: {e}")
@@ -219,19 +244,26 @@ async def main():
     """Fonction principale avec diagnostic et gestion d'erreurs complète"""
     try:
         # Initialiser la base de données AVANT de charger les cogs
-        try:
-            from cogs.utils import init_database
-            print("🔄 Initialisation de la base de données...")
-            await init_database()
-        except Exception as e:
-            print(f"❌ Erreur initialisation DB: {e}")
+        from cogs.startup import prepare
 
-        # Charger les cogs AVANT de démarrer le bot
+        # Base de données et imports des cogs en parallèle, puis chargement des cogs
+        # AVANT de démarrer le bot ; le préchauffage des caches continue pendant la connexion
         async with bot:
-            await load_cogs()
+            if METRICS_ENABLED:
+                from cogs.metrics import start_metrics_server
+                bot.metrics_server = await start_metrics_server(bot)
+
+            print("🔄 Initialisation de la base de données et des cogs...")
+            bot.startup = await prepare(COGS, load_cogs)
+            # Retard de la boucle et capture des appels bloquants (cogs/loop_monitor.py)
+            from cogs.loop_monitor import loop_monitor
+            loop_monitor.start()
+            for phase, error in bot.startup.errors.items():
+                print(f"❌ Erreur phase {phase}: {error}")
 
             print("🚀 Démarrage du bot...")
             print("   (Les commandes seront synchronisées automatiquement dans on_ready)")
+            bot.connect_started = time.perf_counter()
             await bot.start(TOKEN)
 
     except discord.LoginFailure:
@@ -252,10 +284,7 @@ async def main():
         print("\n⚠️ Arrêt du bot par l'utilisateur (Ctrl+C)")
 
     except Exception as e:
-        print(f"❌ ERREUR CRITIQUE INATTENDUE: {e}")
-        print(f"   Type: {type(e).__name__}")
-        import traceback
-        print(f"   Traceback complet: {traceback.format_exc()}")
+        log.exception(f"❌ ERREUR CRITIQUE INATTENDUE: {type(e).__name__}: {e}")
 
     finally:
         try:
@@ -263,7 +292,7 @@ async def main():
                 await bot.close()
                 print("✅ Bot fermé proprement")
         except Exception as e:
-            print(f"⚠️ Erreur lors de la fermeture: {e}")
+            log.error(f"⚠️ Erreur lors de la fermeture: {e}")
 
 # ──────────────── DÉMARRAGE DU BOT ────────────────
 if __name__ == "__main__":
@@ -274,9 +303,7 @@ if __name__ == "__main__":
     try:
         asyncio.run(main())
     except Exception as e:
-        print(f"❌ ERREUR FATALE AU DÉMARRAGE: {e}")
-        import traceback
-        print(f"   Traceback: {traceback.format_exc()}")
+        log.exception(f"❌ ERREUR FATALE AU DÉMARRAGE: {e}")
         print("\n🆘 Si le problème persiste:")
         print("   1. Vérifiez votre fichier .env")
         print("   2. Vérifiez que tous les fichiers cogs existent")
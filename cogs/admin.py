@@ -1,16 +1,40 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from .utils import db_instance
+from .utils import db_instance, logger
+from .resolver import dm_cache, user_resolver
+from .outbound import outbound_queue
+from .digest import notification_digest
+from .sharding import is_primary_shard, shard_latencies
+from .query_profiler import query_profiler, SQL_SLOW_MS
+from .loop_monitor import loop_monitor
+from .stats_registry import stats_registry, view_stats
+from .profiler import profiler, PROFILE_MAX_SECONDS
+from .memory import memory_inspector
+from . import maintenance
+from .maintenance import HISTORY_RETENTION_DAYS, BACKUP_DIR
+import asyncio
 import json
+import math
 import os
+import time
 from datetime import datetime
+from typing import Optional
 
 class Admin(commands.Cog):
     """Cog pour les commandes d'administration du bot"""
 
     def __init__(self, bot):
         self.bot = bot
+        self.history_job: Optional[asyncio.Task] = None
+        self.profile_task: Optional[asyncio.Task] = None
+        stats_registry.register("views", lambda: view_stats(bot))
+
+    def cog_unload(self):
+        """Annuler la purge d'historique et la session de profilage en cours"""
+        for task in (self.history_job, self.profile_task):
+            if task and not task.done():
+                task.cancel()
 
     async def is_admin(self, interaction: discord.Interaction) -> bool:
         """Vérifier si l'utilisateur est administrateur"""
@@ -24,9 +48,9 @@ class Admin(commands.Cog):
 
         return False
 
-    @app_commands.command(name="export_profiles", description="[ADMIN] Exporter tous les profils en JSON")
+    @app_commands.command(name="export_profiles", description="[ADMIN] Exporter tous les profils (JSON Lines compressé)")
     async def export_profiles(self, interaction: discord.Interaction):
-        """Exporter tous les profils dans un fichier JSON de sauvegarde"""
+        """Exporter tous les profils dans un fichier de sauvegarde .jsonl.gz"""
 
         # Vérification STRICTE des permissions d'administration
         if not await self.is_admin(interaction):
@@ -36,65 +60,93 @@ class Admin(commands.Cog):
             )
             return
 
+        await interaction.response.defer(ephemeral=True)
+
+        last_update = 0.0
+
+        async def report_progress(table: str, done: int, total: int, written: int):
+            nonlocal last_update
+            if time.monotonic() - last_update < 2:
+                return
+            last_update = time.monotonic()
+            await interaction.edit_original_response(
+                content=f"💾 Export en cours... {written}/{total} profils ({written * 100 // max(total, 1)}%)"
+            )
+
         try:
-            # Récupérer tous les profils
-            async with db_instance.connection.execute("SELECT * FROM profiles") as cursor:
-                profiles = await cursor.fetchall()
+            result = await maintenance.export_profiles(progress=report_progress)
 
-            if not profiles:
-                await interaction.response.send_message(
-                    "📭 Aucun profil à exporter.",
-                    ephemeral=True
-                )
+            if result['count'] == 0:
+                os.remove(result['path'])
+                await interaction.edit_original_response(content="📭 Aucun profil à exporter.")
                 return
 
-            # Convertir en format JSON exportable
-            profiles_data = []
-            for profile in profiles:
-                profile_dict = {
-                    'user_id': profile[0],
-                    'prenom': profile[1],
-                    'pronoms': profile[2],
-                    'age': profile[3],
-                    'interets': profile[4],  # Déjà en JSON
-                    'description': profile[5],
-                    'avatar_url': profile[6],
-                    'vector': profile[7]  # Déjà en JSON
-                }
-                profiles_data.append(profile_dict)
-
-            # Créer le fichier de sauvegarde
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"profiles_backup_{timestamp}.json"
-            filepath = f"data/backups/{filename}"
-
-            # S'assurer que le dossier existe
-            os.makedirs("data/backups", exist_ok=True)
-
-            # Écrire le fichier
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'export_date': datetime.now().isoformat(),
-                    'total_profiles': len(profiles_data),
-                    'profiles': profiles_data
-                }, f, indent=2, ensure_ascii=False)
+            filename = os.path.basename(result['path'])
 
             # Confirmation
-            await interaction.response.send_message(
-                f"✅ **Export terminé !**\n\n"
+            await interaction.edit_original_response(
+                content=f"✅ **Export terminé !**\n\n"
                 f"**Fichier :** `{filename}`\n"
-                f"**Profils exportés :** {len(profiles_data)}\n"
-                f"**Localisation :** `data/backups/`\n\n"
-                f"💾 Sauvegarde créée le {datetime.now().strftime('%d/%m/%Y à %H:%M')}",
-                ephemeral=True
+                f"**Profils exportés :** {result['count']}\n"
+                f"**Localisation :** `{BACKUP_DIR}/`\n\n"
+                f"💾 Sauvegarde créée le {datetime.now().strftime('%d/%m/%Y à %H:%M')}"
             )
 
         except Exception as e:
-            print(f"❌ Erreur lors de l'export des profils: {e}")
+            logger.error(f"❌ Erreur lors de l'export des profils: {e}")
+            await interaction.edit_original_response(
+                content="❌ Une erreur s'est produite lors de l'export des profils."
+            )
+
+    @app_commands.command(name="import_profiles", description="[ADMIN] Restaurer les profils depuis un export")
+    @app_commands.describe(filename="Nom du fichier d'export dans data/backups (.jsonl.gz)")
+    async def import_profiles(self, interaction: discord.Interaction, filename: str):
+        """Restaurer les profils depuis un fichier produit par /export_profiles"""
+
+        if not await self.is_admin(interaction):
+            await interaction.response.send_message(
+                "❌ Cette commande est réservée aux administrateurs du serveur uniquement.",
+                ephemeral=True
+            )
+            return
+
+        # Uniquement des fichiers du dossier de sauvegarde
+        filepath = os.path.join(BACKUP_DIR, os.path.basename(filename))
+        if not filepath.endswith(".jsonl.gz") or not os.path.exists(filepath):
             await interaction.response.send_message(
-                "❌ Une erreur s'est produite lors de l'export des profils.",
+                f"❌ Fichier `{os.path.basename(filename)}` introuvable dans `{BACKUP_DIR}/`.",
                 ephemeral=True
             )
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        last_update = 0.0
+
+        async def report_progress(table: str, done: int, total: int, imported: int):
+            nonlocal last_update
+            if time.monotonic() - last_update < 2:
+                return
+            last_update = time.monotonic()
+            await interaction.edit_original_response(
+                content=f"📥 Import en cours... {imported} profils restaurés"
+            )
+
+        try:
+            result = await maintenance.import_profiles(filepath, progress=report_progress)
+
+            await interaction.edit_original_response(
+                content=f"✅ **Import terminé !**\n\n"
+                f"**Fichier :** `{os.path.basename(filepath)}`\n"
+                f"**Profils restaurés :** {result['count']}\n"
+                f"**Lignes ignorées :** {result['skipped']}"
+            )
+
+        except Exception as e:
+            logger.error(f"❌ Erreur lors de l'import des profils: {e}")
+            await interaction.edit_original_response(
+                content="❌ Une erreur s'est produite lors de l'import des profils."
+            )
 
     @app_commands.command(name="list_profiles", description="[ADMIN] Lister tous les profils")
     async def list_profiles(self, interaction: discord.Interaction):
@@ -113,7 +165,7 @@ class Admin(commands.Cog):
                 await db_instance.reconnect()
 
             async with db_instance.connection.execute(
-                "SELECT user_id, prenom, age, created_at FROM profiles ORDER BY created_at DESC"
+                "SELECT user_id, prenom, pronoms, age, created_at FROM profiles ORDER BY created_at DESC"
             ) as cursor:
                 profiles = await cursor.fetchall()
 
@@ -130,16 +182,16 @@ class Admin(commands.Cog):
                 color=discord.Color.blue()
             )
 
+            # Résoudre les utilisateurs Discord en parallèle (cache + concurrence limitée)
+            shown_profiles = profiles[:15]  # Limiter à 15 pour éviter dépassement
+            users = await user_resolver.fetch_many(self.bot, [profile[0] for profile in shown_profiles])
+
             profiles_text = []
-            for i, profile in enumerate(profiles[:15], 1):  # Limiter à 15 pour éviter dépassement
+            for i, profile in enumerate(shown_profiles, 1):
                 user_id, prenom, pronoms, age = profile[0], profile[1], profile[2], profile[3]
 
-                # Essayer de récupérer l'utilisateur Discord
-                try:
-                    user = await self.bot.fetch_user(int(user_id))
-                    username = f"{user.name}"
-                except:
-                    username = "Introuvable"
+                user = users.get(int(user_id))
+                username = f"{user.name}" if user else "Introuvable"
 
                 profiles_text.append(f"**{i}.** {prenom} ({age}ans, {pronoms}) - {username} - ID:`{user_id}`")
 
@@ -157,7 +209,7 @@ class Admin(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
 
         except Exception as e:
-            print(f"❌ Erreur list_profiles: {e}")
+            logger.error(f"❌ Erreur list_profiles: {e}")
             await interaction.response.send_message(
                 "❌ Une erreur s'est produite lors de l'affichage de la liste.",
                 ephemeral=True
@@ -254,7 +306,7 @@ class Admin(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
 
         except Exception as e:
-            print(f"❌ Erreur consultsignal: {e}")
+            logger.error(f"❌ Erreur consultsignal: {e}")
             await interaction.response.send_message(
                 "❌ Une erreur s'est produite lors de la consultation des signalements.",
                 ephemeral=True
@@ -273,18 +325,12 @@ class Admin(commands.Cog):
             return
 
         try:
-            # Statistiques des profils
-            async with db_instance.connection.execute("SELECT COUNT(*) FROM profiles") as cursor:
-                total_profiles = (await cursor.fetchone())[0]
-
-            # Statistiques par âge
-            async with db_instance.connection.execute(
-                "SELECT AVG(age), MIN(age), MAX(age) FROM profiles"
-            ) as cursor:
-                age_stats = await cursor.fetchone()
-                avg_age = round(age_stats[0], 1) if age_stats[0] else 0
-                min_age = age_stats[1] or 0
-                max_age = age_stats[2] or 0
+            # Statistiques des profils (compteurs matérialisés)
+            counters = await db_instance.get_global_counters()
+            total_profiles = counters['total_profiles']
+            avg_age = round(counters['age_sum'] / total_profiles, 1) if total_profiles else 0
+            min_age = counters['age_min'] or 0
+            max_age = counters['age_max'] or 0
 
             # Créer l'embed
             embed = discord.Embed(
@@ -326,20 +372,71 @@ class Admin(commands.Cog):
             except ImportError:
                 pass
 
+            # Latence par shard (mode AutoShardedBot)
+            latencies = shard_latencies(self.bot)
+            if len(latencies) > 1 or isinstance(self.bot, commands.AutoShardedBot):
+                embed.add_field(
+                    name="🛰️ Shards",
+                    value="\n".join(
+                        f"**Shard {shard_id} :** " + (f"{latency * 1000:.0f}ms" if math.isfinite(latency) else "—")
+                        for shard_id, latency in latencies[:20]
+                    ) + ("" if is_primary_shard(self.bot) else "\n*Tâches globales sur un autre processus*"),
+                    inline=True
+                )
+
+            # Cache de résolution des utilisateurs Discord
+            resolver_stats = user_resolver.metrics()
+            embed.add_field(
+                name="🗂️ Cache utilisateurs",
+                value=f"**Taux de succès :** {resolver_stats['hit_rate'] * 100:.1f}%\n"
+                      f"**Requêtes HTTP :** {resolver_stats['fetches']}\n"
+                      f"**Coalescées :** {resolver_stats['coalesced']}\n"
+                      f"**Entrées :** {resolver_stats['cache_size']}",
+                inline=True
+            )
+
+            dm_stats = dm_cache.metrics()
+            embed.add_field(
+                name="🔕 DM fermés",
+                value=f"**Connus :** {dm_stats['closed']}\n"
+                      f"**Envois évités :** {dm_stats['closed_skips']}\n"
+                      f"**Nouveaux essais :** {dm_stats['reprobes_ok']}/{dm_stats['reprobes']} réussis\n"
+                      f"**Salons en cache :** {dm_stats['channels']}",
+                inline=True
+            )
+
+            queue_lines = [
+                f"**{name} :** {q['depth']} en file · p50 {q['p50_ms']:.0f}ms · p95 {q['p95_ms']:.0f}ms"
+                f" · {q['retries']} reprises · {q['dead']} abandons"
+                for name, q in outbound_queue.metrics().items()
+            ]
+            embed.add_field(name="📮 File d'envoi", value="\n".join(queue_lines), inline=False)
+
+            digest_stats = notification_digest.metrics()
+            embed.add_field(
+                name="📬 Récapitulatifs",
+                value=f"**Notifications :** {digest_stats['events']}\n"
+                      f"**DM envoyés :** {digest_stats['digests_sent'] + digest_stats['immediate']}\n"
+                      f"**DM économisés :** {digest_stats['dm_saved']}\n"
+                      f"**En attente :** {digest_stats['pending']}",
+                inline=True
+            )
+
             embed.set_footer(text=f"Dernière mise à jour: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
 
             await interaction.response.send_message(embed=embed, ephemeral=True)
 
         except Exception as e:
-            print(f"❌ Erreur lors de l'affichage des stats: {e}")
+            logger.error(f"❌ Erreur lors de l'affichage des stats: {e}")
             await interaction.response.send_message(
                 "❌ Une erreur s'est produite lors de l'affichage des statistiques.",
                 ephemeral=True
             )
 
     @app_commands.command(name="cleanup_history", description="[ADMIN] Nettoyer l'historique de matching")
-    async def cleanup_history(self, interaction: discord.Interaction):
-        """Nettoie l'historique de matching ancien"""
+    @app_commands.describe(archive="Archiver les lignes supprimées dans un fichier compressé")
+    async def cleanup_history(self, interaction: discord.Interaction, archive: bool = False):
+        """Nettoie l'historique de matching ancien en arrière-plan"""
 
         if not await self.is_admin(interaction):
             await interaction.response.send_message(
@@ -348,54 +445,82 @@ class Admin(commands.Cog):
             )
             return
 
-        try:
-            from datetime import datetime, timedelta
-
-            # Nettoyer l'historique de plus de 18 jours
-            cutoff_date = (datetime.now() - timedelta(days=18)).isoformat()
-
-            async with db_instance.connection.execute(
-                "SELECT COUNT(*) FROM match_history WHERE timestamp < ?", (cutoff_date,)
-            ) as cursor:
-                old_history_count = (await cursor.fetchone())[0]
+        if self.history_job and not self.history_job.done():
+            await interaction.response.send_message(
+                "⏳ Un nettoyage de l'historique est déjà en cours.",
+                ephemeral=True
+            )
+            return
 
-            async with db_instance.connection.execute(
-                "SELECT COUNT(*) FROM matches WHERE created_at < ?", (cutoff_date,)
-            ) as cursor:
-                old_matches_count = (await cursor.fetchone())[0]
+        embed = discord.Embed(
+            title="🧹 Nettoyage en cours...",
+            description=f"Suppression par lots de l'historique de plus de {HISTORY_RETENTION_DAYS} jours",
+            color=discord.Color.blue()
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+        # La purge tourne en tâche de fond : l'interaction n'attend pas la fin
+        self.history_job = asyncio.create_task(self.run_history_cleanup(interaction, archive))
+
+    @stats_registry.timed_job("purge historique")
+    async def run_history_cleanup(self, interaction: discord.Interaction, archive: bool):
+        """Exécuter la purge par lots et rapporter la progression à l'admin"""
+        last_update = 0.0
+
+        async def report_progress(table: str, scanned: int, total: int, deleted: int):
+            nonlocal last_update
+            now = time.monotonic()
+            if now - last_update < 2:
+                return
+            last_update = now
 
-            # Supprimer les anciens enregistrements
-            await db_instance.connection.execute(
-                "DELETE FROM match_history WHERE timestamp < ?", (cutoff_date,)
-            )
-            await db_instance.connection.execute(
-                "DELETE FROM matches WHERE created_at < ?", (cutoff_date,)
+            embed = discord.Embed(
+                title="🧹 Nettoyage en cours...",
+                description=f"**{table}** : {scanned}/{total} lignes parcourues ({scanned * 100 // total}%)\n"
+                            f"🗑️ {deleted} entrées supprimées",
+                color=discord.Color.blue()
             )
-            await db_instance.connection.commit()
+            try:
+                await interaction.edit_original_response(embed=embed)
+            except discord.HTTPException:
+                pass
+
+        try:
+            result = await maintenance.purge_history(archive=archive, progress=report_progress)
 
             embed = discord.Embed(
                 title="🧹 Nettoyage Effectué",
-                description=f"Historique de plus de 18 jours supprimé",
+                description=f"Historique de plus de {HISTORY_RETENTION_DAYS} jours supprimé",
                 color=discord.Color.green()
             )
 
             embed.add_field(
                 name="📊 Éléments supprimés",
                 value=(
-                    f"• **Historique :** {old_history_count} entrées\n"
-                    f"• **Matches :** {old_matches_count} entrées"
+                    f"• **Historique :** {result['history']} entrées\n"
+                    f"• **Matches :** {result['matches']} entrées"
                 ),
                 inline=False
             )
 
-            await interaction.response.send_message(embed=embed, ephemeral=True)
+            if result['archive_path']:
+                embed.add_field(
+                    name="📦 Archive",
+                    value=f"`{result['archive_path']}` ({result['archived']} lignes)",
+                    inline=False
+                )
+
+            await interaction.edit_original_response(embed=embed)
 
         except Exception as e:
-            print(f"❌ Erreur cleanup: {e}")
-            await interaction.response.send_message(
-                "❌ Erreur lors du nettoyage.",
-                ephemeral=True
-            )
+            stats_registry.job_error()
+            logger.error(f"❌ Erreur cleanup: {e}")
+            try:
+                await interaction.edit_original_response(
+                    content="❌ Erreur lors du nettoyage.", embed=None
+                )
+            except discord.HTTPException:
+                pass
 
     @app_commands.command(name="deleteprofileadmin", description="[ADMIN] Supprimer un profil utilisateur")
     @app_commands.describe(user="Utilisateur dont supprimer le profil")
@@ -427,35 +552,33 @@ class Admin(commands.Cog):
 
             prenom, pronoms, age = profile
 
-            # Supprimer le profil
-            await db_instance.connection.execute(
-                "DELETE FROM profiles WHERE user_id = ?",
-                (str(user.id),) # Assurez-vous que user_id est une chaîne
-            )
-
-            # Supprimer les signalements liés
-            await db_instance.connection.execute(
-                "DELETE FROM reports WHERE reported_id = ? OR reporter_id = ?",
-                (str(user.id), str(user.id)) # Assurez-vous que user_id est une chaîne
-            )
-
-            # Supprimer les entrées de l'historique de matches
-            await db_instance.connection.execute(
-                "DELETE FROM match_history WHERE user1_id = ? OR user2_id = ?",
-                (str(user.id), str(user.id))
-            )
+            async with db_instance.writing() as conn:
+                # Supprimer le profil
+                await conn.execute(
+                    "DELETE FROM profiles WHERE user_id = ?",
+                    (str(user.id),) # Assurez-vous que user_id est une chaîne
+                )
 
-            # Supprimer les entrées de la table de matches
-            await db_instance.connection.execute(
-                "DELETE FROM matches WHERE user1_id = ? OR user2_id = ?",
-                (str(user.id), str(user.id))
-            )
+                # Supprimer les signalements liés
+                await conn.execute(
+                    "DELETE FROM reports WHERE reported_id = ? OR reporter_id = ?",
+                    (str(user.id), str(user.id)) # Assurez-vous que user_id est une chaîne
+                )
 
+                # Supprimer les entrées de l'historique de matches
+                await conn.execute(
+                    "DELETE FROM match_history WHERE user1_id = ? OR user2_id = ?",
+                    (str(user.id), str(user.id))
+                )
 
-            await db_instance.connection.commit()
+                # Supprimer les entrées de la table de matches
+                await conn.execute(
+                    "DELETE FROM matches WHERE user1_id = ? OR user2_id = ?",
+                    (str(user.id), str(user.id))
+                )
 
             # Log de l'action admin
-            print(f"🔨 ADMIN ACTION: {interaction.user.id} a supprimé le profil de {user.id} ({prenom})")
+            logger.warning(f"🔨 ADMIN ACTION: {interaction.user.id} a supprimé le profil de {user.id} ({prenom})")
 
             await interaction.response.send_message(
                 f"🔨 **Profil supprimé par administrateur**\n\n"
@@ -467,7 +590,7 @@ class Admin(commands.Cog):
             )
 
         except Exception as e:
-            print(f"❌ Erreur deleteprofileadmin: {e}")
+            logger.error(f"❌ Erreur deleteprofileadmin: {e}")
             await interaction.response.send_message(
                 "❌ Une erreur s'est produite lors de la suppression du profil.",
                 ephemeral=True
@@ -511,9 +634,11 @@ class Admin(commands.Cog):
             profile1 = profiles[0] if profiles[0][0] == str(user1.id) else profiles[1]
             profile2 = profiles[1] if profiles[0][0] == str(user1.id) else profiles[0]
 
-            # Import de la classe Match pour utiliser l'algorithme
-            from .match import Match
-            match_cog = Match(self.bot)
+            # Algorithme du cog chargé (une nouvelle instance relancerait ses tâches de fond)
+            match_cog = self.bot.get_cog("Match")
+            if match_cog is None:
+                await interaction.followup.send("❌ Le cog Match n'est pas chargé.", ephemeral=True)
+                return
 
             # Calcul de compatibilité avec logs détaillés
             compatibility = match_cog.calculate_compatibility(profile1, profile2)
@@ -585,13 +710,317 @@ class Admin(commands.Cog):
             await interaction.followup.send(embed=embed, ephemeral=True)
 
         except Exception as e:
-            print(f"❌ Erreur test_compatibility: {e}")
+            logger.error(f"❌ Erreur test_compatibility: {e}")
             await interaction.followup.send(
                 f"❌ Erreur lors du test: {str(e)[:100]}",
                 ephemeral=True
             )
 
 
+    @app_commands.command(name="sql_top", description="[ADMIN] Requêtes SQL les plus coûteuses")
+    @app_commands.describe(tri="Critère de tri", limit="Nombre de requêtes (défaut: 8)",
+                           reset="Remettre les compteurs à zéro après affichage")
+    @app_commands.choices(tri=[
+        app_commands.Choice(name="Temps cumulé", value="total"),
+        app_commands.Choice(name="Nombre d'exécutions", value="count"),
+        app_commands.Choice(name="Durée maximale", value="max"),
+        app_commands.Choice(name="Requêtes lentes", value="slow"),
+    ])
+    async def sql_top(self, interaction: discord.Interaction, tri: str = "total",
+                      limit: app_commands.Range[int, 1, 15] = 8, reset: bool = False):
+        """Formes de requêtes classées par coût, avec les parcours complets de table signalés"""
+        if not await self.is_admin(interaction):
+            await interaction.response.send_message(
+                "❌ Cette commande est réservée aux administrateurs du serveur uniquement.",
+                ephemeral=True
+            )
+            return
+
+        summary = query_profiler.metrics()
+        if not summary["queries"]:
+            await interaction.response.send_message(
+                "📭 Aucune requête profilée (SQL_PROFILER_ENABLED désactivé ?).", ephemeral=True
+            )
+            return
+
+        embed = discord.Embed(
+            title="🗄️ Requêtes SQL",
+            description=(
+                f"{summary['queries']} requêtes · {summary['shapes']} formes · "
+                f"{summary['total_ms']:.0f} ms cumulés depuis {summary['since_seconds'] // 60} min\n"
+                f"🐢 {summary['slow']} lentes (≥ {SQL_SLOW_MS:.0f} ms)"
+                + (f" · ⚠️ SCAN : {', '.join(summary['scans'])}" if summary["scans"] else "")
+            ),
+            color=discord.Color.blue()
+        )
+        for rank, entry in enumerate(query_profiler.top(limit, tri), 1):
+            flags = f" · ⚠️ SCAN {', '.join(entry['scans'])}" if entry["scans"] else ""
+            errors = f" · ❌ {entry['errors']}" if entry["errors"] else ""
+            sql = entry["sql"] if len(entry["sql"]) <= 300 else entry["sql"][:297] + "..."
+            embed.add_field(
+                name=(f"{rank}. {entry['total_ms']:.1f} ms · {entry['count']}× · "
+                      f"moy {entry['avg_ms']:.2f} · max {entry['max_ms']:.1f} ms")[:256],
+                value=f"```sql\n{sql}\n```{flags}{errors}"[:1024],
+                inline=False
+            )
+
+        if reset:
+            query_profiler.reset()
+            embed.set_footer(text="Compteurs remis à zéro")
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+    @app_commands.command(name="perf", description="[ADMIN] Performances internes du bot")
+    async def perf(self, interaction: discord.Interaction):
+        """Tableau de bord des internes : caches, commandes, base, files, tâches, vues, processus"""
+        if not await self.is_admin(interaction):
+            await interaction.response.send_message(
+                "❌ Cette commande est réservée aux administrateurs du serveur uniquement.",
+                ephemeral=True
+            )
+            return
+
+        snapshot = stats_registry.snapshot()
+        embed = discord.Embed(title="⚙️ Performances", color=discord.Color.blue(), timestamp=datetime.now())
+
+        process = snapshot.get("process", {})
+        embed.add_field(
+            name="💾 Processus",
+            value=((f"RSS **{process['rss_mb']:.0f} Mo**" if "rss_mb" in process
+                    else f"RSS max **{process.get('rss_peak_mb', 0):.0f} Mo**")
+                   + f" · {process.get('threads', 0)} threads\n"
+                   f"En ligne depuis {process.get('uptime_seconds', 0) // 3600}h"
+                   f"{process.get('uptime_seconds', 0) % 3600 // 60:02d}"),
+            inline=True
+        )
+
+        lag = snapshot.get("loop", {})
+        embed.add_field(
+            name="⏱️ Boucle d'événements",
+            value=(f"p50 {lag.get('p50_ms', 0):.1f} · p95 **{lag.get('p95_ms', 0):.1f}** · "
+                   f"p99 {lag.get('p99_ms', 0):.1f} ms\n"
+                   f"🧱 {lag.get('stalls', 0)} blocages > {lag.get('threshold_ms', 0):.0f} ms"
+                   + ("" if lag.get("running") else "\n⚠️ Surveillance inactive")),
+            inline=True
+        )
+
+        commands_stats = stats_registry.command_stats()[:6]
+        embed.add_field(
+            name="⌨️ Commandes (récentes)",
+            value="\n".join(
+                f"`/{c['command']}` {c['count']}× · p50 {c['p50_ms']:.0f} · p95 **{c['p95_ms']:.0f}** ms"
+                + (f" · ❌ {c['errors']}" if c["errors"] else "")
+                for c in commands_stats
+            ) or "Aucune commande depuis le démarrage",
+            inline=False
+        )
+
+        users, dm, expiry = snapshot.get("users", {}), snapshot.get("dm", {}), snapshot.get("expiry", {})
+        dm_total = dm.get("channel_hits", 0) + dm.get("channels_opened", 0)
+        embed.add_field(
+            name="🧠 Caches",
+            value=(f"Utilisateurs : {users.get('cache_size', 0)} · **{users.get('hit_rate', 0):.0%}** de hits\n"
+                   f"Salons DM : {dm.get('channels', 0)} · "
+                   f"**{dm.get('channel_hits', 0) / dm_total if dm_total else 0:.0%}** de hits · "
+                   f"{dm.get('closed', 0)} fermés\n"
+                   f"Passes en mémoire : {expiry.get('passes', 0)} ({expiry.get('users', 0)} utilisateurs)"),
+            inline=False
+        )
+
+        db, sql = snapshot.get("db", {}), snapshot.get("sql", {})
+        embed.add_field(
+            name="🗄️ Base de données",
+            value=(("🟢 connectée" if db.get("connected") else "🔴 déconnectée")
+                   + (" · transaction ouverte" if db.get("in_transaction") else "")
+                   + f"\nVerrou d'écriture : {'pris' if db.get('write_locked') else 'libre'}"
+                   f" · {db.get('write_waiters', 0)} en attente\n"
+                   f"SQL : {sql.get('queries', 0)} requêtes · {sql.get('slow', 0)} lentes"),
+            inline=True
+        )
+
+        outbound, digest = snapshot.get("outbound", {}), snapshot.get("digest", {})
+        depth = sum(data.get("depth", 0) for data in outbound.values())
+        by_priority = ", ".join(f"{name} {data.get('depth', 0)}" for name, data in outbound.items())
+        embed.add_field(
+            name="📮 Écritures en attente",
+            value=(f"File d'envoi : **{depth}** ({by_priority})\n"
+                   f"Récapitulatifs : {digest.get('pending', 0)} notifications"),
+            inline=True
+        )
+
+        views = snapshot.get("views", {})
+        embed.add_field(
+            name="🧩 Vues",
+            value=(f"{views.get('views', 0)} vues · {views.get('components', 0)} composants\n"
+                   f"{views.get('persistent', 0)} persistantes · {views.get('dynamic_items', 0)} DynamicItem · "
+                   f"{views.get('modals', 0)} formulaires"),
+            inline=False
+        )
+
+        jobs = []
+        for name, job in stats_registry.jobs.items():
+            if job["last_run"] is None:
+                continue
+            ago = int((datetime.now() - job["last_run"]).total_seconds())
+            duration = f"{job['last_duration'] * 1000:.0f} ms" if job["last_duration"] is not None else "en cours"
+            jobs.append(f"**{name}** il y a {ago // 60} min {ago % 60:02d} s · {duration} · {job['runs']}×"
+                        + (f" · ❌ {job['errors']}" if job["errors"] else ""))
+        embed.add_field(name="🔁 Tâches de fond", value="\n".join(jobs) or "Aucune exécution", inline=False)
+
+        if loop_monitor.stalls:
+            stall = loop_monitor.stalls[-1]
+            duration = f"{stall['lag_ms']:.0f} ms" if stall["lag_ms"] is not None else f"> {stall['blocked_ms']:.0f} ms"
+            embed.add_field(
+                name=f"🧱 Dernier blocage · {stall['at']} · {duration}"[:256],
+                value=f"```\n{stall['culprit']}\n```"[:1024],
+                inline=False
+            )
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+    @app_commands.command(name="profile", description="[ADMIN] Profiler le bot en production pendant une durée limitée")
+    @app_commands.describe(
+        secondes=f"Durée maximale de la session (défaut: 30, max {PROFILE_MAX_SECONDS})",
+        commande="Ne mesurer que pendant cette commande (ex. findmatch)",
+        interactions="Avec commande : arrêter après ce nombre d'exécutions (défaut: 20)",
+        mode="Échantillonnage (surcoût minime) ou cProfile (fichier pstats, plus coûteux)"
+    )
+    @app_commands.choices(mode=[
+        app_commands.Choice(name="Échantillonnage", value="sampling"),
+        app_commands.Choice(name="cProfile", value="cprofile"),
+    ])
+    async def profile(self, interaction: discord.Interaction,
+                      secondes: app_commands.Range[int, 1, PROFILE_MAX_SECONDS] = 30,
+                      commande: Optional[str] = None,
+                      interactions: app_commands.Range[int, 1, 100] = 20,
+                      mode: str = "sampling"):
+        """Session de profilage bornée ; le résumé est envoyé à la fin, les fichiers restent dans logs/profiles"""
+        if not await self.is_admin(interaction):
+            await interaction.response.send_message(
+                "❌ Cette commande est réservée aux administrateurs du serveur uniquement.",
+                ephemeral=True
+            )
+            return
+
+        if profiler.busy():
+            await interaction.response.send_message("⏳ Une session de profilage est déjà en cours.", ephemeral=True)
+            return
+
+        commande = commande.strip().lstrip("/") if commande else None
+        if commande and commande not in {cmd.name for cmd in self.bot.tree.get_commands()}:
+            await interaction.response.send_message(f"❌ Commande inconnue : `/{commande}`", ephemeral=True)
+            return
+
+        logger.warning(f"ADMIN ACTION: {interaction.user} lance un profilage {mode} ({commande or 'global'}, {secondes}s)")
+        target = f"{interactions} exécutions de `/{commande}`" if commande else "toute l'activité"
+        await interaction.response.send_message(
+            f"🔬 Profilage {mode} démarré : {target}, {secondes}s maximum.", ephemeral=True
+        )
+        # La session tourne en arrière-plan ; le résultat arrive par followup
+        self.profile_task = asyncio.create_task(self.run_profile(interaction, mode, secondes, commande, interactions))
+
+    async def run_profile(self, interaction: discord.Interaction, mode: str, seconds: int,
+                          command: Optional[str], interactions: int):
+        try:
+            session = await profiler.run(mode, seconds, command, interactions)
+        except Exception as e:
+            logger.error(f"❌ Erreur profilage: {e}")
+            await interaction.followup.send(f"❌ Profilage interrompu : {str(e)[:100]}", ephemeral=True)
+            return
+
+        files = "\n".join(f"`{path}`" for path in session.files.values())
+        summary = session.summary if len(session.summary) <= 1500 else session.summary[:1497] + "..."
+        await interaction.followup.send(
+            f"🔬 Profilage terminé\n```\n{summary}\n```\n{files}",
+            file=discord.File(session.files["summary"]),
+            ephemeral=True
+        )
+
+
+    @app_commands.command(name="memory", description="[ADMIN] Instantané mémoire comparé au précédent (tracemalloc)")
+    @app_commands.describe(action="Prendre un instantané ou arrêter le traçage",
+                           tri="Regrouper les allocations par ligne ou par fichier",
+                           limit="Nombre de sites affichés (défaut: 8)")
+    @app_commands.choices(
+        action=[
+            app_commands.Choice(name="Instantané", value="snapshot"),
+            app_commands.Choice(name="Arrêter le traçage", value="stop"),
+        ],
+        tri=[
+            app_commands.Choice(name="Ligne", value="lineno"),
+            app_commands.Choice(name="Fichier", value="filename"),
+        ]
+    )
+    async def memory(self, interaction: discord.Interaction, action: str = "snapshot", tri: str = "lineno",
+                     limit: app_commands.Range[int, 1, 15] = 8):
+        """Sites d'allocation, différentiel avec l'instantané précédent, objets vivants et caches"""
+        if not await self.is_admin(interaction):
+            await interaction.response.send_message(
+                "❌ Cette commande est réservée aux administrateurs du serveur uniquement.",
+                ephemeral=True
+            )
+            return
+
+        if action == "stop":
+            memory_inspector.stop()
+            await interaction.response.send_message("🧠 Traçage mémoire arrêté.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+        try:
+            report = await memory_inspector.capture(self.bot, tri, limit)
+        except Exception as e:
+            logger.error(f"❌ Erreur instantané mémoire: {e}")
+            await interaction.followup.send(f"❌ Instantané impossible : {str(e)[:100]}", ephemeral=True)
+            return
+
+        embed = discord.Embed(
+            title="🧠 Mémoire",
+            description=(f"Tracé : **{report['traced_mb']:.1f} Mo** · pic {report['peak_mb']:.1f} Mo · "
+                         f"surcoût tracemalloc {report['overhead_mb']:.1f} Mo"
+                         + ("\n⚠️ Traçage démarré maintenant : seules les allocations futures seront visibles, "
+                            "reprendre un instantané plus tard." if report["just_started"] else "")),
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+        embed.add_field(
+            name="📍 Sites d'allocation",
+            value="\n".join(f"`{entry['site']}` {entry['size_kb']:.0f} Ko · {entry['count']}×"
+                            for entry in report["top"])[:1024] or "Aucune allocation tracée",
+            inline=False
+        )
+        if report["diff"] is not None:
+            embed.add_field(
+                name=f"📈 Depuis {report['previous_at']}"[:256],
+                value="\n".join(f"`{entry['site']}` {entry['size_diff_kb']:+.0f} Ko · {entry['count_diff']:+}×"
+                                for entry in report["diff"])[:1024] or "Aucune variation",
+                inline=False
+            )
+
+        classes = report["objects"]["classes"]
+        embed.add_field(
+            name="📦 Objets vivants",
+            value="\n".join(
+                f"{label} : **{data['total']}**"
+                + (f" ({', '.join(f'{name} {count}' for name, count in data['by_class'].items())})"
+                   if len(data["by_class"]) > 1 else "")
+                for label, data in classes.items()
+            )[:1024],
+            inline=False
+        )
+        caches = report["caches"]
+        embed.add_field(
+            name="🗃️ Caches discord.py",
+            value=(f"{caches['users']} utilisateurs · {caches['members']} membres · "
+                   f"{caches['messages']} messages · {caches['private_channels']} salons privés"),
+            inline=False
+        )
+        embed.set_footer(text=report["files"]["report"])
+
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
 
 async def setup(bot):
     """Fonction obligatoire pour charger le cog"""
@@ -0,0 +1,62 @@
+# Synchronisation des commandes slash uniquement quand leur définition a changé
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import discord
+from .utils import db_instance, logger
+
+# Serveurs de développement : si renseigné, synchroniser uniquement ces serveurs (sync instantanée)
+COMMAND_SYNC_GUILDS = [int(g) for g in os.getenv("COMMAND_SYNC_GUILDS", "").split(",") if g.strip()]
+
+def payload_hash(tree: discord.app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> Tuple[str, int]:
+    """Empreinte du payload que tree.sync() enverrait, et nombre de commandes"""
+    payload = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+    payload.sort(key=lambda command: (command.get("type", 1), command["name"]))
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest(), len(payload)
+
+async def _stored_hash(scope: str) -> Optional[str]:
+    async with db_instance.connection.execute(
+        "SELECT hash FROM command_sync_state WHERE scope = ?", (scope,)
+    ) as cursor:
+        row = await cursor.fetchone()
+    return row[0] if row else None
+
+async def _store_hash(scope: str, digest: str, count: int):
+    async with db_instance.writing() as conn:
+        await conn.execute("""
+            INSERT INTO command_sync_state (scope, hash, command_count, synced_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(scope) DO UPDATE SET
+                hash = excluded.hash, command_count = excluded.command_count, synced_at = excluded.synced_at
+        """, (scope, digest, count, datetime.now().isoformat()))
+
+async def sync_commands(bot, force: bool = False) -> List[Dict]:
+    """Synchroniser l'arbre (global ou serveurs de dev) si son empreinte a changé"""
+    targets = [discord.Object(id=guild_id) for guild_id in COMMAND_SYNC_GUILDS] or [None]
+    results = []
+
+    for guild in targets:
+        started = time.perf_counter()
+        if guild:
+            bot.tree.copy_global_to(guild=guild)
+
+        # L'application fait partie de la clé : un autre token ne réutilise pas l'empreinte
+        scope = f"{bot.application_id}:{'guild:' + str(guild.id) if guild else 'global'}"
+        digest, count = payload_hash(bot.tree, guild)
+
+        synced = force or digest != await _stored_hash(scope)
+        if synced:
+            await bot.tree.sync(guild=guild)
+            await _store_hash(scope, digest, count)
+
+        elapsed = time.perf_counter() - started
+        results.append({"scope": scope, "synced": synced, "count": count, "seconds": elapsed})
+        logger.info(
+            f"{'🔄' if synced else '⏭️'} Commandes {scope}: {count} "
+            f"({'synchronisées' if synced else 'inchangées, sync ignorée'}) en {elapsed:.2f}s"
+        )
+
+    return results
@@ -0,0 +1,90 @@
+# Regroupement des notifications de like et de pass en un DM récapitulatif par destinataire
+import os
+import time
+from typing import Dict, List, Tuple
+from .stats_registry import stats_registry
+
+# Fenêtre de regroupement (minutes) ; 0 désactive le récapitulatif
+DIGEST_WINDOW_MINUTES = float(os.getenv("DIGEST_WINDOW_MINUTES", "30"))
+
+# Les likes peuvent être envoyés tout de suite, hors récapitulatif
+DIGEST_LIKES_IMMEDIATE = os.getenv("DIGEST_LIKES_IMMEDIATE", "false").lower() in ("1", "true", "yes")
+
+# Contenu du DM : lignes par section et boutons de réponse (5 rangées de 5 au maximum)
+DIGEST_MAX_LINES = 15
+DIGEST_MAX_BUTTONS = 20
+
+# Envoi des récapitulatifs en attente au déchargement du cog (rechargement, arrêt du bot)
+DIGEST_FLUSH_TIMEOUT = 10
+
+class NotificationDigest:
+    """Événements en attente par destinataire, le plus récent par expéditeur"""
+
+    def __init__(self, window_minutes: float = DIGEST_WINDOW_MINUTES, likes_immediate: bool = DIGEST_LIKES_IMMEDIATE):
+        self.window = window_minutes * 60
+        self.likes_immediate = likes_immediate
+        # recipient_id -> (première mise en attente, {sender_id: (action, profil)})
+        self._pending: Dict[str, Tuple[float, Dict[str, Tuple[str, object]]]] = {}
+        self.stats = {
+            "events": 0,        # Notifications demandées
+            "coalesced": 0,     # Remplacées par un événement plus récent du même expéditeur
+            "discarded": 0,     # Annulées (match révélé entre-temps)
+            "digests_sent": 0,  # DM récapitulatifs envoyés
+            "immediate": 0,     # Notifications envoyées sans attente
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def should_batch(self, action: str) -> bool:
+        """La notification doit-elle attendre le récapitulatif ?"""
+        if not self.enabled or (action == "like" and self.likes_immediate):
+            self.stats["events"] += 1
+            self.stats["immediate"] += 1
+            return False
+        return True
+
+    def add(self, recipient_id: str, sender_profile, action: str):
+        """Mettre un événement en attente (un like remplace un pass du même expéditeur et inversement)"""
+        self.stats["events"] += 1
+        _, events = self._pending.setdefault(recipient_id, (time.monotonic(), {}))
+        if sender_profile[0] in events:
+            self.stats["coalesced"] += 1
+        events[sender_profile[0]] = (action, sender_profile)
+
+    def discard(self, recipient_id: str, sender_id: str):
+        """Retirer un événement devenu sans objet"""
+        entry = self._pending.get(recipient_id)
+        if entry and entry[1].pop(sender_id, None):
+            self.stats["discarded"] += 1
+            if not entry[1]:
+                del self._pending[recipient_id]
+
+    def pop_due(self) -> List[Tuple[str, List[Tuple[str, object]]]]:
+        """Retirer les destinataires dont la fenêtre est écoulée"""
+        deadline = time.monotonic() - self.window
+        due = [recipient for recipient, (first_at, _) in self._pending.items() if first_at <= deadline]
+        return [(recipient, list(self._pending.pop(recipient)[1].values())) for recipient in due]
+
+    def pop_all(self) -> List[Tuple[str, List[Tuple[str, object]]]]:
+        """Retirer tous les destinataires, fenêtre écoulée ou non"""
+        pending, self._pending = self._pending, {}
+        return [(recipient, list(events.values())) for recipient, (_, events) in pending.items()]
+
+    def pending_count(self) -> int:
+        return sum(len(events) for _, events in self._pending.values())
+
+    def metrics(self) -> Dict:
+        """Compteurs et DM économisés par rapport à un envoi par événement"""
+        sent = self.stats["digests_sent"] + self.stats["immediate"]
+        delivered_events = self.stats["events"] - self.pending_count()
+        return {
+            **self.stats,
+            "pending": self.pending_count(),
+            "dm_saved": max(0, delivered_events - sent),
+        }
+
+# Instance globale
+notification_digest = NotificationDigest()
+stats_registry.register("digest", notification_digest.metrics)
@@ -0,0 +1,174 @@
+# Moteur d'expiration TTL pour les profils passés et les likes en attente
+import asyncio
+import heapq
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Set, Tuple
+from .utils import db_instance, logger
+from .stats_registry import stats_registry
+from .sharding import SHARD_IDS
+
+# Durées de vie configurables (heures)
+PASS_TTL_HOURS = float(os.getenv("PASS_TTL_HOURS", "4"))
+LIKE_TTL_HOURS = float(os.getenv("LIKE_TTL_HOURS", "168"))
+
+# Taille d'un lot de suppression : garde chaque verrou d'écriture très court
+EXPIRY_BATCH_SIZE = int(os.getenv("EXPIRY_BATCH_SIZE", "200"))
+EXPIRY_MAX_BATCHES = 50
+
+class ExpiryEngine:
+    """Expiration indexée des lignes temporaires avec min-heap en mémoire"""
+
+    def __init__(self, db, pass_ttl_hours: float = PASS_TTL_HOURS, like_ttl_hours: float = LIKE_TTL_HOURS,
+                 batch_size: int = EXPIRY_BATCH_SIZE, authoritative: bool = True):
+        self.db = db
+        # Faux si d'autres processus (SHARD_IDS) écrivent les mêmes passes : la base fait foi
+        self.authoritative = authoritative
+        self.pass_ttl = timedelta(hours=pass_ttl_hours)
+        self.like_ttl = timedelta(hours=like_ttl_hours)
+        self.batch_size = batch_size
+
+        # (expires_at, user_id, passed_profile_id) : la prochaine expiration en tête
+        self._heap: List[Tuple[str, str, str]] = []
+        # user_id -> {passed_profile_id: expires_at}
+        self._passes: Dict[str, Dict[str, str]] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+
+    def pass_expiry(self) -> str:
+        """Date d'expiration d'un pass créé maintenant"""
+        return (datetime.now() + self.pass_ttl).isoformat()
+
+    def like_expiry(self) -> str:
+        """Date d'expiration d'un like en attente créé maintenant"""
+        return (datetime.now() + self.like_ttl).isoformat()
+
+    async def ensure_loaded(self):
+        """Charger les passes actifs depuis la base (une seule fois)"""
+        if self._loaded:
+            return
+
+        async with self._load_lock:
+            if self._loaded:
+                return
+
+            await self.backfill()
+
+            now = datetime.now().isoformat()
+            async with self.db.connection.execute(
+                "SELECT user_id, passed_profile_id, expires_at FROM passed_profiles WHERE expires_at > ?",
+                (now,)
+            ) as cursor:
+                rows = await cursor.fetchall()
+
+            self._heap = []
+            self._passes = {}
+            for user_id, passed_id, expires_at in rows:
+                self._passes.setdefault(user_id, {})[passed_id] = expires_at
+                self._heap.append((expires_at, user_id, passed_id))
+            heapq.heapify(self._heap)
+
+            self._loaded = True
+            logger.info(f"⏳ Moteur d'expiration chargé: {len(rows)} passes actifs")
+
+    async def backfill(self):
+        """Renseigner expires_at sur les lignes antérieures à la colonne"""
+        pass_seconds = int(self.pass_ttl.total_seconds())
+        like_seconds = int(self.like_ttl.total_seconds())
+
+        async with self.db.writing() as conn:
+            await conn.execute(f"""
+                UPDATE passed_profiles
+                SET expires_at = strftime('%Y-%m-%dT%H:%M:%S', passed_at, '+{pass_seconds} seconds')
+                WHERE expires_at IS NULL
+            """)
+            await conn.execute(f"""
+                UPDATE profile_likes
+                SET expires_at = strftime('%Y-%m-%dT%H:%M:%S', liked_at, '+{like_seconds} seconds')
+                WHERE expires_at IS NULL
+            """)
+
+    def track_pass(self, user_id: str, passed_id: str, expires_at: str):
+        """Enregistrer un pass dans l'index mémoire"""
+        self._passes.setdefault(user_id, {})[passed_id] = expires_at
+        heapq.heappush(self._heap, (expires_at, user_id, passed_id))
+
+    def forget_passes(self, user_id: str):
+        """Oublier tous les passes d'un utilisateur (les entrées du heap deviennent obsolètes)"""
+        self._passes.pop(user_id, None)
+
+    def _prune(self, now: str):
+        """Retirer les passes expirés en tête du heap"""
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, user_id, passed_id = heapq.heappop(self._heap)
+            user_passes = self._passes.get(user_id)
+            # Ignorer les entrées remplacées par un pass plus récent
+            if user_passes and user_passes.get(passed_id) == expires_at:
+                del user_passes[passed_id]
+                if not user_passes:
+                    del self._passes[user_id]
+
+    def passed_by(self, user_id: str) -> Set[str]:
+        """Profils passés encore actifs pour un utilisateur, sans requête SQL"""
+        self._prune(datetime.now().isoformat())
+        return set(self._passes.get(user_id, {}))
+
+    async def active_passes(self, user_id: str) -> Set[str]:
+        """Profils passés actifs : index mémoire, ou requête indexée s'il n'est pas le seul à écrire"""
+        if not self.authoritative:
+            async with self.db.connection.execute(
+                "SELECT passed_profile_id FROM passed_profiles WHERE user_id = ? AND expires_at > ?",
+                (user_id, datetime.now().isoformat())
+            ) as cursor:
+                return {row[0] for row in await cursor.fetchall()}
+
+        await self.ensure_loaded()
+        return self.passed_by(user_id)
+
+    async def _purge_batches(self, delete_query: str, now: str) -> int:
+        """Supprimer par petits lots en rendant la main à la boucle entre chaque"""
+        total = 0
+        for _ in range(EXPIRY_MAX_BATCHES):
+            async with self.db.transaction() as conn:
+                async with conn.execute(delete_query, (now, self.batch_size)) as cursor:
+                    deleted = cursor.rowcount
+
+            total += deleted
+            if deleted < self.batch_size:
+                break
+            await asyncio.sleep(0)
+
+        return total
+
+    async def purge_expired(self) -> Tuple[int, int]:
+        """Supprimer les passes et likes en attente expirés, retourne (passes, likes)"""
+        await self.ensure_loaded()
+        now = datetime.now().isoformat()
+        self._prune(now)
+
+        passes = await self._purge_batches("""
+            DELETE FROM passed_profiles WHERE id IN (
+                SELECT id FROM passed_profiles WHERE expires_at <= ? LIMIT ?
+            )
+        """, now)
+
+        likes = await self._purge_batches("""
+            DELETE FROM profile_likes WHERE id IN (
+                SELECT id FROM profile_likes WHERE status = 'pending' AND expires_at <= ? LIMIT ?
+            )
+        """, now)
+
+        return passes, likes
+
+    def metrics(self) -> Dict:
+        return {
+            "authoritative": self.authoritative,
+            "loaded": self._loaded,
+            "users": len(self._passes),
+            "passes": sum(len(passes) for passes in self._passes.values()),
+            "heap": len(self._heap),
+        }
+
+# Instance globale
+expiry_engine = ExpiryEngine(db_instance, authoritative=not SHARD_IDS)
+stats_registry.register("expiry", expiry_engine.metrics)
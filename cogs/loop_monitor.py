@@ -0,0 +1,152 @@
+# Surveillance du retard de la boucle d'événements et capture des appels bloquants
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+from .utils import logger, percentile
+from .stats_registry import stats_registry
+
+# Période de mesure et seuil au-delà duquel la pile de la boucle est capturée (ms)
+LOOP_LAG_INTERVAL_MS = float(os.getenv("LOOP_LAG_INTERVAL_MS", "100"))
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "250"))
+
+# Mesures conservées pour les percentiles (10 min à 100 ms), blocages conservés, profondeur de pile
+WINDOW_SIZE = 6000
+MAX_STALLS = 20
+STACK_DEPTH = 25
+
+# Seuils de l'histogramme cumulatif (secondes)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class LoopLagMonitor:
+    """Tâche de mesure sur la boucle + fil de garde qui capture la pile quand la boucle ne répond plus"""
+
+    def __init__(self, interval_ms: float = LOOP_LAG_INTERVAL_MS, threshold_ms: float = LOOP_LAG_THRESHOLD_MS):
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.samples: Deque[float] = deque(maxlen=WINDOW_SIZE)
+        self.bucket_counts = [0] * len(LAG_BUCKETS)
+        self.lag_sum = 0.0
+        self.lag_count = 0
+        self.stalls: Deque[Dict] = deque(maxlen=MAX_STALLS)
+        self.stall_count = 0
+        self._beat = time.monotonic()
+        self._current_stall: Optional[Dict] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Démarrer la mesure sur la boucle courante (sans effet si déjà démarrée)"""
+        if self._task and not self._task.done():
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+        logger.info(f"⏱️ Surveillance de la boucle active (seuil {self.threshold * 1000:.0f} ms)")
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            self._record(max(0.0, now - expected))
+
+    def _record(self, lag: float):
+        self.samples.append(lag)
+        self.lag_sum += lag
+        self.lag_count += 1
+        for i, bound in enumerate(LAG_BUCKETS):
+            if lag <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+        stall = self._current_stall
+        if stall is not None:
+            # Fin du blocage : durée réelle connue au réveil de la boucle
+            self._current_stall = None
+            stall["lag_ms"] = round(lag * 1000, 1)
+            logger.warning(
+                f"🧱 Boucle bloquée {stall['lag_ms']:.0f} ms — {stall['culprit']}\n"
+                + "\n".join(f"   {line}" for line in stall["stack"][-8:])
+            )
+
+    def _watch(self):
+        """Fil de garde : la boucle n'a pas battu depuis plus que le seuil, capturer sa pile"""
+        period = min(self.interval, self.threshold / 2)
+        while not self._stop.wait(period):
+            blocked = time.monotonic() - self._beat - self.interval
+            if blocked < self.threshold or self._current_stall is not None:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = self._format_stack(frame) if frame else []
+            stall = {
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "blocked_ms": round(blocked * 1000, 1),
+                "lag_ms": None,
+                "culprit": self._culprit(stack),
+                "stack": stack,
+            }
+            self.stalls.append(stall)
+            self.stall_count += 1
+            self._current_stall = stall
+
+    @staticmethod
+    def _format_stack(frame) -> List[str]:
+        lines = []
+        for summary in traceback.extract_stack(frame)[-STACK_DEPTH:]:
+            filename = os.path.relpath(summary.filename, ROOT) if summary.filename.startswith(ROOT) else \
+                summary.filename.split("site-packages" + os.sep)[-1]
+            lines.append(f"{filename}:{summary.lineno} {summary.name} — {(summary.line or '').strip()[:80]}")
+        return lines
+
+    @staticmethod
+    def _culprit(stack: List[str]) -> str:
+        """Frame du projet la plus profonde (cogs/, bot.py), sinon la plus profonde tout court"""
+        for line in reversed(stack):
+            if line.startswith(("cogs" + os.sep, "bot.py")):
+                return line
+        return stack[-1] if stack else "pile indisponible"
+
+    def histogram(self):
+        """(seuils, comptes par seuil, somme, nombre) pour l'exposition Prometheus"""
+        return LAG_BUCKETS, list(self.bucket_counts), self.lag_sum, self.lag_count
+
+    def metrics(self) -> Dict:
+        return {
+            "running": bool(self._task and not self._task.done()),
+            "samples": len(self.samples),
+            "p50_ms": round(percentile(self.samples, 0.50) * 1000, 1),
+            "p95_ms": round(percentile(self.samples, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(self.samples, 0.99) * 1000, 1),
+            "max_ms": round(max(self.samples, default=0.0) * 1000, 1),
+            "stalls": self.stall_count,
+            "threshold_ms": self.threshold * 1000,
+        }
+
+# Instance globale
+loop_monitor = LoopLagMonitor()
+stats_registry.register("loop", loop_monitor.metrics)
@@ -0,0 +1,266 @@
+# Tâches de maintenance de la base exécutées en arrière-plan
+import asyncio
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from .utils import db_instance, logger
+
+# Rétention de l'historique de matching
+HISTORY_RETENTION_DAYS = 18
+
+# Lignes supprimées par transaction et pause entre deux lots
+CHUNK_SIZE = 500
+CHUNK_PAUSE = 0.01
+
+ARCHIVE_DIR = "data/archives"
+BACKUP_DIR = "data/backups"
+
+# Lignes lues par fetchmany() à l'export et insérées par executemany() à l'import
+EXPORT_CHUNK_SIZE = 500
+IMPORT_BATCH_SIZE = 500
+
+# Callback de progression : (table, lignes parcourues, lignes à parcourir, lignes supprimées)
+ProgressCallback = Callable[[str, int, int, int], Awaitable[None]]
+
+class GzipJsonlWriter:
+    """Écriture JSON Lines compressée, exécutée hors de la boucle d'événements"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self.rows_written = 0
+
+    async def open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = await asyncio.to_thread(gzip.open, self.path, "wt", encoding="utf-8")
+
+    def _write_sync(self, records: List[Dict]):
+        for record in records:
+            self._file.write(json.dumps(record, ensure_ascii=False))
+            self._file.write("\n")
+
+    async def write(self, records: List[Dict]):
+        if records:
+            await asyncio.to_thread(self._write_sync, records)
+            self.rows_written += len(records)
+
+    async def write_rows(self, columns: List[str], rows: List):
+        """Convertir et sérialiser des lignes SQL dans le thread d'écriture"""
+        if rows:
+            await asyncio.to_thread(
+                lambda: self._write_sync([dict(zip(columns, row)) for row in rows])
+            )
+            self.rows_written += len(rows)
+
+    async def close(self):
+        if self._file:
+            await asyncio.to_thread(self._file.close)
+            self._file = None
+
+class GzipJsonlReader:
+    """Lecture JSON Lines compressée par blocs, hors de la boucle d'événements"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    async def open(self):
+        self._file = await asyncio.to_thread(gzip.open, self.path, "rt", encoding="utf-8")
+
+    def _read_sync(self, size: int) -> List[Dict]:
+        records = []
+        for line in self._file:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+                if len(records) >= size:
+                    break
+        return records
+
+    async def read(self, size: int) -> List[Dict]:
+        return await asyncio.to_thread(self._read_sync, size)
+
+    async def close(self):
+        if self._file:
+            await asyncio.to_thread(self._file.close)
+            self._file = None
+
+async def purge_by_id_range(table: str, time_column: str, cutoff: str,
+                            archive: Optional[GzipJsonlWriter] = None,
+                            progress: Optional[ProgressCallback] = None,
+                            chunk_size: int = CHUNK_SIZE) -> int:
+    """Supprimer les lignes antérieures à cutoff par tranches d'id, avec pause entre chaque tranche.
+
+    S'arrête à la première tranche non vide sans ligne antérieure à cutoff (ids chronologiques).
+    """
+    async with db_instance.connection.execute(f"SELECT MIN(id), MAX(id) FROM {table}") as cursor:
+        min_id, max_id = await cursor.fetchone()
+
+    if min_id is None:
+        return 0
+
+    span = max_id - min_id + 1
+    deleted_total = 0
+    low = min_id
+
+    while low <= max_id:
+        high = low + chunk_size
+
+        # Archiver la tranche avant de la supprimer
+        if archive:
+            async with db_instance.connection.execute(
+                f"SELECT * FROM {table} WHERE id >= ? AND id < ? AND {time_column} < ?",
+                (low, high, cutoff)
+            ) as cursor:
+                rows = await cursor.fetchall()
+            await archive.write([{"table": table, **dict(row)} for row in rows])
+
+        async with db_instance.transaction() as conn:
+            async with conn.execute(
+                f"DELETE FROM {table} WHERE id >= ? AND id < ? AND {time_column} < ?",
+                (low, high, cutoff)
+            ) as cursor:
+                deleted = cursor.rowcount
+        deleted_total += deleted
+
+        # Ids croissants avec le temps : une tranche peuplée sans ligne ancienne clôt la purge
+        if not deleted:
+            async with db_instance.connection.execute(
+                f"SELECT 1 FROM {table} WHERE id >= ? AND id < ? LIMIT 1", (low, high)
+            ) as cursor:
+                if await cursor.fetchone():
+                    if progress:
+                        await progress(table, span, span, deleted_total)
+                    break
+
+        low = high
+        if progress:
+            await progress(table, min(low - min_id, span), span, deleted_total)
+
+        # Laisser passer les autres écrivains entre deux tranches
+        await asyncio.sleep(CHUNK_PAUSE)
+
+    return deleted_total
+
+async def purge_history(retention_days: int = HISTORY_RETENTION_DAYS, archive: bool = False,
+                        progress: Optional[ProgressCallback] = None) -> Dict:
+    """Purger match_history et matches plus anciens que la rétention, archive optionnelle"""
+    cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+
+    writer = None
+    if archive:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        writer = GzipJsonlWriter(f"{ARCHIVE_DIR}/history_{timestamp}.jsonl.gz")
+        await writer.open()
+
+    try:
+        history_count = await purge_by_id_range("match_history", "timestamp", cutoff, writer, progress)
+        matches_count = await purge_by_id_range("matches", "created_at", cutoff, writer, progress)
+    finally:
+        if writer:
+            await writer.close()
+
+    logger.info(f"🧹 Historique purgé: {history_count} entrées, {matches_count} matches")
+
+    return {
+        "history": history_count,
+        "matches": matches_count,
+        "archive_path": writer.path if writer else None,
+        "archived": writer.rows_written if writer else 0,
+    }
+
+async def export_profiles(progress: Optional[ProgressCallback] = None) -> Dict:
+    """Exporter les profils en JSON Lines gzip, en flux et à mémoire constante"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    writer = GzipJsonlWriter(f"{BACKUP_DIR}/profiles_backup_{timestamp}.jsonl.gz")
+
+    counters = await db_instance.get_global_counters()
+    total = counters['total_profiles'] if counters else 0
+
+    await writer.open()
+    try:
+        async with db_instance.connection.execute("SELECT * FROM profiles") as cursor:
+            # Les noms de colonnes viennent du curseur : pas de positions codées en dur
+            columns = [column[0] for column in cursor.description]
+
+            while True:
+                rows = await cursor.fetchmany(EXPORT_CHUNK_SIZE)
+                if not rows:
+                    break
+
+                await writer.write_rows(columns, rows)
+                if progress:
+                    await progress("profiles", writer.rows_written, max(total, writer.rows_written), writer.rows_written)
+    finally:
+        await writer.close()
+
+    logger.info(f"💾 Export des profils: {writer.rows_written} lignes -> {writer.path}")
+    return {"path": writer.path, "count": writer.rows_written}
+
+def _upsert_profiles_query(columns: Tuple[str, ...]) -> str:
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "user_id")
+    return f"""
+        INSERT INTO profiles ({", ".join(columns)})
+        VALUES ({", ".join("?" * len(columns))})
+        ON CONFLICT(user_id) DO {"UPDATE SET " + updates if updates else "NOTHING"}
+    """
+
+async def import_profiles(path: str, progress: Optional[ProgressCallback] = None) -> Dict:
+    """Restaurer des profils depuis un export JSON Lines gzip, par transactions groupées"""
+    async with db_instance.connection.execute("PRAGMA table_info(profiles)") as cursor:
+        table_info = await cursor.fetchall()
+    table_columns = [row[1] for row in table_info]
+    # NOT NULL sans défaut : une ligne qui ne les fournit pas ne peut que compléter un profil existant
+    required = {row[1] for row in table_info if row[3] and row[4] is None and not row[5]}
+
+    reader = GzipJsonlReader(path)
+    await reader.open()
+
+    imported = 0
+    skipped = 0
+    try:
+        while True:
+            records = await reader.read(IMPORT_BATCH_SIZE)
+            if not records:
+                break
+
+            # Regrouper par colonnes présentes à la fois dans la ligne et dans la table :
+            # une clé absente garde la valeur existante ou le défaut de la table, jamais NULL
+            groups: Dict[Tuple[str, ...], List[Tuple]] = {}
+            for record in records:
+                if not record.get("user_id"):
+                    skipped += 1
+                    continue
+                columns = tuple(c for c in table_columns if c in record)
+                groups.setdefault(columns, []).append(tuple(record[c] for c in columns))
+
+            if groups:
+                async with db_instance.transaction() as conn:
+                    for columns, params in groups.items():
+                        if required <= set(columns):
+                            await conn.executemany(_upsert_profiles_query(columns), params)
+                            imported += len(params)
+                            continue
+
+                        # Ligne partielle : mise à jour du profil existant, ignorée sinon
+                        key = columns.index("user_id")
+                        updated = columns[:key] + columns[key + 1:]
+                        updated_rows = 0
+                        if updated:
+                            async with conn.executemany(f"""
+                                UPDATE profiles SET {", ".join(f"{c} = ?" for c in updated)} WHERE user_id = ?
+                            """, [row[:key] + row[key + 1:] + (row[key],) for row in params]) as cursor:
+                                updated_rows = cursor.rowcount
+                        imported += updated_rows
+                        skipped += len(params) - updated_rows
+
+            if progress:
+                await progress("profiles", imported + skipped, imported + skipped, imported)
+            await asyncio.sleep(CHUNK_PAUSE)
+    finally:
+        await reader.close()
+
+    logger.info(f"📥 Import des profils: {imported} lignes depuis {path} ({skipped} ignorées)")
+    return {"count": imported, "skipped": skipped}
@@ -9,41 +9,99 @@ import math
 import logging
 from datetime import datetime, timedelta
 from .utils import db_instance, logger
+from .expiry import expiry_engine, PASS_TTL_HOURS
+from .resolver import dm_cache, user_resolver
+from .outbound import outbound_queue, PRIORITY_MATCH, PRIORITY_LIKE, PRIORITY_PASS
+from .digest import notification_digest, DIGEST_MAX_LINES, DIGEST_MAX_BUTTONS, DIGEST_FLUSH_TIMEOUT
+from .sharding import is_primary_shard
+from .tracing import trace, span
+from .stats_registry import stats_registry
 from typing import List, Tuple, Optional
 
+# Durée pendant laquelle les boutons d'un carrousel /findmatch restent utilisables
+CAROUSEL_TTL_DAYS = 7
+
 class Match(commands.Cog):
     """Système de matching intelligent avec anonymat partiel"""
 
     def __init__(self, bot):
         self.bot = bot
-        self.cleanup_passed_profiles.start()  # Démarrer la tâche de nettoyage
 
-    def cog_unload(self):
-        """Arrêter les tâches lors du déchargement du cog"""
+        # Tâches globales sur la base : un seul processus (celui du shard principal)
+        if is_primary_shard(bot):
+            self.cleanup_passed_profiles.start()  # Démarrer la tâche de nettoyage
+            self.reconcile_counters.start()  # Réconciliation périodique des compteurs
+        else:
+            logger.info("🛰️ Shard secondaire : nettoyage et compteurs délégués au shard principal")
+
+        self.flush_digests.start()  # Récapitulatifs en mémoire : envoyés par chaque processus
+        outbound_queue.start(bot)  # Workers de la file d'envoi des DM
+
+    async def cog_unload(self):
+        """Arrêter les tâches lors du déchargement du cog (rechargement, ou bot.close())"""
         self.cleanup_passed_profiles.cancel()
+        self.reconcile_counters.cancel()
+        self.flush_digests.cancel()
+        outbound_queue.stop()
+
+        # Récapitulatifs en attente : envoyés directement (file arrêtée) plutôt que perdus
+        pending = notification_digest.pop_all()
+        if pending:
+            try:
+                await asyncio.wait_for(self.send_digests(pending), timeout=DIGEST_FLUSH_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"⚠️ Récapitulatifs non envoyés au déchargement (délai de {DIGEST_FLUSH_TIMEOUT}s dépassé)")
+
+        self.bot.remove_dynamic_items(CarouselButton, NotificationButton)
 
-    @tasks.loop(hours=1)
+    @tasks.loop(minutes=1)
+    @stats_registry.timed_job("nettoyage")
     async def cleanup_passed_profiles(self):
-        """Nettoyer automatiquement les profils passés après 4h"""
+        """Supprimer par lots les profils passés et likes en attente expirés"""
         try:
             await self.ensure_db_connection()
-            four_hours_ago = (datetime.now() - timedelta(hours=4)).isoformat()
+            passes_count, likes_count = await expiry_engine.purge_expired()
 
-            # Supprimer les profils passés expirés
-            async with db_instance.connection.execute(
-                "DELETE FROM passed_profiles WHERE passed_at < ?", 
-                (four_hours_ago,)
-            ) as cursor:
-                deleted_count = cursor.rowcount
-
-            await db_instance.connection.commit()
+            if passes_count > 0 or likes_count > 0:
+                logger.info(f"🧹 Nettoyage automatique: {passes_count} profils passés, {likes_count} likes expirés supprimés")
 
-            if deleted_count > 0:
-                logger.info(f"🧹 Nettoyage automatique: {deleted_count} profils passés supprimés")
+            # Carrousels trop anciens : leurs boutons répondront « expiré »
+            cutoff = (datetime.now() - timedelta(days=CAROUSEL_TTL_DAYS)).isoformat()
+            async with db_instance.writing() as conn:
+                await conn.execute("DELETE FROM match_carousels WHERE created_at < ?", (cutoff,))
 
         except Exception as e:
+            stats_registry.job_error()
             logger.error(f"❌ Erreur nettoyage automatique: {e}")
 
+    @tasks.loop(hours=6)
+    @stats_registry.timed_job("compteurs")
+    async def reconcile_counters(self):
+        """Reconstruire les compteurs matérialisés pour corriger toute dérive"""
+        try:
+            await self.ensure_db_connection()
+            drift = await db_instance.reconcile_counters()
+            if drift > 0:
+                logger.warning(f"⚠️ Compteurs réconciliés: {drift} écart(s) corrigé(s)")
+
+        except Exception as e:
+            stats_registry.job_error()
+            logger.error(f"❌ Erreur réconciliation compteurs: {e}")
+
+    @tasks.loop(minutes=1)
+    @stats_registry.timed_job("récapitulatifs")
+    async def flush_digests(self):
+        """Envoyer les récapitulatifs dont la fenêtre est écoulée"""
+        await self.send_digests(notification_digest.pop_due())
+
+    async def send_digests(self, pending: List[Tuple[str, List[Tuple]]]):
+        for recipient_id, events in pending:
+            try:
+                await self.send_digest(recipient_id, events)
+            except Exception as e:
+                stats_registry.job_error()
+                logger.error(f"❌ Erreur récapitulatif {recipient_id}: {e}")
+
     async def ensure_db_connection(self):
         """Assurer que la connexion DB est active"""
         if not await db_instance.is_connected():
@@ -55,65 +113,66 @@ class Match(commands.Cog):
         try:
             await self.ensure_db_connection()
 
-            # Table pour les profils passés (historique temporaire 4h)
-            await db_instance.connection.execute("""
-                CREATE TABLE IF NOT EXISTS passed_profiles (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    passed_profile_id TEXT NOT NULL,
-                    passed_at TEXT NOT NULL,
-                    UNIQUE(user_id, passed_profile_id)
-                )
-            """)
-
-            # Table pour les likes/intérêts
-            await db_instance.connection.execute("""
-                CREATE TABLE IF NOT EXISTS profile_likes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    liker_id TEXT NOT NULL,
-                    liked_profile_id TEXT NOT NULL,
-                    liked_at TEXT NOT NULL,
-                    status TEXT DEFAULT 'pending',
-                    UNIQUE(liker_id, liked_profile_id)
-                )
-            """)
-
-            # Table pour les matches
-            await db_instance.connection.execute("""
-                CREATE TABLE IF NOT EXISTS matches (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user1_id TEXT NOT NULL,
-                    user2_id TEXT NOT NULL,
-                    status TEXT DEFAULT 'matched',
-                    created_at TEXT NOT NULL,
-                    UNIQUE(user1_id, user2_id)
-                )
-            """)
-
-            # Table pour l'historique des matches
-            await db_instance.connection.execute("""
-                CREATE TABLE IF NOT EXISTS match_history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user1_id TEXT NOT NULL,
-                    user2_id TEXT NOT NULL,
-                    action TEXT NOT NULL,
-                    timestamp TEXT NOT NULL
-                )
-            """)
-
-            # Table pour les signalements
-            await db_instance.connection.execute("""
-                CREATE TABLE IF NOT EXISTS reports (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    reporter_id TEXT NOT NULL,
-                    reported_id TEXT NOT NULL,
-                    reason TEXT,
-                    timestamp TEXT NOT NULL,
-                    status TEXT DEFAULT 'pending'
-                )
-            """)
-
-            await db_instance.connection.commit()
+            async with db_instance.writing() as conn:
+                # Table pour les profils passés (historique temporaire 4h)
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS passed_profiles (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id TEXT NOT NULL,
+                        passed_profile_id TEXT NOT NULL,
+                        passed_at TEXT NOT NULL,
+                        expires_at TEXT,
+                        UNIQUE(user_id, passed_profile_id)
+                    )
+                """)
+
+                # Table pour les likes/intérêts
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS profile_likes (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        liker_id TEXT NOT NULL,
+                        liked_profile_id TEXT NOT NULL,
+                        liked_at TEXT NOT NULL,
+                        status TEXT DEFAULT 'pending',
+                        expires_at TEXT,
+                        UNIQUE(liker_id, liked_profile_id)
+                    )
+                """)
+
+                # Table pour les matches
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS matches (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user1_id TEXT NOT NULL,
+                        user2_id TEXT NOT NULL,
+                        status TEXT DEFAULT 'matched',
+                        created_at TEXT NOT NULL,
+                        UNIQUE(user1_id, user2_id)
+                    )
+                """)
+
+                # Table pour l'historique des matches
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS match_history (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user1_id TEXT NOT NULL,
+                        user2_id TEXT NOT NULL,
+                        action TEXT NOT NULL,
+                        timestamp TEXT NOT NULL
+                    )
+                """)
+
+                # Table pour les signalements
+                await conn.execute("""
+                    CREATE TABLE IF NOT EXISTS reports (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        reporter_id TEXT NOT NULL,
+                        reported_id TEXT NOT NULL,
+                        reason TEXT,
+                        timestamp TEXT NOT NULL,
+                        status TEXT DEFAULT 'pending'
+                    )
+                """)
             logger.info("✅ Tables vérifiées/créées")
 
         except Exception as e:
@@ -290,17 +349,25 @@ class Match(commands.Cog):
     @app_commands.command(name="findmatch", description="Trouver des correspondances compatibles")
     async def findmatch(self, interaction: discord.Interaction):
         """Recherche de correspondances avec système de pass 4h"""
-        await interaction.response.defer(ephemeral=True)
+        with trace("findmatch", user=str(interaction.user.id)):
+            await self.run_findmatch(interaction)
+
+    async def run_findmatch(self, interaction: discord.Interaction):
+        """Étapes de /findmatch, chacune dans un span de la trace en cours"""
+        with span("defer"):
+            await interaction.response.defer(ephemeral=True)
 
         try:
-            await self.ensure_tables_exist()
+            with span("ensure_tables_exist"):
+                await self.ensure_tables_exist()
             user_id = str(interaction.user.id)
 
             # Vérifier si l'utilisateur a un profil
-            async with db_instance.connection.execute(
-                "SELECT * FROM profiles WHERE user_id = ?", (user_id,)
-            ) as cursor:
-                user_profile = await cursor.fetchone()
+            with span("user_profile"):
+                async with db_instance.connection.execute(
+                    "SELECT * FROM profiles WHERE user_id = ?", (user_id,)
+                ) as cursor:
+                    user_profile = await cursor.fetchone()
 
             if not user_profile:
                 embed = discord.Embed(
@@ -311,13 +378,31 @@ class Match(commands.Cog):
                 await interaction.followup.send(embed=embed, ephemeral=True)
                 return
 
+            # DM connus comme fermés : inutile de calculer des correspondances, sauf nouvel essai
+            # (refus assez ancien : ils ont pu être rouverts, l'entrée n'est renouvelée que sur un nouveau refus)
+            with span("dm_cache"):
+                await dm_cache.ensure_loaded()
+                reachable = dm_cache.allow_reprobe(user_id)
+            if not reachable:
+                dm_cache.stats["closed_skips"] += 1
+                await interaction.followup.send(
+                    "⚠️ **Vos messages privés semblent fermés.**\n\n"
+                    "Ouvrez-les aux membres du serveur puis réessayez dans quelques minutes.",
+                    ephemeral=True
+                )
+                return
+
             logger.info(f"🔍 Findmatch: {interaction.user.name} ({user_profile[3]} ans)")
 
             # Récupérer les utilisateurs exclus (matches existants + profils passés)
-            excluded_users = await self.get_excluded_users(user_id)
+            with span("get_excluded_users"):
+                excluded_users = await self.get_excluded_users(user_id)
 
             # Récupérer les profils disponibles
-            available_profiles = await self.get_available_profiles(user_id, excluded_users)
+            with span("get_available_profiles") as stage:
+                available_profiles = await self.get_available_profiles(user_id, excluded_users)
+                if stage:
+                    stage.attrs["profiles"] = len(available_profiles)
 
             if not available_profiles:
                 embed = discord.Embed(
@@ -329,17 +414,18 @@ class Match(commands.Cog):
                 return
 
             # Calculer la compatibilité
-            matches = []
-            for profile in available_profiles:
-                try:
-                    compatibility = self.calculate_compatibility(user_profile, profile)
-                    if compatibility >= 10:  # Seuil minimum
-                        matches.append((profile, compatibility))
-                except Exception as e:
-                    logger.error(f"❌ Erreur calcul pour {profile[0]}: {e}")
-
-            # Trier par compatibilité
-            matches.sort(key=lambda x: x[1], reverse=True)
+            with span("scoring"):
+                matches = []
+                for profile in available_profiles:
+                    try:
+                        compatibility = self.calculate_compatibility(user_profile, profile)
+                        if compatibility >= 10:  # Seuil minimum
+                            matches.append((profile, compatibility))
+                    except Exception as e:
+                        logger.error(f"❌ Erreur calcul pour {profile[0]}: {e}")
+
+                # Trier par compatibilité
+                matches.sort(key=lambda x: x[1], reverse=True)
 
             if not matches:
                 embed = discord.Embed(
@@ -354,7 +440,8 @@ class Match(commands.Cog):
             top_matches = matches[:8]
 
             # Envoyer les matches en DM
-            success = await self.send_matches_dm(interaction.user, user_profile, top_matches)
+            with span("send_matches_dm"):
+                success = await self.send_matches_dm(interaction.user, user_profile, top_matches)
 
             if success:
                 await interaction.followup.send(
@@ -390,14 +477,8 @@ class Match(commands.Cog):
             matches = await cursor.fetchall()
             excluded.extend([row[0] for row in matches])
 
-        # Profils passés dans les 4 dernières heures
-        four_hours_ago = (datetime.now() - timedelta(hours=4)).isoformat()
-        async with db_instance.connection.execute(
-            "SELECT passed_profile_id FROM passed_profiles WHERE user_id = ? AND passed_at > ?",
-            (user_id, four_hours_ago)
-        ) as cursor:
-            passed = await cursor.fetchall()
-            excluded.extend([row[0] for row in passed])
+        # Profils passés non expirés (index mémoire du moteur d'expiration, ou base en multi-processus)
+        excluded.extend(await expiry_engine.active_passes(user_id))
 
         return excluded
 
@@ -425,67 +506,61 @@ class Match(commands.Cog):
             return await cursor.fetchall()
 
     async def send_matches_dm(self, user: discord.User, user_profile, matches: List[Tuple]) -> bool:
-        """Envoyer les correspondances en DM avec anonymat partiel"""
+        """Envoyer les correspondances en DM dans un seul message carrousel"""
         try:
-            dm_channel = await user.create_dm()
-
-            for i, (profile, compatibility) in enumerate(matches):
-                try:
-                    # Calculer les intérêts communs
-                    user_interests = set(self.extract_keywords(user_profile[4] or ""))
-                    profile_interests = set(self.extract_keywords(profile[4] or ""))
-                    common_interests = user_interests.intersection(profile_interests)
-
-                    embed = discord.Embed(
-                        title=f"💖 Correspondance #{i + 1}",
-                        description=f"**Compatibilité : {compatibility:.1f}%**",
-                        color=self.get_compatibility_color(compatibility)
-                    )
-
-                    # Informations révélées (PRÉNOM visible selon vos règles)
-                    embed.add_field(
-                        name="👤 Profil",
-                        value=f"**Prénom :** {profile[1]}\n**Âge :** {profile[3]} ans\n**Pronoms :** {profile[2] or 'Non spécifiés'}",
-                        inline=True
-                    )
-
-                    # Intérêts communs en premier
-                    if common_interests:
-                        common_text = ", ".join(list(common_interests)[:4])
-                        if len(common_interests) > 4:
-                            common_text += f" (+{len(common_interests)-4} autres)"
-                        embed.add_field(name="🎯 En Commun", value=common_text, inline=True)
-
-                    # Tous les intérêts
-                    if profile[4]:
-                        interests = profile[4][:300] + ("..." if len(profile[4]) > 300 else "")
-                        embed.add_field(name="💭 Intérêts", value=interests, inline=False)
-
-                    # DESCRIPTION TOUJOURS AFFICHÉE selon vos règles
-                    if len(profile) > 6 and profile[6]:
-                        description = profile[6][:400] + ("..." if len(profile[6]) > 400 else "")
-                        embed.add_field(name="📝 Description", value=description, inline=False)
-
-                    embed.set_footer(text=f"Match {i + 1}/{len(matches)} • Que souhaitez-vous faire ?")
-
-                    # Boutons d'action
-                    view = MatchActionView(self, profile[0], user_profile[0])
-
-                    await dm_channel.send(embed=embed, view=view)
-                    await asyncio.sleep(1)  # Éviter le spam
-
-                except Exception as e:
-                    logger.error(f"⚠️ Erreur envoi match {i+1}: {e}")
-                    continue
-
-            return True
+            # Un seul message : les autres fiches sont rendues à la navigation
+            with span("carousel"):
+                carousel = await MatchCarousel.create(user_profile[0], matches)
+                embed = carousel.embed(self, user_profile, matches[0][0])
+            with span("dm"):
+                message = await outbound_queue.send(
+                    self.bot, user.id, PRIORITY_MATCH, user, embed=embed, view=MatchCarouselView(carousel)
+                )
+            return message is not None
 
-        except discord.Forbidden:
-            return False
         except Exception as e:
             logger.error(f"❌ Erreur send_matches_dm: {e}")
             return False
 
+    def build_match_embed(self, user_profile, profile, compatibility: float, index: int) -> discord.Embed:
+        """Construire la fiche d'une correspondance avec anonymat partiel"""
+        # Calculer les intérêts communs
+        user_interests = set(self.extract_keywords(user_profile[4] or ""))
+        profile_interests = set(self.extract_keywords(profile[4] or ""))
+        common_interests = user_interests.intersection(profile_interests)
+
+        embed = discord.Embed(
+            title=f"💖 Correspondance #{index + 1}",
+            description=f"**Compatibilité : {compatibility:.1f}%**",
+            color=self.get_compatibility_color(compatibility)
+        )
+
+        # Informations révélées (PRÉNOM visible selon vos règles)
+        embed.add_field(
+            name="👤 Profil",
+            value=f"**Prénom :** {profile[1]}\n**Âge :** {profile[3]} ans\n**Pronoms :** {profile[2] or 'Non spécifiés'}",
+            inline=True
+        )
+
+        # Intérêts communs en premier
+        if common_interests:
+            common_text = ", ".join(list(common_interests)[:4])
+            if len(common_interests) > 4:
+                common_text += f" (+{len(common_interests)-4} autres)"
+            embed.add_field(name="🎯 En Commun", value=common_text, inline=True)
+
+        # Tous les intérêts
+        if profile[4]:
+            interests = profile[4][:300] + ("..." if len(profile[4]) > 300 else "")
+            embed.add_field(name="💭 Intérêts", value=interests, inline=False)
+
+        # DESCRIPTION TOUJOURS AFFICHÉE selon vos règles
+        if len(profile) > 6 and profile[6]:
+            description = profile[6][:400] + ("..." if len(profile[6]) > 400 else "")
+            embed.add_field(name="📝 Description", value=description, inline=False)
+
+        return embed
+
     def get_compatibility_color(self, compatibility: float) -> discord.Color:
         """Couleur selon le score de compatibilité"""
         if compatibility >= 80:
@@ -500,36 +575,47 @@ class Match(commands.Cog):
     async def record_pass(self, user_id: str, passed_profile_id: str):
         """Enregistrer un profil passé"""
         try:
-            await db_instance.connection.execute("""
-                INSERT OR REPLACE INTO passed_profiles (user_id, passed_profile_id, passed_at)
-                VALUES (?, ?, ?)
-            """, (user_id, passed_profile_id, datetime.now().isoformat()))
-
-            await db_instance.connection.commit()
+            expires_at = expiry_engine.pass_expiry()
+
+            async with db_instance.writing() as conn:
+                # Upsert plutôt que REPLACE : les triggers de compteurs restent exacts
+                await conn.execute("""
+                    INSERT INTO passed_profiles (user_id, passed_profile_id, passed_at, expires_at)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(user_id, passed_profile_id) DO UPDATE SET
+                        passed_at = excluded.passed_at,
+                        expires_at = excluded.expires_at
+                """, (user_id, passed_profile_id, datetime.now().isoformat(), expires_at))
+            await expiry_engine.ensure_loaded()
+            expiry_engine.track_pass(user_id, passed_profile_id, expires_at)
             logger.info(f"📝 Profil passé enregistré: {user_id} -> {passed_profile_id}")
 
         except Exception as e:
             logger.error(f"❌ Erreur record_pass: {e}")
 
     async def record_like(self, liker_id: str, liked_profile_id: str):
-        """Enregistrer un like"""
-        try:
-            await db_instance.connection.execute("""
-                INSERT OR REPLACE INTO profile_likes (liker_id, liked_profile_id, liked_at)
-                VALUES (?, ?, ?)
-            """, (liker_id, liked_profile_id, datetime.now().isoformat()))
-
-            await db_instance.connection.commit()
-            logger.info(f"💖 Like enregistré: {liker_id} -> {liked_profile_id}")
-
-        except Exception as e:
-            logger.error(f"❌ Erreur record_like: {e}")
+        """Enregistrer un like (et le match s'il est réciproque) en une seule transaction"""
+        liker_profile, liked_profile, is_match = await db_instance.like_profile(
+            liker_id, liked_profile_id, expiry_engine.like_expiry()
+        )
+        if liker_profile and liked_profile:
+            logger.info(f"💖 Like enregistré: {liker_id} -> {liked_profile_id}{' (match)' if is_match else ''}")
+        return liker_profile, liked_profile, is_match
 
     async def send_notification(self, target_user_id: str, liker_profile, action: str = "like"):
         """Envoyer notification AVEC boutons pour répondre directement"""
         try:
-            target_user = await self.bot.fetch_user(int(target_user_id))
-            dm_channel = await target_user.create_dm()
+            # Destinataire aux DM fermés : ne rien construire
+            await dm_cache.ensure_loaded()
+            if dm_cache.is_closed(target_user_id):
+                dm_cache.stats["closed_skips"] += 1
+                logger.info(f"🔕 Notification ignorée, DM fermés: {target_user_id}")
+                return False
+
+            # Regrouper dans le prochain récapitulatif plutôt qu'un DM par événement
+            if notification_digest.should_batch(action):
+                notification_digest.add(target_user_id, liker_profile, action)
+                return True
 
             if action == "like":
                 title = "💖 Quelqu'un s'intéresse à vous !"
@@ -564,10 +650,10 @@ class Match(commands.Cog):
 
             # Ajouter boutons seulement pour les likes
             if action == "like":
-                view = NotificationResponseView(self, liker_profile[0], target_user_id)
-                await dm_channel.send(embed=embed, view=view)
+                view = NotificationResponseView(liker_profile[0], target_user_id)
+                await outbound_queue.send(self.bot, target_user_id, PRIORITY_LIKE, wait=False, embed=embed, view=view)
             else:
-                await dm_channel.send(embed=embed)
+                await outbound_queue.send(self.bot, target_user_id, PRIORITY_PASS, wait=False, embed=embed)
 
             return True
 
@@ -575,6 +661,238 @@ class Match(commands.Cog):
             logger.error(f"❌ Erreur send_notification: {e}")
             return False
 
+    async def send_digest(self, recipient_id: str, events: List[Tuple]):
+        """Un seul DM récapitulant les likes et passes reçus pendant la fenêtre"""
+        likers = [profile for action, profile in events if action == "like"]
+        passers = [profile for action, profile in events if action == "pass"]
+
+        embed = discord.Embed(
+            title="📬 Vos dernières notifications",
+            description=f"**{len(likers)}** intérêt(s) et **{len(passers)}** profil(s) passé(s) depuis votre dernier récapitulatif.",
+            color=discord.Color.green() if likers else discord.Color.orange()
+        )
+
+        def summarize(profiles) -> str:
+            lines = [f"**{p[1]}**, {p[3]} ans" for p in profiles[:DIGEST_MAX_LINES]]
+            if len(profiles) > DIGEST_MAX_LINES:
+                lines.append(f"... et {len(profiles) - DIGEST_MAX_LINES} autre(s)")
+            return "\n".join(lines)
+
+        if likers:
+            embed.add_field(name="💖 S'intéressent à vous", value=summarize(likers), inline=False)
+            embed.add_field(name="💡 Répondre", value="Cliquez sur un prénom pour montrer votre intérêt en retour.", inline=False)
+        if passers:
+            embed.add_field(name="👋 Ont passé votre profil", value=summarize(passers), inline=False)
+
+        if likers:
+            view = DigestResponseView(recipient_id, likers)
+            await outbound_queue.send(self.bot, recipient_id, PRIORITY_LIKE, wait=False, embed=embed, view=view)
+        else:
+            await outbound_queue.send(self.bot, recipient_id, PRIORITY_PASS, wait=False, embed=embed)
+
+        notification_digest.stats["digests_sent"] += 1
+        logger.info(f"📬 Récapitulatif envoyé à {recipient_id}: {len(likers)} like(s), {len(passers)} pass")
+
+    async def accept_like(self, interaction: discord.Interaction, liker_user_id: str, target_user_id: str) -> bool:
+        """Répondre à un like reçu : like en retour et révélation si le match est créé"""
+        await self.ensure_db_connection()
+
+        # Like retour + match mutuel en une seule transaction
+        target_profile, liker_profile, is_match = await self.record_like(target_user_id, liker_user_id)
+
+        if not target_profile or not liker_profile:
+            await interaction.response.send_message("❌ Erreur : profils non trouvés.", ephemeral=True)
+            return False
+
+        if not is_match:
+            # Le like d'origine n'existe plus : simple intérêt en retour
+            await self.send_notification(liker_user_id, target_profile, "like")
+            await interaction.response.send_message(
+                "✅ **Intérêt envoyé !**\n\n"
+                "Cette personne a été notifiée de votre intérêt.",
+                ephemeral=True
+            )
+            return True
+
+        notification_digest.discard(target_user_id, liker_user_id)
+
+        # La cible est celle qui clique : elle reçoit la réponse, l'autre personne le DM
+        return await self.reveal_mutual_match(interaction, target_profile, liker_profile)
+
+    async def like_candidate(self, interaction: discord.Interaction, requester_user_id: str, target_user_id: str) -> bool:
+        """Action Intéressé - Enregistrer le like et notifier (ou révéler le match)"""
+        try:
+            await self.ensure_db_connection()
+
+            # Like + détection de réciprocité + création du match en une transaction
+            requester_profile, target_profile, is_match = await self.record_like(
+                requester_user_id, target_user_id
+            )
+
+            if not requester_profile or not target_profile:
+                await interaction.response.send_message("❌ Erreur : profil non trouvé.", ephemeral=True)
+                return False
+
+            if is_match:
+                # C'est un match mutuel ! Le like en attente de récapitulatif devient inutile
+                notification_digest.discard(requester_user_id, target_user_id)
+                return await self.reveal_mutual_match(interaction, requester_profile, target_profile)
+
+            # Simple like, envoyer notification
+            await self.send_notification(target_user_id, requester_profile, "like")
+
+            await interaction.response.send_message(
+                "✅ **Intérêt envoyé !**\n\n"
+                "Cette personne a été notifiée de votre intérêt.\n"
+                "Si elle s'intéresse aussi à vous, vous serez mis en contact ! 💕",
+                ephemeral=True
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Erreur interested: {e}")
+            await interaction.response.send_message("❌ Erreur lors de l'envoi de l'intérêt.", ephemeral=True)
+            return False
+
+    async def reveal_mutual_match(self, interaction: discord.Interaction, requester_profile, target_profile) -> bool:
+        """Révéler un match mutuel (déjà créé en base) aux deux personnes en parallèle"""
+        requester_id, target_id = requester_profile[0], target_profile[0]
+        try:
+            # Mentions construites depuis les ids : aucune résolution d'utilisateur nécessaire
+            respond = interaction.response.send_message(
+                f"🎉 **C'est un Match !**\n\n"
+                f"**{target_profile[1]}** s'intéresse aussi à vous !\n\n"
+                f"🆔 **Identité révélée :**\n"
+                f"**Discord :** <@{target_id}>\n"
+                f"**Prénom :** {target_profile[1]}\n\n"
+                f"💕 Vous pouvez maintenant vous contacter directement !",
+                ephemeral=True
+            )
+
+            embed = discord.Embed(
+                title="🎉 C'est un Match !",
+                description=f"**{requester_profile[1]}** et vous vous intéressez mutuellement !",
+                color=discord.Color.gold()
+            )
+
+            embed.add_field(
+                name="🆔 Identité révélée",
+                value=f"**Discord :** <@{requester_id}>\n**Prénom :** {requester_profile[1]}",
+                inline=False
+            )
+
+            embed.add_field(
+                name="💕 Félicitations !",
+                value="Vous pouvez maintenant vous contacter directement !",
+                inline=False
+            )
+
+            notify = outbound_queue.send(self.bot, target_id, PRIORITY_MATCH, embed=embed)
+
+            # La réponse à celui qui clique n'attend pas le DM de l'autre personne
+            response_result, dm_result = await asyncio.gather(respond, notify, return_exceptions=True)
+
+            delivered = {
+                requester_id: not isinstance(response_result, Exception),
+                target_id: dm_result is not None and not isinstance(dm_result, Exception),
+            }
+            for user_id, result in ((requester_id, response_result), (target_id, dm_result)):
+                if isinstance(result, Exception):
+                    logger.error(f"❌ Révélation du match non délivrée à {user_id}: {result}")
+                elif not delivered[user_id]:
+                    logger.warning(f"⚠️ Révélation du match non délivrée à {user_id} (DM fermés)")
+
+            await self.record_match_delivery(requester_id, target_id, delivered)
+
+            logger.info(f"🎉 Match créé: {requester_profile[1]} ↔ {target_profile[1]}")
+            return delivered[requester_id]
+
+        except Exception as e:
+            logger.error(f"❌ Erreur reveal_mutual_match: {e}")
+            if not interaction.response.is_done():
+                await interaction.response.send_message("❌ Erreur lors de la création du match.", ephemeral=True)
+            return False
+
+    async def record_match_delivery(self, requester_id: str, target_id: str, delivered: dict):
+        """Tracer dans match_history la remise de la révélation à chacun"""
+        now = datetime.now().isoformat()
+        try:
+            async with db_instance.writing() as conn:
+                await conn.executemany("""
+                    INSERT INTO match_history (user1_id, user2_id, action, timestamp)
+                    VALUES (?, ?, ?, ?)
+                """, [
+                    (user_id, other_id, "notified" if delivered[user_id] else "notify_failed", now)
+                    for user_id, other_id in ((requester_id, target_id), (target_id, requester_id))
+                ])
+        except Exception as e:
+            logger.error(f"❌ Erreur enregistrement remise du match: {e}")
+
+    async def pass_candidate(self, interaction: discord.Interaction, requester_user_id: str, target_user_id: str) -> bool:
+        """Passer une correspondance - stockage temporaire"""
+        try:
+            await self.ensure_db_connection()
+
+            # Enregistrer le pass (temporaire)
+            await self.record_pass(requester_user_id, target_user_id)
+
+            # Récupérer le profil pour notification
+            async with db_instance.connection.execute(
+                "SELECT * FROM profiles WHERE user_id = ?", (requester_user_id,)
+            ) as cursor:
+                requester_profile = await cursor.fetchone()
+
+            # Notifier la personne passée (optionnel, selon vos préférences)
+            if requester_profile:
+                await self.send_notification(target_user_id, requester_profile, "pass")
+
+            await interaction.response.send_message(
+                "⏭️ **Correspondance passée**\n\n"
+                f"Cette personne ne vous sera pas reproposée pendant {PASS_TTL_HOURS:g} heures.\n"
+                "Utilisez `/reset_passes` pour revoir tous les profils passés.",
+                ephemeral=True
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Erreur pass_match: {e}")
+            await interaction.response.send_message("❌ Erreur lors du passage.", ephemeral=True)
+            return False
+
+    async def report_candidate(self, interaction: discord.Interaction, requester_user_id: str, target_user_id: str) -> bool:
+        """Signaler une correspondance et ne plus la proposer"""
+        try:
+            await self.ensure_db_connection()
+
+            async with db_instance.writing() as conn:
+                # Enregistrer le signalement
+                await conn.execute("""
+                    INSERT INTO reports (reporter_id, reported_id, reason, timestamp)
+                    VALUES (?, ?, ?, ?)
+                """, (
+                    requester_user_id,
+                    target_user_id,
+                    "Signalé via correspondance",
+                    datetime.now().isoformat()
+                ))
+
+            # Aussi enregistrer comme passé pour ne plus le voir
+            await self.record_pass(requester_user_id, target_user_id)
+
+            await interaction.response.send_message(
+                "✅ **Profil signalé**\n\n"
+                "Merci pour votre signalement ! 🛡️\n"
+                "Les modérateurs examineront ce profil.\n\n"
+                "Ce profil ne vous sera plus proposé.",
+                ephemeral=True
+            )
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Erreur report: {e}")
+            await interaction.response.send_message("❌ Erreur lors du signalement.", ephemeral=True)
+            return False
+
     @app_commands.command(name="reset_passes", description="Réinitialiser vos profils passés (permet de les revoir)")
     async def reset_passes(self, interaction: discord.Interaction):
         """Réinitialiser les profils passés"""
@@ -597,11 +915,12 @@ class Match(commands.Cog):
                     color=discord.Color.blue()
                 )
             else:
-                # Supprimer tous les profils passés
-                await db_instance.connection.execute(
-                    "DELETE FROM passed_profiles WHERE user_id = ?", (user_id,)
-                )
-                await db_instance.connection.commit()
+                async with db_instance.writing() as conn:
+                    # Supprimer tous les profils passés
+                    await conn.execute(
+                        "DELETE FROM passed_profiles WHERE user_id = ?", (user_id,)
+                    )
+                expiry_engine.forget_passes(user_id)
 
                 embed = discord.Embed(
                     title="✅ Profils Passés Réinitialisés !",
@@ -627,46 +946,15 @@ class Match(commands.Cog):
             await self.ensure_db_connection()
             user_id = str(interaction.user.id)
 
-            # Vérifier le profil
-            async with db_instance.connection.execute(
-                "SELECT prenom FROM profiles WHERE user_id = ?", (user_id,)
-            ) as cursor:
-                profile = await cursor.fetchone()
+            # Profil + compteurs matérialisés en une lecture par clé primaire
+            stats = await db_instance.get_user_counters(user_id)
 
-            if not profile:
+            if not stats:
                 await interaction.followup.send("❌ Créez d'abord votre profil avec `/createprofile` !", ephemeral=True)
                 return
 
-            # Statistiques
-            stats = {}
-
-            # Likes donnés
-            async with db_instance.connection.execute(
-                "SELECT COUNT(*) FROM profile_likes WHERE liker_id = ?", (user_id,)
-            ) as cursor:
-                stats['likes_given'] = (await cursor.fetchone())[0]
-
-            # Likes reçus
-            async with db_instance.connection.execute(
-                "SELECT COUNT(*) FROM profile_likes WHERE liked_profile_id = ?", (user_id,)
-            ) as cursor:
-                stats['likes_received'] = (await cursor.fetchone())[0]
-
-            # Profils passés
-            async with db_instance.connection.execute(
-                "SELECT COUNT(*) FROM passed_profiles WHERE user_id = ?", (user_id,)
-            ) as cursor:
-                stats['profiles_passed'] = (await cursor.fetchone())[0]
-
-            # Matches
-            async with db_instance.connection.execute("""
-                SELECT COUNT(*) FROM matches 
-                WHERE (user1_id = ? OR user2_id = ?) AND status = 'matched'
-            """, (user_id, user_id)) as cursor:
-                stats['matches'] = (await cursor.fetchone())[0]
-
             embed = discord.Embed(
-                title=f"📊 Statistiques de {profile[0]}",
+                title=f"📊 Statistiques de {stats['prenom']}",
                 color=discord.Color.blue()
             )
 
@@ -678,7 +966,7 @@ class Match(commands.Cog):
 
             embed.add_field(
                 name="⏭️ Profils Passés",
-                value=f"{stats['profiles_passed']} (temporaire 4h)",
+                value=f"{stats['profiles_passed']} (temporaire {PASS_TTL_HOURS:g}h)",
                 inline=True
             )
 
@@ -722,10 +1010,17 @@ class Match(commands.Cog):
                 )
                 return
 
+            # Résoudre tous les utilisateurs concernés en une passe
+            users = await user_resolver.fetch_many(
+                interaction.client, [user_id for report in reports for user_id in (report[1], report[2])]
+            )
+
             for report in reports:
                 try:
-                    reporter_user = await interaction.client.fetch_user(int(report[1]))
-                    reported_user = await interaction.client.fetch_user(int(report[2]))
+                    reporter_user = users.get(int(report[1]))
+                    reported_user = users.get(int(report[2]))
+                    if not reporter_user or not reported_user:
+                        continue
 
                     embed = discord.Embed(
                         title="🚨 Signalement",
@@ -771,372 +1066,271 @@ class Match(commands.Cog):
             )
 
 
-class MatchActionView(discord.ui.View):
-    """Boutons d'action pour les correspondances"""
-
-    def __init__(self, cog, target_user_id: str, requester_user_id: str):
-        super().__init__(timeout=3600)  # 1 heure
-        self.cog = cog
-        self.target_user_id = target_user_id
-        self.requester_user_id = requester_user_id
-
-    @discord.ui.button(label="💖 Intéressé(e)", style=discord.ButtonStyle.green)
-    async def interested(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Action Intéressé - Enregistrer le like et notifier"""
-        try:
-            await self.cog.ensure_db_connection()
-
-            # Récupérer le profil du requester
-            async with db_instance.connection.execute(
-                "SELECT * FROM profiles WHERE user_id = ?", (self.requester_user_id,)
-            ) as cursor:
-                requester_profile = await cursor.fetchone()
-
-            if not requester_profile:
-                await interaction.response.send_message("❌ Erreur : profil non trouvé.", ephemeral=True)
-                return
-
-            # Enregistrer le like
-            await self.cog.record_like(self.requester_user_id, self.target_user_id)
+class MatchCarousel:
+    """État d'un carrousel /findmatch, persisté pour que les boutons restent sans état"""
+
+    ACTION_LABELS = {
+        "like": "💖 Intérêt envoyé",
+        "pass": "⏭️ Passé",
+        "report": "🚨 Signalé",
+    }
+
+    def __init__(self, carousel_id: int, user_id: str, candidates: List, position: int = 0, handled: Optional[dict] = None):
+        self.id = carousel_id
+        self.user_id = user_id
+        self.candidates = candidates  # [[profile_id, compatibilité], ...]
+        self.position = position
+        self.handled = handled or {}  # str(index) -> action effectuée
+
+    @classmethod
+    async def create(cls, user_id: str, matches: List[Tuple]) -> "MatchCarousel":
+        candidates = [[profile[0], compatibility] for profile, compatibility in matches]
+        async with db_instance.writing() as conn:
+            async with conn.execute("""
+                INSERT INTO match_carousels (user_id, candidates, created_at) VALUES (?, ?, ?)
+            """, (user_id, json.dumps(candidates), datetime.now().isoformat())) as cursor:
+                carousel_id = cursor.lastrowid
+        return cls(carousel_id, user_id, candidates)
+
+    @classmethod
+    async def load(cls, carousel_id: int) -> Optional["MatchCarousel"]:
+        async with db_instance.connection.execute(
+            "SELECT user_id, candidates, position, handled FROM match_carousels WHERE id = ?", (carousel_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if not row:
+            return None
+        return cls(carousel_id, row[0], json.loads(row[1]), row[2], json.loads(row[3]))
+
+    async def save(self):
+        async with db_instance.writing() as conn:
+            await conn.execute(
+                "UPDATE match_carousels SET position = ?, handled = ? WHERE id = ?",
+                (self.position, json.dumps(self.handled), self.id)
+            )
 
-            # Vérifier si c'est un match mutuel
-            async with db_instance.connection.execute(
-                "SELECT * FROM profile_likes WHERE liker_id = ? AND liked_profile_id = ?",
-                (self.target_user_id, self.requester_user_id)
-            ) as cursor:
-                mutual_like = await cursor.fetchone()
+    def current_target(self) -> str:
+        return self.candidates[self.position][0]
+
+    def is_handled(self, index: int) -> bool:
+        return str(index) in self.handled
+
+    def mark_handled(self, action: str):
+        """Marquer la fiche comme traitée et avancer vers la suivante non traitée"""
+        self.handled[str(self.position)] = action
+        for offset in range(1, len(self.candidates)):
+            candidate = (self.position + offset) % len(self.candidates)
+            if not self.is_handled(candidate):
+                self.position = candidate
+                break
+
+    def embed(self, cog, user_profile, profile) -> discord.Embed:
+        """Fiche de la correspondance affichée"""
+        compatibility = self.candidates[self.position][1]
+        if profile:
+            embed = cog.build_match_embed(user_profile, profile, compatibility, self.position)
+        else:
+            embed = discord.Embed(
+                title=f"💖 Correspondance #{self.position + 1}",
+                description="Ce profil n'est plus disponible.",
+                color=discord.Color.light_grey()
+            )
 
-            if mutual_like:
-                # C'est un match mutuel ! Créer la connexion
-                await self.create_mutual_match(interaction, requester_profile)
-            else:
-                # Simple like, envoyer notification sans boutons
-                await self.cog.send_notification(self.target_user_id, requester_profile, "like")
+        status = self.ACTION_LABELS.get(self.handled.get(str(self.position)), "Que souhaitez-vous faire ?")
+        embed.set_footer(text=f"Match {self.position + 1}/{len(self.candidates)} • {status}")
+        return embed
 
+    async def render(self, cog) -> Tuple[discord.Embed, "MatchCarouselView"]:
+        """Relire les deux profils et reconstruire la fiche et les boutons"""
+        async with db_instance.connection.execute(
+            "SELECT * FROM profiles WHERE user_id IN (?, ?)", (self.user_id, self.current_target())
+        ) as cursor:
+            profiles = {row[0]: row for row in await cursor.fetchall()}
+
+        profile = profiles.get(self.current_target())
+        return self.embed(cog, profiles.get(self.user_id), profile), MatchCarouselView(self, available=profile is not None)
+
+
+class CarouselButton(discord.ui.DynamicItem[discord.ui.Button], template=r"carousel:(?P<action>prev|next|like|pass|report):(?P<carousel_id>\d+)"):
+    """Bouton persistant du carrousel : l'action et l'id du carrousel sont dans le custom_id"""
+
+    BUTTONS = {
+        "prev": ("◀️ Précédent", discord.ButtonStyle.secondary, 0),
+        "next": ("Suivant ▶️", discord.ButtonStyle.secondary, 0),
+        "like": ("💖 Intéressé(e)", discord.ButtonStyle.green, 1),
+        "pass": ("⏭️ Passer", discord.ButtonStyle.gray, 1),
+        "report": ("🚨 Signaler", discord.ButtonStyle.red, 1),
+    }
+
+    def __init__(self, action: str, carousel_id: int, disabled: bool = False):
+        label, style, row = self.BUTTONS[action]
+        super().__init__(discord.ui.Button(
+            label=label, style=style, row=row, disabled=disabled,
+            custom_id=f"carousel:{action}:{carousel_id}"
+        ))
+        self.action = action
+        self.carousel_id = carousel_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match):
+        return cls(match["action"], int(match["carousel_id"]))
+
+    async def callback(self, interaction: discord.Interaction):
+        cog = interaction.client.get_cog("Match")
+        try:
+            carousel = await MatchCarousel.load(self.carousel_id)
+            if not carousel or carousel.user_id != str(interaction.user.id):
                 await interaction.response.send_message(
-                    "✅ **Intérêt envoyé !**\n\n"
-                    "Cette personne a été notifiée de votre intérêt.\n"
-                    "Si elle s'intéresse aussi à vous, vous serez mis en contact ! 💕",
-                    ephemeral=True
+                    "⌛ Ces correspondances ont expiré. Relancez `/findmatch` !", ephemeral=True
                 )
-
-            # Désactiver les boutons
-            for item in self.children:
-                item.disabled = True
-            await interaction.edit_original_response(view=self)
-
-        except Exception as e:
-            logger.error(f"❌ Erreur interested: {e}")
-            await interaction.response.send_message("❌ Erreur lors de l'envoi de l'intérêt.", ephemeral=True)
-
-    async def create_mutual_match(self, interaction: discord.Interaction, requester_profile):
-        """Créer un match mutuel et révéler les identités"""
-        try:
-            # Récupérer le profil target
-            async with db_instance.connection.execute(
-                "SELECT * FROM profiles WHERE user_id = ?", (self.target_user_id,)
-            ) as cursor:
-                target_profile = await cursor.fetchone()
-
-            if not target_profile:
-                await interaction.response.send_message("❌ Erreur : profil target non trouvé.", ephemeral=True)
                 return
 
-            # Créer le match en base
-            timestamp = datetime.now().isoformat()
-            await db_instance.connection.execute("""
-                INSERT INTO matches (user1_id, user2_id, status, created_at)
-                VALUES (?, ?, 'matched', ?)
-            """, (self.requester_user_id, self.target_user_id, timestamp))
-
-            # Enregistrer dans l'historique
-            await db_instance.connection.execute("""
-                INSERT INTO match_history (user1_id, user2_id, action, timestamp)
-                VALUES (?, ?, 'matched', ?)
-            """, (self.requester_user_id, self.target_user_id, timestamp))
-
-            await db_instance.connection.execute("""
-                INSERT INTO match_history (user1_id, user2_id, action, timestamp)
-                VALUES (?, ?, 'matched', ?)
-            """, (self.target_user_id, self.requester_user_id, timestamp))
-
-            await db_instance.connection.commit()
-
-            # Récupérer les utilisateurs Discord
-            requester_user = await self.cog.bot.fetch_user(int(self.requester_user_id))
-            target_user = await self.cog.bot.fetch_user(int(self.target_user_id))
-
-            # Désactiver les boutons AVANT de répondre
-            for item in self.children:
-                item.disabled = True
-            await interaction.edit_original_response(view=self)
-
-            # Notifier le requester (celui qui vient de cliquer)
-            await interaction.response.send_message(
-                f"🎉 **C'est un Match !**\n\n"
-                f"**{target_profile[1]}** s'intéresse aussi à vous !\n\n"
-                f"🆔 **Identité révélée :**\n"
-                f"**Discord :** {target_user.mention}\n"
-                f"**Prénom :** {target_profile[1]}\n\n"
-                f"💕 Vous pouvez maintenant vous contacter directement !",
-                ephemeral=True
-            )
-
-            # Notifier le target user
-            try:
-                target_dm = await target_user.create_dm()
-                embed = discord.Embed(
-                    title="🎉 C'est un Match !",
-                    description=f"**{requester_profile[1]}** et vous vous intéressez mutuellement !",
-                    color=discord.Color.gold()
-                )
-
-                embed.add_field(
-                    name="🆔 Identité révélée",
-                    value=f"**Discord :** {requester_user.mention}\n**Prénom :** {requester_profile[1]}",
-                    inline=False
-                )
-
-                embed.add_field(
-                    name="💕 Félicitations !",
-                    value="Vous pouvez maintenant vous contacter directement !",
-                    inline=False
-                )
-
-                await target_dm.send(embed=embed)
-
-            except Exception as e:
-                logger.error(f"❌ Erreur notification target: {e}")
-
-            logger.info(f"🎉 Match créé: {requester_profile[1]} ↔ {target_profile[1]}")
-
-        except Exception as e:
-            logger.error(f"❌ Erreur create_mutual_match: {e}")
-            await interaction.response.send_message("❌ Erreur lors de la création du match.", ephemeral=True)
-
-    @discord.ui.button(label="⏭️ Passer", style=discord.ButtonStyle.gray)
-    async def pass_match(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Passer cette correspondance - stockage temporaire 4h"""
-        try:
-            await self.cog.ensure_db_connection()
-
-            # Enregistrer le pass (temporaire 4h)
-            await self.cog.record_pass(self.requester_user_id, self.target_user_id)
-
-            # Récupérer le profil pour notification
-            async with db_instance.connection.execute(
-                "SELECT * FROM profiles WHERE user_id = ?", (self.requester_user_id,)
-            ) as cursor:
-                requester_profile = await cursor.fetchone()
-
-            # Notifier la personne passée (optionnel, selon vos préférences)
-            if requester_profile:
-                await self.cog.send_notification(self.target_user_id, requester_profile, "pass")
+            if self.action in ("prev", "next"):
+                step = -1 if self.action == "prev" else 1
+                carousel.position = min(len(carousel.candidates) - 1, max(0, carousel.position + step))
+                await carousel.save()
+                embed, view = await carousel.render(cog)
+                await interaction.response.edit_message(embed=embed, view=view)
+                return
 
-            await interaction.response.send_message(
-                "⏭️ **Correspondance passée**\n\n"
-                "Cette personne ne vous sera pas reproposée pendant 4 heures.\n"
-                "Utilisez `/reset_passes` pour revoir tous les profils passés.",
-                ephemeral=True
-            )
+            if carousel.is_handled(carousel.position):
+                await interaction.response.send_message("ℹ️ Vous avez déjà répondu à ce profil.", ephemeral=True)
+                return
 
-            # Désactiver les boutons
-            for item in self.children:
-                item.disabled = True
-            await interaction.edit_original_response(view=self)
+            # like_candidate / pass_candidate / report_candidate
+            handler = getattr(cog, f"{self.action}_candidate")
+            if await handler(interaction, carousel.user_id, carousel.current_target()):
+                carousel.mark_handled(self.action)
+                await carousel.save()
+                embed, view = await carousel.render(cog)
+                await interaction.message.edit(embed=embed, view=view)
 
         except Exception as e:
-            logger.error(f"❌ Erreur pass_match: {e}")
-            await interaction.response.send_message("❌ Erreur lors du passage.", ephemeral=True)
-
-    @discord.ui.button(label="🚨 Signaler", style=discord.ButtonStyle.red)
-    async def report(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Signaler ce profil"""
-        try:
-            await self.cog.ensure_db_connection()
-
-            # Enregistrer le signalement
-            await db_instance.connection.execute("""
-                INSERT INTO reports (reporter_id, reported_id, reason, timestamp)
-                VALUES (?, ?, ?, ?)
-            """, (
-                self.requester_user_id,
-                self.target_user_id,
-                "Signalé via correspondance",
-                datetime.now().isoformat()
+            logger.error(f"❌ Erreur bouton carrousel {self.action}: {e}")
+            if not interaction.response.is_done():
+                await interaction.response.send_message("❌ Une erreur s'est produite.", ephemeral=True)
+
+
+class MatchCarouselView(discord.ui.View):
+    """Boutons du carrousel, entièrement persistants (aucun état en mémoire)"""
+
+    def __init__(self, carousel: MatchCarousel, available: bool = True):
+        super().__init__(timeout=None)
+        last = len(carousel.candidates) - 1
+        done = carousel.is_handled(carousel.position) or not available
+        self.add_item(CarouselButton("prev", carousel.id, disabled=carousel.position == 0))
+        self.add_item(CarouselButton("next", carousel.id, disabled=carousel.position >= last))
+        for action in ("like", "pass", "report"):
+            self.add_item(CarouselButton(action, carousel.id, disabled=done))
+
+
+def disable_buttons(message: discord.Message, predicate) -> discord.ui.View:
+    """Copie des boutons d'un message, ceux qui vérifient predicate(custom_id) désactivés"""
+    view = discord.ui.View(timeout=None)
+    for row, action_row in enumerate(message.components):
+        for component in getattr(action_row, "children", []):
+            if component.type != discord.ComponentType.button:
+                continue
+            view.add_item(discord.ui.Button(
+                label=component.label, emoji=component.emoji, style=component.style, row=row,
+                custom_id=component.custom_id, url=component.url,
+                disabled=component.disabled or predicate(component.custom_id or "")
             ))
-
-            await db_instance.connection.commit()
-
-            # Aussi enregistrer comme passé pour ne plus le voir
-            await self.cog.record_pass(self.requester_user_id, self.target_user_id)
-
-            await interaction.response.send_message(
-                "✅ **Profil signalé**\n\n"
-                "Merci pour votre signalement ! 🛡️\n"
-                "Les modérateurs examineront ce profil.\n\n"
-                "Ce profil ne vous sera plus proposé.",
-                ephemeral=True
-            )
-
-            # Désactiver les boutons
-            for item in self.children:
-                item.disabled = True
-            await interaction.edit_original_response(view=self)
-
-        except Exception as e:
-            logger.error(f"❌ Erreur report: {e}")
-            await interaction.response.send_message("❌ Erreur lors du signalement.", ephemeral=True)
-
-
-class NotificationResponseView(discord.ui.View):
-    """Boutons de réponse dans les notifications de match"""
-
-    def __init__(self, cog, liker_user_id: str, target_user_id: str):
-        super().__init__(timeout=3600)  # 1 heure
-        self.cog = cog
+    # Vue terminée : rien n'est gardé en mémoire, les clics restants vont aux DynamicItem
+    view.stop()
+    return view
+
+
+class NotificationButton(discord.ui.DynamicItem[discord.ui.Button], template=r"notif:(?P<action>accept|decline|report):(?P<liker>\d+):(?P<target>\d+)"):
+    """Bouton persistant de réponse à un like (notification ou récapitulatif)"""
+
+    BUTTONS = {
+        "accept": ("💖 Intéressé(e) aussi", discord.ButtonStyle.green),
+        "decline": ("❌ Pas intéressé(e)", discord.ButtonStyle.red),
+        "report": ("🚨 Signaler", discord.ButtonStyle.gray),
+    }
+
+    def __init__(self, action: str, liker_user_id: str, target_user_id: str, label: Optional[str] = None):
+        default_label, style = self.BUTTONS[action]
+        super().__init__(discord.ui.Button(
+            label=(label or default_label)[:80], style=style,
+            custom_id=f"notif:{action}:{liker_user_id}:{target_user_id}"
+        ))
+        self.action = action
         self.liker_user_id = liker_user_id
         self.target_user_id = target_user_id
 
-    @discord.ui.button(label="💖 Intéressé(e) aussi", style=discord.ButtonStyle.green)
-    async def accept_interest(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Accepter l'intérêt - Créer un match mutuel"""
-        try:
-            await self.cog.ensure_db_connection()
-
-            # Récupérer les profils
-            async with db_instance.connection.execute(
-                "SELECT * FROM profiles WHERE user_id = ?", (self.target_user_id,)
-            ) as cursor:
-                target_profile = await cursor.fetchone()
-
-            async with db_instance.connection.execute(
-                "SELECT * FROM profiles WHERE user_id = ?", (self.liker_user_id,)
-            ) as cursor:
-                liker_profile = await cursor.fetchone()
-
-            if not target_profile or not liker_profile:
-                await interaction.response.send_message("❌ Erreur : profils non trouvés.", ephemeral=True)
-                return
-
-            # Enregistrer le like retour
-            await self.cog.record_like(self.target_user_id, self.liker_user_id)
-
-            # Créer le match mutuel
-            timestamp = datetime.now().isoformat()
-            await db_instance.connection.execute("""
-                INSERT INTO matches (user1_id, user2_id, status, created_at)
-                VALUES (?, ?, 'matched', ?)
-            """, (self.liker_user_id, self.target_user_id, timestamp))
-
-            await db_instance.connection.commit()
-
-            # Récupérer les utilisateurs Discord
-            liker_user = await self.cog.bot.fetch_user(int(self.liker_user_id))
-            target_user = await self.cog.bot.fetch_user(int(self.target_user_id))
-
-            # Répondre à celui qui vient d'accepter
-            await interaction.response.send_message(
-                f"🎉 **C'est un Match !**\n\n"
-                f"**{liker_profile[1]}** et vous vous intéressez mutuellement !\n\n"
-                f"🆔 **Identité révélée :**\n"
-                f"**Discord :** {liker_user.mention}\n"
-                f"**Prénom :** {liker_profile[1]}\n\n"
-                f"💕 Vous pouvez maintenant vous contacter directement !",
-                ephemeral=True
-            )
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match):
+        return cls(match["action"], match["liker"], match["target"], item.label)
 
-            # Notifier l'autre personne
-            try:
-                liker_dm = await liker_user.create_dm()
-                embed = discord.Embed(
-                    title="🎉 C'est un Match !",
-                    description=f"**{target_profile[1]}** s'intéresse aussi à vous !",
-                    color=discord.Color.gold()
-                )
+    async def callback(self, interaction: discord.Interaction):
+        if str(interaction.user.id) != self.target_user_id:
+            await interaction.response.send_message("❌ Cette notification ne vous est pas destinée.", ephemeral=True)
+            return
 
-                embed.add_field(
-                    name="🆔 Identité révélée",
-                    value=f"**Discord :** {target_user.mention}\n**Prénom :** {target_profile[1]}",
-                    inline=False
+        cog = interaction.client.get_cog("Match")
+        try:
+            if self.action == "accept":
+                done = await cog.accept_like(interaction, self.liker_user_id, self.target_user_id)
+            elif self.action == "decline":
+                await interaction.response.send_message(
+                    "👋 **Réponse envoyée**\n\n"
+                    "Vous avez poliment décliné cette correspondance.\n"
+                    "L'autre personne ne sera pas notifiée du refus.",
+                    ephemeral=True
                 )
+                done = True
+            else:
+                await cog.ensure_db_connection()
+
+                async with db_instance.writing() as conn:
+                    # Enregistrer le signalement
+                    await conn.execute("""
+                        INSERT INTO reports (reporter_id, reported_id, reason, timestamp)
+                        VALUES (?, ?, ?, ?)
+                    """, (
+                        self.target_user_id,
+                        self.liker_user_id,
+                        "Signalé via notification",
+                        datetime.now().isoformat()
+                    ))
 
-                embed.add_field(
-                    name="💕 Félicitations !",
-                    value="Vous pouvez maintenant vous contacter directement !",
-                    inline=False
+                await interaction.response.send_message(
+                    "✅ **Profil signalé**\n\n"
+                    "Merci pour votre signalement ! 🛡️\n"
+                    "Les modérateurs examineront ce profil.",
+                    ephemeral=True
                 )
+                done = True
 
-                await liker_dm.send(embed=embed)
-
-            except Exception as e:
-                logger.error(f"❌ Erreur notification liker: {e}")
-
-            # Désactiver les boutons
-            for item in self.children:
-                item.disabled = True
-            await interaction.edit_original_response(view=self)
-
-            logger.info(f"🎉 Match créé via notification: {liker_profile[1]} ↔ {target_profile[1]}")
+            if done:
+                # Désactiver les boutons concernant cette personne
+                marker = f":{self.liker_user_id}:"
+                await interaction.message.edit(view=disable_buttons(interaction.message, lambda custom_id: marker in custom_id))
 
         except Exception as e:
-            logger.error(f"❌ Erreur accept_interest: {e}")
-            await interaction.response.send_message("❌ Erreur lors de l'acceptation.", ephemeral=True)
-
-    @discord.ui.button(label="❌ Pas intéressé(e)", style=discord.ButtonStyle.red)
-    async def decline_interest(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Refuser l'intérêt"""
-        try:
-            await interaction.response.send_message(
-                "👋 **Réponse envoyée**\n\n"
-                "Vous avez poliment décliné cette correspondance.\n"
-                "L'autre personne ne sera pas notifiée du refus.",
-                ephemeral=True
-            )
-
-            # Désactiver les boutons
-            for item in self.children:
-                item.disabled = True
-            await interaction.edit_original_response(view=self)
+            logger.error(f"❌ Erreur réponse notification {self.action}: {e}")
+            if not interaction.response.is_done():
+                await interaction.response.send_message("❌ Une erreur s'est produite.", ephemeral=True)
 
-        except Exception as e:
-            logger.error(f"❌ Erreur decline_interest: {e}")
-            await interaction.response.send_message("❌ Erreur lors du refus.", ephemeral=True)
 
-    @discord.ui.button(label="🚨 Signaler", style=discord.ButtonStyle.gray)
-    async def report_user(self, interaction: discord.Interaction, button: discord.ui.Button):
-        """Signaler l'utilisateur"""
-        try:
-            await self.cog.ensure_db_connection()
-
-            # Enregistrer le signalement
-            await db_instance.connection.execute("""
-                INSERT INTO reports (reporter_id, reported_id, reason, timestamp)
-                VALUES (?, ?, ?, ?)
-            """, (
-                self.target_user_id,
-                self.liker_user_id,
-                "Signalé via notification",
-                datetime.now().isoformat()
-            ))
+class NotificationResponseView(discord.ui.View):
+    """Boutons de réponse dans les notifications de match"""
 
-            await db_instance.connection.commit()
+    def __init__(self, liker_user_id: str, target_user_id: str):
+        super().__init__(timeout=None)
+        for action in ("accept", "decline", "report"):
+            self.add_item(NotificationButton(action, liker_user_id, target_user_id))
 
-            await interaction.response.send_message(
-                "✅ **Profil signalé**\n\n"
-                "Merci pour votre signalement ! 🛡️\n"
-                "Les modérateurs examineront ce profil.",
-                ephemeral=True
-            )
 
-            # Désactiver les boutons
-            for item in self.children:
-                item.disabled = True
-            await interaction.edit_original_response(view=self)
+class DigestResponseView(discord.ui.View):
+    """Un bouton par personne intéressée dans le récapitulatif"""
 
-        except Exception as e:
-            logger.error(f"❌ Erreur report_user: {e}")
-            await interaction.response.send_message("❌ Erreur lors du signalement.", ephemeral=True)
+    def __init__(self, recipient_id: str, likers: List):
+        super().__init__(timeout=None)
+        for liker in likers[:DIGEST_MAX_BUTTONS]:
+            self.add_item(NotificationButton("accept", liker[0], recipient_id, label=f"💖 {liker[1]}"))
 
 
 class AdminMatchView(discord.ui.View):
@@ -1150,11 +1344,11 @@ class AdminMatchView(discord.ui.View):
     async def mark_resolved(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Marquer le signalement comme traité"""
         try:
-            await db_instance.connection.execute(
-                "UPDATE reports SET status = 'resolved' WHERE id = ?",
-                (self.report_data['id'],)
-            )
-            await db_instance.connection.commit()
+            async with db_instance.writing() as conn:
+                await conn.execute(
+                    "UPDATE reports SET status = 'resolved' WHERE id = ?",
+                    (self.report_data['id'],)
+                )
 
             await interaction.response.send_message("✅ Signalement marqué comme traité.", ephemeral=True)
 
@@ -1170,19 +1364,18 @@ class AdminMatchView(discord.ui.View):
     async def ban_profile(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Bannir le profil signalé"""
         try:
-            # Supprimer le profil
-            await db_instance.connection.execute(
-                "DELETE FROM profiles WHERE user_id = ?",
-                (self.report_data['reported_id'],)
-            )
-
-            # Marquer le signalement comme traité
-            await db_instance.connection.execute(
-                "UPDATE reports SET status = 'banned' WHERE id = ?",
-                (self.report_data['id'],)
-            )
+            async with db_instance.writing() as conn:
+                # Supprimer le profil
+                await conn.execute(
+                    "DELETE FROM profiles WHERE user_id = ?",
+                    (self.report_data['reported_id'],)
+                )
 
-            await db_instance.connection.commit()
+                # Marquer le signalement comme traité
+                await conn.execute(
+                    "UPDATE reports SET status = 'banned' WHERE id = ?",
+                    (self.report_data['id'],)
+                )
 
             await interaction.response.send_message(
                 f"🚫 Profil banni et supprimé.\nUtilisateur: {self.report_data['reported_id']}", 
@@ -1200,4 +1393,6 @@ class AdminMatchView(discord.ui.View):
 
 async def setup(bot):
     """Fonction de setup du cog"""
+    # Un gestionnaire par type de bouton, valable pour tous les messages déjà envoyés
+    bot.add_dynamic_items(CarouselButton, NotificationButton)
     await bot.add_cog(Match(bot))
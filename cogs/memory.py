@@ -0,0 +1,224 @@
+"""Instantanés mémoire : sites d'allocation (tracemalloc), objets vivants par classe, caches discord.py.
+
+Chaque instantané est comparé au précédent et écrit dans MEMORY_DIR (.tracemalloc + .json).
+Comparaison hors ligne de deux instantanés :
+
+    python -m cogs.memory logs/memory/A.tracemalloc logs/memory/B.tracemalloc [--key filename]
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import sqlite3
+import sys
+import sysconfig
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+import discord
+from .utils import logger
+
+try:
+    from discord.ui.view import BaseView
+except ImportError:
+    # discord.py < 2.6 : View est la classe de base des vues (et des formulaires)
+    BaseView = discord.ui.View
+
+MEMORY_DIR = os.getenv("MEMORY_DIR", "logs/memory")
+# Frames conservées par allocation (surcoût mémoire proportionnel) ; traçage dès le démarrage
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", "1"))
+MEMORY_TRACE_AT_STARTUP = os.getenv("MEMORY_TRACE_AT_STARTUP", "false").lower() in ("1", "true", "yes")
+
+# Instantanés conservés dans MEMORY_DIR (.tracemalloc + .json ; les plus anciens sont supprimés)
+MAX_MEMORY_SNAPSHOTS = 15
+TOP_TYPES = 15
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STDLIB = sysconfig.get_paths()["stdlib"]
+
+# Allocations du traçage lui-même et des imports exclues
+FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+# Classes suivies : libellé -> type de base (sous-classes comprises)
+TRACKED_CLASSES = (
+    ("Vues et formulaires", BaseView),
+    ("DynamicItem", discord.ui.DynamicItem),
+    ("Embeds", discord.Embed),
+    ("Lignes SQL (Row)", sqlite3.Row),
+    ("Messages", discord.Message),
+    ("Membres", discord.Member),
+    ("Utilisateurs", discord.User),
+)
+
+def _site(frame: tracemalloc.Frame) -> str:
+    filename = frame.filename
+    if filename.startswith(ROOT):
+        filename = os.path.relpath(filename, ROOT)
+    elif "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep)[-1]
+    elif filename.startswith(STDLIB):
+        filename = os.path.relpath(filename, STDLIB)
+    return f"{filename}:{frame.lineno}"
+
+def top_allocations(snapshot: tracemalloc.Snapshot, key: str = "lineno", limit: int = 10) -> List[Dict]:
+    return [
+        {"site": _site(stat.traceback[0]), "size_kb": round(stat.size / 1024, 1), "count": stat.count}
+        for stat in snapshot.statistics(key)[:limit]
+    ]
+
+def diff_allocations(new: tracemalloc.Snapshot, old: tracemalloc.Snapshot,
+                     key: str = "lineno", limit: int = 10) -> List[Dict]:
+    """Sites dont la taille a le plus varié entre deux instantanés"""
+    return [
+        {
+            "site": _site(stat.traceback[0]),
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "count_diff": stat.count_diff,
+            "size_kb": round(stat.size / 1024, 1),
+        }
+        for stat in new.compare_to(old, key)[:limit]
+        if stat.size_diff or stat.count_diff
+    ]
+
+def count_objects() -> Dict:
+    """Objets vivants suivis par le ramasse-miettes : classes clés (par sous-classe) et types les plus nombreux"""
+    tracked = {label: Counter() for label, _ in TRACKED_CLASSES}
+    types = Counter()
+    for obj in gc.get_objects():
+        cls = type(obj)
+        types[cls.__name__] += 1
+        for label, base in TRACKED_CLASSES:
+            if isinstance(obj, base):
+                tracked[label][cls.__name__] += 1
+                break
+    return {
+        "classes": {
+            label: {"total": sum(counter.values()), "by_class": dict(counter.most_common(5))}
+            for label, counter in tracked.items()
+        },
+        "types": dict(types.most_common(TOP_TYPES)),
+    }
+
+def discord_caches(bot) -> Dict:
+    """Tailles des caches internes de discord.py"""
+    state = bot._connection
+    return {
+        "users": len(state._users),
+        "guilds": len(state._guilds),
+        "members": sum(len(guild._members) for guild in state._guilds.values()),
+        "messages": len(state._messages) if state._messages is not None else 0,
+        "private_channels": len(state._private_channels),
+    }
+
+def _prune():
+    # Fichiers regroupés par instantané (même horodatage) : jamais de rapport sans son instantané
+    snapshots: Dict[str, List[str]] = {}
+    for name in os.listdir(MEMORY_DIR):
+        snapshots.setdefault(os.path.splitext(name)[0], []).append(os.path.join(MEMORY_DIR, name))
+    ordered = sorted(snapshots.values(), key=lambda paths: max(os.path.getmtime(p) for p in paths))
+    for paths in ordered[:-MAX_MEMORY_SNAPSHOTS]:
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+class MemoryInspector:
+    """Traçage tracemalloc à la demande ; garde le dernier instantané pour le différentiel"""
+
+    def __init__(self):
+        self.previous: Optional[tracemalloc.Snapshot] = None
+        self.previous_at: Optional[datetime] = None
+        self._lock = asyncio.Lock()
+
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_TRACE_FRAMES)
+            logger.info(f"🧠 tracemalloc actif ({MEMORY_TRACE_FRAMES} frame(s) par allocation)")
+
+    def stop(self):
+        """Arrêter le traçage et libérer ses structures (le prochain instantané repart de zéro)"""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("🧠 tracemalloc arrêté")
+        self.previous = None
+        self.previous_at = None
+
+    async def capture(self, bot, key: str = "lineno", limit: int = 10) -> Dict:
+        """Instantané + différentiel avec le précédent, écrits sur disque ; calcul hors de la boucle"""
+        async with self._lock:
+            just_started = not tracemalloc.is_tracing()
+            self.start()
+            caches = discord_caches(bot)
+            report = await asyncio.to_thread(self._capture, key, limit)
+            report["caches"] = caches
+            report["just_started"] = just_started
+            await asyncio.to_thread(self._write_report, report)
+            return report
+
+    def _capture(self, key: str, limit: int) -> Dict:
+        snapshot = tracemalloc.take_snapshot().filter_traces(FILTERS)
+        now = datetime.now()
+        traced, peak = tracemalloc.get_traced_memory()
+        report = {
+            "at": now.isoformat(timespec="seconds"),
+            "key": key,
+            "traced_mb": round(traced / 1024 / 1024, 2),
+            "peak_mb": round(peak / 1024 / 1024, 2),
+            "overhead_mb": round(tracemalloc.get_tracemalloc_memory() / 1024 / 1024, 2),
+            "top": top_allocations(snapshot, key, limit),
+            "previous_at": self.previous_at.isoformat(timespec="seconds") if self.previous_at else None,
+            "diff": diff_allocations(snapshot, self.previous, key, limit) if self.previous else None,
+            "objects": count_objects(),
+        }
+
+        os.makedirs(MEMORY_DIR, exist_ok=True)
+        base = os.path.join(MEMORY_DIR, now.strftime("%Y%m%d_%H%M%S"))
+        snapshot.dump(base + ".tracemalloc")
+        report["files"] = {"snapshot": base + ".tracemalloc", "report": base + ".json"}
+
+        self.previous, self.previous_at = snapshot, now
+        return report
+
+    @staticmethod
+    def _write_report(report: Dict):
+        with open(report["files"]["report"], "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        _prune()
+
+# Instance globale
+memory_inspector = MemoryInspector()
+
+# ──────────────── COMPARAISON EN LIGNE DE COMMANDE ────────────────
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Différentiel de deux instantanés tracemalloc")
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--key", choices=("lineno", "filename", "traceback"), default="lineno")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+    for path in (args.old, args.new):
+        if not os.path.exists(path):
+            print(f"❌ Fichier introuvable : {path}")
+            return 1
+
+    old = tracemalloc.Snapshot.load(args.old)
+    new = tracemalloc.Snapshot.load(args.new)
+    print(f"{'Δ Ko':>10}{'Δ nb':>10}{'total Ko':>12}  site")
+    for entry in diff_allocations(new, old, args.key, args.limit):
+        print(f"{entry['size_diff_kb']:>+10.1f}{entry['count_diff']:>+10}{entry['size_kb']:>12.1f}  {entry['site']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
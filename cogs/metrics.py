@@ -0,0 +1,341 @@
+# Métriques au format Prometheus, servies en local sur /metrics (optionnel)
+import math
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+import discord
+from aiohttp import web
+from discord import app_commands
+from discord.ext import commands
+from discord.ui.modal import Modal
+from .utils import db_instance, logger
+from .stats_registry import TimedCommandTree
+
+try:
+    from discord.ui.view import BaseView
+except ImportError:
+    # discord.py < 2.6 : View est la classe de base des vues (et des formulaires)
+    BaseView = discord.ui.View
+
+try:
+    from discord.ui.view import ViewStore
+except ImportError:
+    # Classe interne : sans elle, les DynamicItem ne sont simplement pas chronométrés
+    ViewStore = None
+
+# METRICS_ENABLED=true : instrumentation + serveur HTTP ; écoute locale par défaut
+# (bot.py n'importe ce module que dans ce cas : pas de modification de discord.py sinon)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+PREFIX = "rencontre_"
+
+# Seuils des histogrammes de latence (secondes)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and math.isnan(value):
+        return "NaN"
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Compteur monotone, une série par combinaison d'étiquettes"""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for values, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}")
+        return lines
+
+class Histogram:
+    """Histogramme cumulatif (buckets, somme, nombre) par combinaison d'étiquettes"""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple, list] = {}  # valeurs -> [compte par bucket, somme, nombre]
+
+    def observe(self, value: float, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for values, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels, values, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {count}")
+        return lines
+
+# Jauge lue au moment du scrape : liste de (valeurs d'étiquettes, valeur)
+GaugeReader = Callable[[], List[Tuple[Tuple, float]]]
+
+class Gauge:
+    """Valeur calculée à la demande depuis l'état des sous-systèmes (jauge, ou compteur déjà tenu ailleurs)"""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...], reader: GaugeReader,
+                 kind: str = "gauge"):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labels = labels
+        self.reader = reader
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            samples = self.reader()
+        except Exception as e:
+            logger.debug(f"Jauge {self.name} indisponible: {e}")
+            samples = []
+        for values, value in samples:
+            lines.append(f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}")
+        return lines
+
+# Histogramme tenu par un sous-système : (seuils, comptes par seuil, somme, nombre)
+HistogramReader = Callable[[], Tuple[Tuple[float, ...], List[int], float, int]]
+
+class CollectedHistogram:
+    """Histogramme dont les comptes sont tenus ailleurs (ex. retard de la boucle)"""
+
+    def __init__(self, name: str, documentation: str, reader: HistogramReader):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.reader = reader
+
+    def render(self) -> List[str]:
+        buckets, counts, total, count = self.reader()
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, bucket_count in zip(buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{self.name}_bucket{{le="{_format_value(bound)}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {count}')
+        lines.append(f"{self.name}_sum {_format_value(total)}")
+        lines.append(f"{self.name}_count {count}")
+        return lines
+
+class MetricsRegistry:
+    """Ensemble des métriques exposées, rendues au format texte Prometheus 0.0.4"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def gauge(self, name: str, documentation: str, labels: Tuple[str, ...], reader: GaugeReader,
+              kind: str = "gauge") -> Gauge:
+        return self.register(Gauge(name, documentation, labels, reader, kind))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Instance globale
+registry = MetricsRegistry()
+
+COMMAND_LATENCY = registry.histogram(
+    "command_duration_seconds", "Durée de traitement des commandes slash", ("command", "status"))
+COMPONENT_LATENCY = registry.histogram(
+    "component_duration_seconds", "Durée de traitement des boutons et formulaires", ("component",))
+COMPONENT_ERRORS = registry.counter(
+    "component_errors_total", "Erreurs levées par les callbacks de vues", ("component",))
+DB_QUERY_LATENCY = registry.histogram(
+    "db_query_duration_seconds", "Durée des requêtes SQLite par type d'instruction",
+    ("statement", "status"), DB_BUCKETS)
+
+# ──────────────── INSTRUMENTATION ────────────────
+
+class InstrumentedCommandTree(TimedCommandTree):
+    """Arbre chronométré qui alimente aussi l'histogramme des commandes exposé sur /metrics"""
+
+    def observe_command(self, name: str, seconds: float, ok: bool):
+        COMMAND_LATENCY.observe(seconds, name, "ok" if ok else "error")
+
+def _view_component_name(view, item) -> str:
+    callback = getattr(item, "callback", None)
+    # Boutons déclarés par décorateur : la fonction d'origine est sur _ViewCallback.callback
+    name = getattr(getattr(callback, "callback", callback), "__name__", type(item).__name__)
+    return f"{type(view).__name__}.{name}"
+
+def _dynamic_component_name(factory, match) -> str:
+    # Première partie non numérique du custom_id (l'action) : cardinalité bornée
+    action = next((g for g in match.groups() if g and not g.isdigit()), None)
+    return f"{factory.__name__}:{action}" if action else factory.__name__
+
+def _hook(cls, attr: str, make_wrapper: Callable[[Callable], Callable]) -> bool:
+    """Envelopper cls.attr une seule fois ; point de dispatch absent (autre version de discord.py) : ignoré"""
+    marker = f"_metrics_original_{attr}"
+    original = cls.__dict__.get(marker) or getattr(cls, attr, None)
+    if not callable(original):
+        logger.warning(f"⚠️ Métriques: {cls.__name__}.{attr} introuvable, non instrumenté")
+        return False
+    setattr(cls, marker, original)
+    setattr(cls, attr, make_wrapper(original))
+    return True
+
+def install_component_hooks():
+    """Chronométrer vues, DynamicItem et formulaires à leur point de dispatch commun.
+
+    Ces points sont internes à discord.py : chacun est vérifié avant d'être enveloppé.
+    Les méthodes d'origine sont conservées sur la classe : une réinstallation
+    (rechargement du module) ne les enveloppe jamais deux fois.
+    """
+    def timed_view_task(view_task):
+        async def wrapper(self, item, interaction):
+            started = time.perf_counter()
+            try:
+                await view_task(self, item, interaction)
+            finally:
+                COMPONENT_LATENCY.observe(time.perf_counter() - started, _view_component_name(self, item))
+        return wrapper
+
+    def counted_view_error(view_error):
+        async def wrapper(self, interaction, error, item):
+            COMPONENT_ERRORS.inc(_view_component_name(self, item))
+            return await view_error(self, interaction, error, item)
+        return wrapper
+
+    def timed_dynamic_call(dynamic_call):
+        async def wrapper(self, component_type, factory, interaction, custom_id, match):
+            # Les erreurs des callbacks dynamiques sont absorbées (et journalisées) par discord.py
+            started = time.perf_counter()
+            try:
+                await dynamic_call(self, component_type, factory, interaction, custom_id, match)
+            finally:
+                COMPONENT_LATENCY.observe(time.perf_counter() - started, _dynamic_component_name(factory, match))
+        return wrapper
+
+    def timed_modal_task(modal_task):
+        async def wrapper(self, interaction, *args):
+            started = time.perf_counter()
+            try:
+                await modal_task(self, interaction, *args)
+            finally:
+                COMPONENT_LATENCY.observe(time.perf_counter() - started, f"modal:{type(self).__name__}")
+        return wrapper
+
+    _hook(BaseView, "_scheduled_task", timed_view_task)
+    _hook(BaseView, "on_error", counted_view_error)
+    if ViewStore is None:
+        logger.warning("⚠️ Métriques: ViewStore introuvable, DynamicItem non instrumentés")
+    else:
+        _hook(ViewStore, "schedule_dynamic_item_call", timed_dynamic_call)
+    _hook(Modal, "_scheduled_task", timed_modal_task)
+
+def observe_query(sql: str, params, seconds: float, error: Optional[BaseException]):
+    """Observateur de requêtes de DatabaseManager"""
+    statement = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else "?"
+    DB_QUERY_LATENCY.observe(seconds, statement, "error" if error else "ok")
+
+# ──────────────── JAUGES LUES AU SCRAPE ────────────────
+
+def register_gauges(bot: commands.Bot):
+    from .digest import notification_digest
+    from .loop_monitor import loop_monitor
+    from .outbound import outbound_queue
+    from .resolver import dm_cache, user_resolver
+    from .sharding import shard_latencies
+
+    registry.gauge("cache_hit_ratio", "Part des résolutions servies sans appel HTTP", ("cache",),
+                   lambda: [(("users",), user_resolver.hit_rate())] + _dm_hit_ratio(dm_cache))
+    registry.gauge("cache_entries", "Entrées en cache", ("cache",), lambda: [
+        (("users",), len(user_resolver._cache)),
+        (("dm_channels",), len(dm_cache._channels)),
+        (("dm_closed",), len(dm_cache._closed)),
+    ])
+    registry.gauge("outbound_queue_depth", "Messages en attente dans la file d'envoi", ("priority",),
+                   lambda: [((name,), data["depth"]) for name, data in outbound_queue.metrics().items()])
+    registry.gauge("outbound_messages_total", "Messages traités par la file d'envoi", ("priority", "outcome"), lambda: [
+        ((name, outcome), data[outcome])
+        for name, data in outbound_queue.metrics().items()
+        for outcome in ("sent", "skipped", "retries", "dead")
+    ], kind="counter")
+    registry.gauge("digest_pending", "Notifications en attente de récapitulatif", (),
+                   lambda: [((), notification_digest.pending_count())])
+    registry.register(CollectedHistogram(
+        "event_loop_lag_seconds", "Retard de planification de la boucle d'événements", loop_monitor.histogram))
+    registry.gauge("event_loop_stalls_total", "Blocages de la boucle au-delà du seuil", (),
+                   lambda: [((), loop_monitor.stall_count)], kind="counter")
+    registry.gauge("gateway_latency_seconds", "Latence de la passerelle Discord", ("shard",),
+                   lambda: [((shard_id,), latency) for shard_id, latency in shard_latencies(bot)])
+
+def _dm_hit_ratio(dm_cache) -> List[Tuple[Tuple, float]]:
+    stats = dm_cache.stats
+    total = stats["channel_hits"] + stats["channels_opened"]
+    return [(("dm_channels",), stats["channel_hits"] / total if total else 0.0)]
+
+# ──────────────── SERVEUR HTTP ────────────────
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    return web.Response(body=registry.render().encode("utf-8"),
+                        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+async def start_metrics_server(bot: commands.Bot) -> web.AppRunner:
+    """Installer l'instrumentation et servir /metrics sur un serveur aiohttp local.
+
+    Module ordinaire et non extension : load_extension réexécuterait le module et
+    créerait un second registre, distinct de celui de l'arbre de commandes.
+    """
+    if not isinstance(bot.tree, InstrumentedCommandTree):
+        logger.warning("⚠️ Arbre de commandes non instrumenté : créer le bot avec tree_cls=InstrumentedCommandTree")
+    install_component_hooks()
+    db_instance.add_query_observer(observe_query)
+    register_gauges(bot)
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle_metrics)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, METRICS_HOST, METRICS_PORT).start()
+    logger.info(f"📈 Métriques exposées sur http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+    return runner
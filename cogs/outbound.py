@@ -0,0 +1,281 @@
+# File d'envoi des DM sortants : priorités, limitation par route, reprises et lettres mortes
+import asyncio
+import itertools
+import json
+import os
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Optional
+import discord
+from .resolver import dm_cache
+from .utils import db_instance, logger, percentile
+from .stats_registry import stats_registry
+
+# Classes de priorité : la plus petite valeur part en premier
+PRIORITY_MATCH = 0   # Révélations de match et résultats de /findmatch
+PRIORITY_LIKE = 1    # Notifications d'intérêt
+PRIORITY_PASS = 2    # Notifications de pass
+PRIORITY_ADMIN = 3   # Sorties administratives
+PRIORITY_NAMES = {
+    PRIORITY_MATCH: "match",
+    PRIORITY_LIKE: "like",
+    PRIORITY_PASS: "pass",
+    PRIORITY_ADMIN: "admin",
+}
+
+OUTBOUND_WORKERS = int(os.getenv("OUTBOUND_WORKERS", "4"))
+
+# Seau à jetons par salon DM (Discord : ~5 messages / 5 s) et seau global (50 requêtes / s)
+ROUTE_RATE = float(os.getenv("OUTBOUND_ROUTE_RATE", "1"))
+ROUTE_BURST = 5
+GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", "40"))
+GLOBAL_BURST = 40
+ROUTE_BUCKETS_MAX = 1000
+
+# Reprises sur 429 / 5xx : backoff exponentiel avec jitter
+OUTBOUND_MAX_ATTEMPTS = int(os.getenv("OUTBOUND_MAX_ATTEMPTS", "5"))
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+
+# Échantillons de latence conservés par priorité
+LATENCY_SAMPLES = 1000
+
+class TokenBucket:
+    """Seau à jetons : rate jetons par seconde, au plus capacity en réserve"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> float:
+        """Consommer un jeton s'il y en a un (0.0), sinon délai avant le prochain"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        """Attendre un jeton disponible puis le consommer"""
+        while True:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def idle(self) -> bool:
+        """Seau plein : aucune information à conserver"""
+        self._refill()
+        return self.tokens >= self.capacity
+
+class OutboundMessage:
+    """DM en attente d'envoi"""
+
+    def __init__(self, user_id: int, priority: int, kwargs: Dict, user: Optional[discord.abc.User] = None):
+        self.user_id = user_id
+        self.priority = priority
+        self.kwargs = kwargs
+        self.user = user
+        self.attempts = 0
+        self.enqueued_at = time.monotonic()
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    @property
+    def route(self) -> str:
+        return f"dm:{self.user_id}"
+
+    def payload(self) -> str:
+        """Contenu sérialisable pour la table des lettres mortes (les vues ne le sont pas)"""
+        embed = self.kwargs.get("embed")
+        return json.dumps({
+            "content": self.kwargs.get("content"),
+            "embed": embed.to_dict() if embed else None,
+            "view": self.kwargs.get("view") is not None,
+        }, ensure_ascii=False)
+
+class OutboundQueue:
+    """File de priorité servie par des workers, un seau à jetons par route"""
+
+    def __init__(self, workers: int = OUTBOUND_WORKERS, max_attempts: int = OUTBOUND_MAX_ATTEMPTS):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._seq = itertools.count()
+        self._tasks = []
+        # Remises en file différées (backoff, route saturée) : références gardées jusqu'à leur fin
+        self._delayed: Dict[asyncio.Task, OutboundMessage] = {}
+        self._client = None
+        self._routes: Dict[str, TokenBucket] = {}
+        self._global = TokenBucket(GLOBAL_RATE, GLOBAL_BURST)
+
+        self._depth: Dict[int, int] = {p: 0 for p in PRIORITY_NAMES}
+        self._latencies: Dict[int, Deque[float]] = {p: deque(maxlen=LATENCY_SAMPLES) for p in PRIORITY_NAMES}
+        self.stats = {p: {"sent": 0, "skipped": 0, "retries": 0, "dead": 0} for p in PRIORITY_NAMES}
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def start(self, client):
+        """Démarrer les workers (idempotent)"""
+        self._client = client
+        if self.running:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"📮 File d'envoi démarrée ({self.workers} workers)")
+
+    def stop(self):
+        """Arrêter les workers ; les messages en attente sont abandonnés (appelants débloqués avec None)"""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+        pending = []
+        for task, job in self._delayed.items():
+            task.cancel()
+            pending.append(job)
+        self._delayed.clear()
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait()[2])
+            self._queue.task_done()
+
+        for job in pending:
+            self._depth[job.priority] -= 1
+            if not job.future.done():
+                job.future.set_result(None)
+        if pending:
+            logger.warning(f"⚠️ File d'envoi arrêtée : {len(pending)} message(s) en attente abandonné(s)")
+
+    async def send(self, client, user_id, priority: int, user: Optional[discord.abc.User] = None,
+                   wait: bool = True, **kwargs) -> Optional[discord.Message]:
+        """Envoyer un DM par la file ; sans attente, retourne None dès la mise en file"""
+        if not self.running:
+            # File non démarrée (scripts, tests) : envoi direct
+            return await dm_cache.send(client, user_id, user, **kwargs)
+
+        job = OutboundMessage(int(user_id), priority, kwargs, user)
+        self._put(job)
+
+        if wait:
+            return await job.future
+        return None
+
+    def _put(self, job: OutboundMessage):
+        self._depth[job.priority] += 1
+        self._queue.put_nowait((job.priority, next(self._seq), job))
+
+    def _requeue_later(self, job: OutboundMessage, delay: float):
+        """Remettre un message en file après un délai, sans bloquer de worker"""
+        task = asyncio.create_task(self._requeue_after(job, delay))
+        self._delayed[task] = job
+        task.add_done_callback(lambda done: self._delayed.pop(done, None))
+
+    async def _requeue_after(self, job: OutboundMessage, delay: float):
+        await asyncio.sleep(delay)
+        self._queue.put_nowait((job.priority, next(self._seq), job))
+
+    def _route_bucket(self, route: str) -> TokenBucket:
+        bucket = self._routes.get(route)
+        if bucket is None:
+            if len(self._routes) >= ROUTE_BUCKETS_MAX:
+                self._routes = {k: b for k, b in self._routes.items() if not b.idle()}
+            bucket = self._routes[route] = TokenBucket(ROUTE_RATE, ROUTE_BURST)
+        return bucket
+
+    def _backoff(self, job: OutboundMessage, error: discord.HTTPException) -> float:
+        """Délai avant la prochaine tentative : retry_after de Discord sinon exponentiel, avec jitter"""
+        retry_after = getattr(error, "retry_after", None)
+        delay = retry_after if retry_after else min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (job.attempts - 1))
+        return delay * random.uniform(1.0, 1.5)
+
+    async def _worker(self):
+        while True:
+            _, _, job = await self._queue.get()
+            try:
+                await self._deliver(job)
+            except asyncio.CancelledError:
+                # stop() pendant la remise : le message en cours est abandonné, l'appelant débloqué
+                self._finish(job, None)
+                raise
+            except Exception as e:
+                logger.error(f"❌ Erreur file d'envoi: {e}")
+                self._finish(job, None)
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, job: OutboundMessage):
+        # Route saturée : le message attend hors des workers, qui servent les autres routes
+        wait = self._route_bucket(job.route).try_acquire()
+        if wait:
+            self._requeue_later(job, wait)
+            return
+        await self._global.acquire()
+
+        job.attempts += 1
+        try:
+            message = await dm_cache.send(self._client, job.user_id, job.user, **job.kwargs)
+
+        except discord.HTTPException as e:
+            retryable = e.status == 429 or e.status >= 500
+            if retryable and job.attempts < self.max_attempts:
+                delay = self._backoff(job, e)
+                self.stats[job.priority]["retries"] += 1
+                logger.warning(f"⏳ DM vers {job.user_id} reporté de {delay:.1f}s (HTTP {e.status}, essai {job.attempts})")
+                self._requeue_later(job, delay)
+                return
+
+            await self._dead_letter(job, f"HTTP {e.status}: {e.text}")
+            self._finish(job, None)
+            return
+
+        self.stats[job.priority]["sent" if message else "skipped"] += 1
+        self._finish(job, message)
+
+    def _finish(self, job: OutboundMessage, message: Optional[discord.Message]):
+        self._depth[job.priority] -= 1
+        self._latencies[job.priority].append(time.monotonic() - job.enqueued_at)
+        if not job.future.done():
+            job.future.set_result(message)
+
+    async def _dead_letter(self, job: OutboundMessage, error: str):
+        """Conserver un message abandonné pour analyse"""
+        self.stats[job.priority]["dead"] += 1
+        logger.error(f"📭 DM abandonné vers {job.user_id} après {job.attempts} essai(s): {error}")
+
+        try:
+            async with db_instance.writing() as conn:
+                await conn.execute("""
+                    INSERT INTO outbound_dead_letters (user_id, priority, payload, error, attempts, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (str(job.user_id), PRIORITY_NAMES[job.priority], job.payload(), error,
+                      job.attempts, datetime.now().isoformat()))
+        except Exception as e:
+            logger.error(f"❌ Erreur enregistrement lettre morte: {e}")
+
+    def metrics(self) -> Dict[str, Dict]:
+        """Profondeur, compteurs et latences (ms) de mise en file à l'envoi, par priorité"""
+        result = {}
+        for priority, name in PRIORITY_NAMES.items():
+            samples = self._latencies[priority]
+            result[name] = {
+                "depth": self._depth[priority],
+                **self.stats[priority],
+                "p50_ms": round(percentile(samples, 0.50) * 1000, 1),
+                "p95_ms": round(percentile(samples, 0.95) * 1000, 1),
+                "p99_ms": round(percentile(samples, 0.99) * 1000, 1),
+            }
+        return result
+
+# Instance globale
+outbound_queue = OutboundQueue()
+stats_registry.register("outbound", outbound_queue.metrics)
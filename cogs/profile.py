@@ -1,7 +1,7 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from .utils import db_instance, serialize_interests
+from .utils import db_instance, serialize_interests, logger
 import json
 import re
 
@@ -117,28 +117,27 @@ class ProfileModal(discord.ui.Modal):
             # Récupérer l'avatar
             avatar_url = str(interaction.user.display_avatar.url) if interaction.user.display_avatar else None
 
-            if self.existing_profile:
-                # Mise à jour
-                await db_instance.connection.execute("""
-                    UPDATE profiles 
-                    SET prenom = ?, pronoms = ?, age = ?, interets = ?, 
-                        description = ?, avatar_url = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE user_id = ?
-                """, (prenom_clean, self.pronoms.value, age_value, interests_json, 
-                      self.description.value, avatar_url, user_id))
-
-                action = "modifié"
-            else:
-                # Création
-                await db_instance.connection.execute("""
-                    INSERT INTO profiles (user_id, prenom, pronoms, age, interets, description, avatar_url)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (user_id, prenom_clean, self.pronoms.value, age_value, interests_json, 
-                      self.description.value, avatar_url))
-
-                action = "créé"
-
-            await db_instance.connection.commit()
+            async with db_instance.writing() as conn:
+                if self.existing_profile:
+                    # Mise à jour
+                    await conn.execute("""
+                        UPDATE profiles 
+                        SET prenom = ?, pronoms = ?, age = ?, interets = ?, 
+                            description = ?, avatar_url = ?, updated_at = CURRENT_TIMESTAMP
+                        WHERE user_id = ?
+                    """, (prenom_clean, self.pronoms.value, age_value, interests_json, 
+                          self.description.value, avatar_url, user_id))
+
+                    action = "modifié"
+                else:
+                    # Création
+                    await conn.execute("""
+                        INSERT INTO profiles (user_id, prenom, pronoms, age, interets, description, avatar_url)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                    """, (user_id, prenom_clean, self.pronoms.value, age_value, interests_json, 
+                          self.description.value, avatar_url))
+
+                    action = "créé"
 
             # Créer l'embed de confirmation
             embed = discord.Embed(
@@ -165,7 +164,7 @@ class ProfileModal(discord.ui.Modal):
             await interaction.response.send_message(embed=embed, ephemeral=True)
 
         except Exception as e:
-            print(f"❌ Erreur ProfileModal.on_submit: {e}")
+            logger.error(f"❌ Erreur ProfileModal.on_submit: {e}")
             await interaction.response.send_message(
                 "❌ Une erreur s'est produite lors de la sauvegarde. Veuillez réessayer.",
                 ephemeral=True
@@ -197,7 +196,7 @@ class Profile(commands.Cog):
             await interaction.response.send_modal(modal)
 
         except Exception as e:
-            print(f"❌ Erreur createprofile: {e}")
+            logger.error(f"❌ Erreur createprofile: {e}")
             await interaction.response.send_message(
                 "❌ Une erreur s'est produite. Veuillez réessayer.",
                 ephemeral=True
@@ -292,7 +291,7 @@ class Profile(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
 
         except Exception as e:
-            print(f"❌ Erreur viewprofile: {e}")
+            logger.error(f"❌ Erreur viewprofile: {e}")
             await interaction.response.send_message(
                 "❌ Une erreur s'est produite lors de l'affichage du profil.",
                 ephemeral=True
@@ -337,7 +336,7 @@ class Profile(commands.Cog):
             await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
 
         except Exception as e:
-            print(f"❌ Erreur deleteprofile: {e}")
+            logger.error(f"❌ Erreur deleteprofile: {e}")
             await interaction.response.send_message(
                 "❌ Une erreur s'est produite. Veuillez réessayer.",
                 ephemeral=True
@@ -354,13 +353,12 @@ class DeleteConfirmView(discord.ui.View):
     @discord.ui.button(label="✅ Confirmer la suppression", style=discord.ButtonStyle.red)
     async def confirm_delete(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
-            # Supprimer toutes les données de l'utilisateur
-            await db_instance.connection.execute("DELETE FROM profiles WHERE user_id = ?", (self.user_id,))
-            await db_instance.connection.execute("DELETE FROM matches WHERE user1_id = ? OR user2_id = ?", (self.user_id, self.user_id))
-            await db_instance.connection.execute("DELETE FROM match_history WHERE user1_id = ? OR user2_id = ?", (self.user_id, self.user_id))
-            await db_instance.connection.execute("DELETE FROM reports WHERE reporter_id = ? OR reported_id = ?", (self.user_id, self.user_id))
-
-            await db_instance.connection.commit()
+            async with db_instance.writing() as conn:
+                # Supprimer toutes les données de l'utilisateur
+                await conn.execute("DELETE FROM profiles WHERE user_id = ?", (self.user_id,))
+                await conn.execute("DELETE FROM matches WHERE user1_id = ? OR user2_id = ?", (self.user_id, self.user_id))
+                await conn.execute("DELETE FROM match_history WHERE user1_id = ? OR user2_id = ?", (self.user_id, self.user_id))
+                await conn.execute("DELETE FROM reports WHERE reporter_id = ? OR reported_id = ?", (self.user_id, self.user_id))
 
             await interaction.response.send_message(
                 f"✅ **Profil supprimé définitivement**\n\n"
@@ -370,7 +368,7 @@ class DeleteConfirmView(discord.ui.View):
             )
 
         except Exception as e:
-            print(f"❌ Erreur confirm_delete: {e}")
+            logger.error(f"❌ Erreur confirm_delete: {e}")
             await interaction.response.send_message(
                 "❌ Erreur lors de la suppression. Veuillez contacter un administrateur.",
                 ephemeral=True
@@ -0,0 +1,231 @@
+# Profilage à la demande en production : échantillonnage de pile et/ou cProfile, sessions bornées
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+from .utils import logger
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "logs/profiles")
+
+# Limites strictes : durée et nombre d'interactions par session, période d'échantillonnage minimale
+PROFILE_MAX_SECONDS = int(os.getenv("PROFILE_MAX_SECONDS", "120"))
+PROFILE_MAX_INTERACTIONS = 100
+PROFILE_SAMPLE_MS = max(1.0, float(os.getenv("PROFILE_SAMPLE_MS", "5")))
+MAX_STACK_DEPTH = 64
+MAX_DISTINCT_STACKS = 20000
+# Fichiers conservés dans PROFILE_DIR (les plus anciens sont supprimés)
+MAX_PROFILE_FILES = 40
+
+MODES = ("sampling", "cprofile")
+
+class StackSampler:
+    """Fil qui relève la pile du fil de la boucle à intervalle fixe (piles repliées « a;b;c »)"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.idle = 0
+        self.dropped = 0
+        self.active = threading.Event()  # échantillonner seulement quand positionné
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.active.is_set():
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            if frame.f_code.co_name == "select" and frame.f_code.co_filename.endswith("selectors.py"):
+                # Boucle en attente d'E/S : pas du temps CPU du bot
+                self.idle += 1
+                continue
+            names = []
+            while frame is not None and len(names) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            key = ";".join(reversed(names))
+            if key in self.stacks or len(self.stacks) < MAX_DISTINCT_STACKS:
+                self.stacks[key] += 1
+            else:
+                self.dropped += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Format de flamegraph.pl / speedscope : « pile compte » par ligne"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = 10) -> List[tuple]:
+        """Fonctions les plus souvent au sommet de la pile (temps propre)"""
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return leaves.most_common(limit)
+
+class ProfilingSession:
+    """Une session : N secondes, ou N interactions d'une commande (bornée par la durée)"""
+
+    def __init__(self, mode: str, seconds: int, command: Optional[str] = None, interactions: int = 0):
+        if mode not in MODES:
+            raise ValueError(f"Mode inconnu: {mode}")
+        self.mode = mode
+        self.seconds = max(1, min(seconds, PROFILE_MAX_SECONDS))
+        self.command = command
+        self.interactions = max(1, min(interactions, PROFILE_MAX_INTERACTIONS)) if command else 0
+        self.completed = 0
+        self.in_flight = 0
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.finished = asyncio.Event()
+        self.files: Dict[str, str] = {}
+        self.summary = ""
+        self._profile: Optional[cProfile.Profile] = cProfile.Profile() if mode == "cprofile" else None
+        self._sampler = StackSampler(threading.get_ident(), PROFILE_SAMPLE_MS / 1000)
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def start(self):
+        self._sampler.start()
+        if not self.command:
+            self._activate()
+        self._timer = asyncio.get_running_loop().call_later(self.seconds, self.finished.set)
+
+    def _activate(self):
+        self._sampler.active.set()
+        if self._profile:
+            self._profile.enable()
+
+    def _deactivate(self):
+        self._sampler.active.clear()
+        if self._profile:
+            self._profile.disable()
+
+    # Appelés par l'arbre de commandes autour de chaque commande slash
+    def command_started(self, name: str):
+        if name != self.command or self.finished.is_set():
+            return
+        self.in_flight += 1
+        if self.in_flight == 1:
+            self._activate()
+
+    def command_finished(self, name: str):
+        if name != self.command or self.in_flight == 0:
+            return
+        self.in_flight -= 1
+        self.completed += 1
+        if self.in_flight == 0:
+            self._deactivate()
+        if self.completed >= self.interactions:
+            self.finished.set()
+
+    def stop(self):
+        """Arrêter la mesure (fil de la boucle : cProfile ne désactive que le fil appelant)"""
+        if self._timer:
+            self._timer.cancel()
+        self._deactivate()
+        self.finished.set()
+
+    def write(self) -> Dict[str, str]:
+        """Écrire les fichiers de la session (appelable hors de la boucle, une fois stop() fait)"""
+        self._sampler.stop()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        target = self.command or "global"
+        base = os.path.join(PROFILE_DIR, f"{self.started_at.strftime('%Y%m%d_%H%M%S')}_{self.mode}_{target}")
+        files = {}
+
+        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+            f.write(self._sampler.collapsed())
+        files["collapsed"] = base + ".collapsed"
+
+        lines = [
+            f"Session {self.mode} · {target} · {time.perf_counter() - self.started:.1f}s · "
+            + (f"{self.completed} interactions · " if self.command else "")
+            + f"{self._sampler.samples} échantillons "
+            f"(+{self._sampler.idle} boucle inactive)"
+            + (f" ({self._sampler.dropped} ignorés)" if self._sampler.dropped else ""),
+            "",
+            "Fonctions au sommet de la pile (échantillons) :",
+        ]
+        lines += [f"{count:>7}  {name}" for name, count in self._sampler.top_functions(20)]
+
+        if self._profile:
+            self._profile.dump_stats(base + ".pstats")
+            files["pstats"] = base + ".pstats"
+            buffer = io.StringIO()
+            pstats.Stats(self._profile, stream=buffer).sort_stats("cumulative").print_stats(30)
+            lines += ["", buffer.getvalue()]
+
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        files["summary"] = base + ".txt"
+        self.summary = "\n".join(lines[:13])
+
+        _prune_profiles()
+        return files
+
+def _prune_profiles():
+    entries = sorted(
+        (os.path.join(PROFILE_DIR, name) for name in os.listdir(PROFILE_DIR)),
+        key=os.path.getmtime
+    )
+    for path in entries[:-MAX_PROFILE_FILES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+class Profiler:
+    """Une session à la fois ; le bot continue de servir pendant la mesure"""
+
+    def __init__(self):
+        self.session: Optional[ProfilingSession] = None
+
+    def busy(self) -> bool:
+        return self.session is not None
+
+    async def run(self, mode: str, seconds: int, command: Optional[str] = None,
+                  interactions: int = 0) -> ProfilingSession:
+        if self.session is not None:
+            raise RuntimeError("Une session de profilage est déjà en cours")
+
+        session = ProfilingSession(mode, seconds, command, interactions)
+        self.session = session
+        logger.info(f"🔬 Profilage {mode} démarré ({command or 'global'}, {session.seconds}s max)")
+        try:
+            session.start()
+            await session.finished.wait()
+        finally:
+            self.session = None
+            session.stop()
+            # Arrêt du fil d'échantillonnage et écriture des fichiers hors de la boucle
+            session.files = await asyncio.to_thread(session.write)
+        logger.info(f"🔬 Profilage terminé : {', '.join(session.files.values())}")
+        return session
+
+    def command_started(self, name: str):
+        if self.session:
+            self.session.command_started(name)
+
+    def command_finished(self, name: str):
+        if self.session:
+            self.session.command_finished(name)
+
+# Instance globale
+profiler = Profiler()
@@ -0,0 +1,174 @@
+# Profilage SQL : agrégation par forme de requête, journal des requêtes lentes, EXPLAIN QUERY PLAN
+import asyncio
+import os
+import re
+import sqlite3
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from .utils import db_instance, logger
+from .stats_registry import stats_registry
+
+# SQL_PROFILER_ENABLED=false retire l'observateur ; seuil des requêtes lentes en ms
+SQL_PROFILER_ENABLED = os.getenv("SQL_PROFILER_ENABLED", "true").lower() in ("1", "true", "yes")
+SQL_SLOW_MS = float(os.getenv("SQL_SLOW_MS", "50"))
+
+# Au-delà, les nouvelles formes sont regroupées (SQL construit dynamiquement)
+MAX_SHAPES = 500
+OTHER_SHAPE = "<autres requêtes>"
+
+# Une requête lente d'une même forme n'est journalisée qu'une fois par intervalle
+SLOW_LOG_INTERVAL = 60
+
+# Instructions pour lesquelles un plan d'exécution a un sens
+EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT", "REPLACE")
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_COMMENT = re.compile(r"--[^\n]*")
+_SPACES = re.compile(r"\s+")
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql: str) -> str:
+    """Forme de la requête : littéraux remplacés par ?, listes IN repliées, espaces compactés"""
+    shape = _COMMENT.sub(" ", sql)
+    shape = _STRING.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _IN_LIST.sub("IN (?, ...)", shape)
+    return _SPACES.sub(" ", shape).strip()
+
+def explain_query_plan(db_path: str, sql: str, params) -> Tuple[List[str], List[str]]:
+    """Plan d'exécution et tables parcourues sans index.
+
+    Connexion séparée en lecture seule : un curseur ouvert sur la connexion partagée
+    empêcherait les commits des autres coroutines.
+    """
+    connection = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        plan = [row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+    finally:
+        connection.close()
+
+    # "SCAN table" sans index : parcours complet (les CTE et sous-requêtes sont ignorées)
+    scans = []
+    for detail in plan:
+        words = detail.split()
+        if words[0] == "SCAN" and len(words) > 1 and words[1] in tables and "INDEX" not in detail:
+            scans.append(words[1])
+    return plan, scans
+
+class QueryStats:
+    """Compteurs d'une forme de requête"""
+
+    __slots__ = ("count", "total", "max", "errors", "slow", "plan", "scans", "last_logged")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+        self.slow = 0
+        self.plan: Optional[List[str]] = None
+        self.scans: List[str] = []
+        self.last_logged = 0.0
+
+class QueryProfiler:
+    """Observateur de DatabaseManager : temps cumulé par forme de requête"""
+
+    def __init__(self, slow_ms: float = SQL_SLOW_MS):
+        self.slow = slow_ms / 1000
+        self.shapes: Dict[str, QueryStats] = {}
+        self.started = time.monotonic()
+        self._explaining: set = set()
+
+    def install(self):
+        db_instance.add_query_observer(self.observe)
+
+    def uninstall(self):
+        db_instance.remove_query_observer(self.observe)
+
+    def reset(self):
+        self.shapes.clear()
+        self.started = time.monotonic()
+
+    def observe(self, sql: str, params, seconds: float, error: Optional[BaseException]):
+        shape = normalize_sql(sql)
+        if shape.upper().startswith("EXPLAIN"):
+            return
+
+        stats = self.shapes.get(shape)
+        if stats is None:
+            if len(self.shapes) >= MAX_SHAPES:
+                shape = OTHER_SHAPE
+            stats = self.shapes.setdefault(shape, QueryStats())
+
+        stats.count += 1
+        stats.total += seconds
+        stats.max = max(stats.max, seconds)
+        if error:
+            stats.errors += 1
+
+        if seconds >= self.slow and shape != OTHER_SHAPE:
+            stats.slow += 1
+            self._on_slow(shape, stats, sql, params, seconds)
+
+    def _on_slow(self, shape: str, stats: QueryStats, sql: str, params, seconds: float):
+        now = time.monotonic()
+        if stats.plan is None and shape not in self._explaining and shape.split(" ", 1)[0].upper() in EXPLAINABLE:
+            # Plan capturé une seule fois par forme, hors du chemin de la requête
+            self._explaining.add(shape)
+            asyncio.get_running_loop().create_task(self._explain(shape, stats, sql, params, seconds))
+        elif now - stats.last_logged >= SLOW_LOG_INTERVAL:
+            stats.last_logged = now
+            scans = f" — SCAN {', '.join(stats.scans)}" if stats.scans else ""
+            logger.warning(f"🐢 Requête lente ({seconds * 1000:.1f} ms, {stats.slow}×){scans}: {shape[:200]}")
+
+    async def _explain(self, shape: str, stats: QueryStats, sql: str, params, seconds: float):
+        if params is None:
+            # executemany : paramètres non conservés, liaison à NULL pour obtenir le plan
+            params = [None] * sql.count("?")
+        try:
+            stats.plan, stats.scans = await asyncio.to_thread(explain_query_plan, db_instance.db_path, sql, params)
+        except Exception as e:
+            stats.plan = [f"EXPLAIN impossible: {e}"]
+        finally:
+            self._explaining.discard(shape)
+
+        stats.last_logged = time.monotonic()
+        flag = f" ⚠️ SCAN {', '.join(stats.scans)}" if stats.scans else ""
+        logger.warning(f"🐢 Requête lente ({seconds * 1000:.1f} ms){flag}: {shape[:200]}"
+                       + "".join(f"\n   {line}" for line in stats.plan))
+
+    def top(self, limit: int = 10, key: str = "total") -> List[Dict]:
+        """Formes les plus coûteuses : tri par temps cumulé, nombre, maximum ou lenteurs"""
+        ordered = sorted(self.shapes.items(), key=lambda item: getattr(item[1], key), reverse=True)
+        return [
+            {
+                "sql": shape,
+                "count": stats.count,
+                "total_ms": stats.total * 1000,
+                "avg_ms": stats.total * 1000 / stats.count if stats.count else 0.0,
+                "max_ms": stats.max * 1000,
+                "errors": stats.errors,
+                "slow": stats.slow,
+                "scans": list(stats.scans),
+                "plan": stats.plan,
+            }
+            for shape, stats in ordered[:limit]
+        ]
+
+    def metrics(self) -> Dict:
+        return {
+            "shapes": len(self.shapes),
+            "queries": sum(stats.count for stats in self.shapes.values()),
+            "total_ms": round(sum(stats.total for stats in self.shapes.values()) * 1000, 1),
+            "slow": sum(stats.slow for stats in self.shapes.values()),
+            "scans": sorted({table for stats in self.shapes.values() for table in stats.scans}),
+            "since_seconds": round(time.monotonic() - self.started),
+        }
+
+# Instance globale
+query_profiler = QueryProfiler()
+stats_registry.register("sql", query_profiler.metrics)
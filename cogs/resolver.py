@@ -0,0 +1,245 @@
+# Résolution des utilisateurs Discord avec cache, coalescence et limite de concurrence
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+import discord
+from .utils import db_instance, logger
+from .stats_registry import stats_registry
+
+# Durée de vie d'un utilisateur récupéré par HTTP
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL_SECONDS", "900"))
+USER_CACHE_MAX_SIZE = 10000
+
+# Requêtes fetch_user simultanées au maximum
+FETCH_CONCURRENCY = int(os.getenv("USER_FETCH_CONCURRENCY", "5"))
+
+# Délai avant de retenter un utilisateur dont les DM étaient fermés
+DM_CLOSED_TTL_HOURS = float(os.getenv("DM_CLOSED_TTL_HOURS", "24"))
+# Une commande de l'utilisateur peut retenter plus tôt, une fois ce délai écoulé depuis le refus
+DM_REPROBE_MINUTES = float(os.getenv("DM_REPROBE_MINUTES", "10"))
+
+class UserResolver:
+    """get_user (cache gateway) → cache TTL → fetch_user HTTP coalescé"""
+
+    def __init__(self, ttl: float = USER_CACHE_TTL, concurrency: int = FETCH_CONCURRENCY,
+                 max_size: int = USER_CACHE_MAX_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._cache: Dict[int, Tuple[float, discord.User]] = {}
+        self._inflight: Dict[int, asyncio.Future] = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.stats = {
+            "gateway_hits": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "fetches": 0,
+            "errors": 0,
+        }
+
+    async def fetch(self, client, user_id) -> discord.User:
+        """Résoudre un utilisateur ; lève les mêmes erreurs que fetch_user"""
+        user_id = int(user_id)
+
+        user = client.get_user(user_id)
+        if user:
+            self.stats["gateway_hits"] += 1
+            return user
+
+        entry = self._cache.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            self.stats["cache_hits"] += 1
+            return entry[1]
+
+        # Une requête est déjà en vol pour cet id : l'attendre
+        pending = self._inflight.get(user_id)
+        if pending:
+            self.stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise  # Cet appelant lui-même a été annulé
+                # Requête partagée annulée avec son appelant : la relancer
+                return await self.fetch(client, user_id)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[user_id] = future
+        try:
+            async with self._semaphore:
+                self.stats["fetches"] += 1
+                user = await client.fetch_user(user_id)
+
+            self._store(user_id, user)
+            future.set_result(user)
+            return user
+
+        except Exception as e:
+            self.stats["errors"] += 1
+            future.set_exception(e)
+            future.exception()  # Marquer l'exception comme récupérée
+            raise
+
+        finally:
+            # Annulation (CancelledError) : débloquer les appelants en attente
+            if not future.done():
+                future.cancel()
+            if self._inflight.get(user_id) is future:
+                del self._inflight[user_id]
+
+    async def fetch_many(self, client, user_ids: Iterable) -> Dict[int, Optional[discord.User]]:
+        """Résoudre plusieurs utilisateurs en parallèle (None si introuvable)"""
+        ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+
+        async def resolve(user_id: int) -> Optional[discord.User]:
+            try:
+                return await self.fetch(client, user_id)
+            except discord.HTTPException as e:
+                logger.warning(f"⚠️ Utilisateur {user_id} introuvable: {e}")
+                return None
+
+        users = await asyncio.gather(*(resolve(user_id) for user_id in ids))
+        return dict(zip(ids, users))
+
+    def _store(self, user_id: int, user: discord.User):
+        if len(self._cache) >= self.max_size:
+            now = time.monotonic()
+            self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            # Toujours plein : retirer les entrées les plus anciennes
+            while len(self._cache) >= self.max_size:
+                self._cache.pop(next(iter(self._cache)))
+
+        self._cache[user_id] = (time.monotonic() + self.ttl, user)
+
+    def hit_rate(self) -> float:
+        """Part des résolutions servies sans requête HTTP"""
+        hits = self.stats["gateway_hits"] + self.stats["cache_hits"] + self.stats["coalesced"]
+        total = hits + self.stats["fetches"]
+        return hits / total if total else 0.0
+
+    def metrics(self) -> Dict:
+        return {**self.stats, "cache_size": len(self._cache), "hit_rate": round(self.hit_rate(), 3)}
+
+class DMChannelCache:
+    """Cache des salons DM par utilisateur et cache négatif persistant des DM fermés"""
+
+    def __init__(self, resolver: UserResolver, db, closed_ttl_hours: float = DM_CLOSED_TTL_HOURS,
+                 max_size: int = USER_CACHE_MAX_SIZE, reprobe_minutes: float = DM_REPROBE_MINUTES):
+        self.resolver = resolver
+        self.db = db
+        self.closed_ttl = timedelta(hours=closed_ttl_hours)
+        self.reprobe_after = timedelta(minutes=reprobe_minutes)
+        self.max_size = max_size
+        self._channels: Dict[int, discord.abc.Messageable] = {}
+        self._closed: Dict[int, str] = {}  # user_id -> expires_at
+        self._loaded = False
+        self.stats = {
+            "channel_hits": 0,
+            "channels_opened": 0,
+            "closed_skips": 0,
+            "closed_detected": 0,
+            "reprobes": 0,
+            "reprobes_ok": 0,
+        }
+
+    async def ensure_loaded(self):
+        """Charger les DM fermés non expirés depuis la base"""
+        if self._loaded:
+            return
+
+        async with self.db.connection.execute(
+            "SELECT user_id, expires_at FROM dm_closed WHERE expires_at > ?",
+            (datetime.now().isoformat(),)
+        ) as cursor:
+            rows = await cursor.fetchall()
+
+        self._closed = {int(user_id): expires_at for user_id, expires_at in rows}
+        self._loaded = True
+
+    def is_closed(self, user_id) -> bool:
+        """DM connus comme fermés (un TTL expiré autorise une nouvelle tentative)"""
+        expires_at = self._closed.get(int(user_id))
+        return expires_at is not None and expires_at > datetime.now().isoformat()
+
+    def allow_reprobe(self, user_id) -> bool:
+        """Action explicite de l'utilisateur : un envoi peut-il être tenté ?
+
+        Oui si les DM ne sont pas connus comme fermés, ou si le refus date de plus de
+        reprobe_after (nouvel essai avant la fin du TTL). L'entrée reste alors connue :
+        mark_open l'efface si l'envoi passe, mark_closed la renouvelle sinon.
+        """
+        user_id = int(user_id)
+        if not self.is_closed(user_id):
+            return True
+        closed_at = datetime.fromisoformat(self._closed[user_id]) - self.closed_ttl
+        if datetime.now() - closed_at < self.reprobe_after:
+            return False
+        self._closed[user_id] = datetime.now().isoformat()
+        self.stats["reprobes"] += 1
+        return True
+
+    async def get_channel(self, client, user_id, user: Optional[discord.abc.User] = None):
+        """Salon DM d'un utilisateur, ouvert une seule fois"""
+        user_id = int(user_id)
+        channel = self._channels.get(user_id)
+        if channel:
+            self.stats["channel_hits"] += 1
+            return channel
+
+        user = user or await self.resolver.fetch(client, user_id)
+        channel = user.dm_channel or await user.create_dm()
+        self.stats["channels_opened"] += 1
+
+        if len(self._channels) >= self.max_size:
+            self._channels.pop(next(iter(self._channels)))
+        self._channels[user_id] = channel
+        return channel
+
+    async def mark_closed(self, user_id):
+        """Mémoriser (et persister) des DM fermés"""
+        user_id = int(user_id)
+        expires_at = (datetime.now() + self.closed_ttl).isoformat()
+        self._closed[user_id] = expires_at
+        self.stats["closed_detected"] += 1
+
+        async with self.db.writing() as conn:
+            await conn.execute("""
+                INSERT INTO dm_closed (user_id, closed_at, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET closed_at = excluded.closed_at, expires_at = excluded.expires_at
+            """, (str(user_id), datetime.now().isoformat(), expires_at))
+        logger.info(f"🔕 DM fermés pour {user_id} (nouvel essai dans {self.closed_ttl})")
+
+    async def mark_open(self, user_id):
+        """Oublier un utilisateur dont les DM sont de nouveau ouverts"""
+        user_id = int(user_id)
+        if self._closed.pop(user_id, None) is not None:
+            self.stats["reprobes_ok"] += 1
+            async with self.db.writing() as conn:
+                await conn.execute("DELETE FROM dm_closed WHERE user_id = ?", (str(user_id),))
+
+    async def send(self, client, user_id, user: Optional[discord.abc.User] = None, **kwargs) -> Optional[discord.Message]:
+        """Envoyer un DM ; None si les DM sont fermés (connus ou détectés)"""
+        await self.ensure_loaded()
+        if self.is_closed(user_id):
+            self.stats["closed_skips"] += 1
+            return None
+
+        channel = await self.get_channel(client, user_id, user)
+        try:
+            message = await channel.send(**kwargs)
+        except discord.Forbidden:
+            await self.mark_closed(user_id)
+            return None
+
+        await self.mark_open(user_id)
+        return message
+
+    def metrics(self) -> Dict:
+        return {**self.stats, "channels": len(self._channels), "closed": len(self._closed)}
+
+# Instances globales
+user_resolver = UserResolver()
+dm_cache = DMChannelCache(user_resolver, db_instance)
+stats_registry.register("users", user_resolver.metrics)
+stats_registry.register("dm", dm_cache.metrics)
@@ -25,13 +25,10 @@ class Setup(commands.Cog):
             # Vérifier les tables
             await db_instance.create_tables()
 
-            # Compter les profils existants
-            async with db_instance.connection.execute("SELECT COUNT(*) FROM profiles") as cursor:
-                profile_count = (await cursor.fetchone())[0]
-
-            # Compter les matches
-            async with db_instance.connection.execute("SELECT COUNT(*) FROM matches") as cursor:
-                match_count = (await cursor.fetchone())[0]
+            # Compter les profils et les matches (compteurs matérialisés)
+            counters = await db_instance.get_global_counters()
+            profile_count = counters['total_profiles']
+            match_count = counters['total_matches']
 
             # Vérifier les cogs chargés
             cog_status = []
@@ -0,0 +1,40 @@
+# Mode shardé optionnel (AutoShardedBot) et garde des tâches globales
+import os
+from typing import List, Optional, Tuple
+from discord.ext import commands
+
+# BOT_SHARDED=true active AutoShardedBot ; SHARD_COUNT vide = nombre recommandé par Discord
+SHARDED = os.getenv("BOT_SHARDED", "false").lower() in ("1", "true", "yes")
+SHARD_COUNT = int(os.getenv("SHARD_COUNT")) if os.getenv("SHARD_COUNT") else None
+
+# Plusieurs processus : shards gérés par celui-ci (ex. "0,1"), vide = tous
+SHARD_IDS = [int(s) for s in os.getenv("SHARD_IDS", "").split(",") if s.strip()] or None
+
+# Les tâches globales (nettoyage, compteurs) tournent sur le processus qui porte ce shard
+PRIMARY_SHARD_ID = 0
+
+def create_bot(**kwargs) -> commands.Bot:
+    """Bot simple, ou AutoShardedBot si BOT_SHARDED est activé"""
+    if not SHARDED:
+        return commands.Bot(**kwargs)
+
+    if SHARD_IDS and SHARD_COUNT is None:
+        raise ValueError("SHARD_IDS exige SHARD_COUNT")
+    return commands.AutoShardedBot(shard_count=SHARD_COUNT, shard_ids=SHARD_IDS, **kwargs)
+
+def is_primary_shard(bot) -> bool:
+    """Ce processus doit-il exécuter les tâches globales ?"""
+    shard_ids: Optional[List[int]] = getattr(bot, "shard_ids", None)
+    if isinstance(bot, commands.AutoShardedBot):
+        # Sans shard_ids explicites, le processus gère tous les shards
+        return shard_ids is None or PRIMARY_SHARD_ID in shard_ids
+
+    # Bot simple : shard unique, ou shard_id fixé à la main
+    return getattr(bot, "shard_id", None) in (None, PRIMARY_SHARD_ID)
+
+def shard_latencies(bot) -> List[Tuple[int, float]]:
+    """Latence de la passerelle par shard (un seul élément hors mode shardé)"""
+    latencies = getattr(bot, "latencies", None)
+    if latencies:
+        return list(latencies)
+    return [(getattr(bot, "shard_id", None) or 0, bot.latency)]
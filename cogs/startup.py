@@ -0,0 +1,111 @@
+# Orchestration du démarrage : phases indépendantes en parallèle, chronométrées
+import asyncio
+import importlib
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from .utils import db_instance, init_database, logger
+
+class StartupPipeline:
+    """Exécute et chronomètre les phases du démarrage"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ready_at: Optional[float] = None
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self._background: List[asyncio.Task] = []
+
+    def record(self, name: str, seconds: float):
+        self.timings[name] = seconds
+
+    async def phase(self, name: str, awaitable: Awaitable):
+        """Exécuter une phase en mesurant sa durée ; les erreurs sont conservées puis relancées"""
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        except Exception as e:
+            self.errors[name] = e
+            raise
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    async def parallel(self, *phases: Tuple[str, Awaitable]) -> List:
+        """Phases indépendantes en parallèle ; une erreur n'interrompt pas les autres"""
+        return await asyncio.gather(
+            *(self.phase(name, awaitable) for name, awaitable in phases),
+            return_exceptions=True
+        )
+
+    def background(self, name: str, awaitable: Awaitable) -> asyncio.Task:
+        """Phase non bloquante (préchauffage) poursuivie pendant la connexion"""
+        async def run():
+            try:
+                await self.phase(name, awaitable)
+                logger.info(f"🔥 {name} terminé en {self.timings[name]:.2f}s")
+            except Exception as e:
+                logger.error(f"❌ Erreur {name}: {e}")
+
+        task = asyncio.create_task(run())
+        self._background.append(task)
+        return task
+
+    async def wait_background(self):
+        if self._background:
+            await asyncio.gather(*self._background)
+
+    def mark_ready(self):
+        """Le minimum est prêt : la connexion à la passerelle peut commencer"""
+        self.ready_at = time.perf_counter() - self.started
+
+    def report(self) -> str:
+        lines = [f"⏱️ Démarrage en {time.perf_counter() - self.started:.2f}s"
+                 + (f" (prêt à se connecter après {self.ready_at:.2f}s)" if self.ready_at is not None else "")]
+        for name, seconds in self.timings.items():
+            status = " ❌" if name in self.errors else ""
+            lines.append(f"   - {name}: {seconds:.2f}s{status}")
+        return "\n".join(lines)
+
+def import_modules(names: Iterable[str]) -> Awaitable:
+    """Importer les modules des cogs dans un thread (bytecode et dépendances mis en cache)"""
+    names = list(names)
+    return asyncio.to_thread(lambda: [importlib.import_module(name) for name in names])
+
+async def warm_caches():
+    """Charger les index mémoire et les pages chaudes de la base"""
+    from .expiry import expiry_engine
+    from .resolver import dm_cache
+
+    await asyncio.gather(expiry_engine.ensure_loaded(), dm_cache.ensure_loaded())
+
+    # Lecture des index utilisés par /findmatch et /stats pour les amener en cache
+    for query in (
+        "SELECT COUNT(*) FROM profiles INDEXED BY idx_profiles_age",
+        "SELECT COUNT(*) FROM matches",
+        "SELECT * FROM global_counters WHERE id = 1",
+    ):
+        async with db_instance.connection.execute(query) as cursor:
+            await cursor.fetchall()
+
+async def prepare(cogs: List[str], load_cogs: Callable[[], Awaitable]) -> StartupPipeline:
+    """Schéma et imports en parallèle, puis chargement des cogs ; le préchauffage continue en fond"""
+    pipeline = StartupPipeline()
+
+    # Observateur SQL installé avant la connexion : le schéma et le préchauffage sont profilés aussi
+    from .query_profiler import SQL_PROFILER_ENABLED, query_profiler
+    if SQL_PROFILER_ENABLED:
+        query_profiler.install()
+    from .memory import MEMORY_TRACE_AT_STARTUP, memory_inspector
+    if MEMORY_TRACE_AT_STARTUP:
+        memory_inspector.start()
+
+    await pipeline.parallel(
+        ("base de données", init_database()),
+        ("imports", import_modules(cogs)),
+    )
+    await pipeline.phase("cogs", load_cogs())
+    pipeline.mark_ready()
+
+    if db_instance.connection:
+        pipeline.background("préchauffage", warm_caches())
+
+    return pipeline
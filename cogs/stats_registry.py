@@ -0,0 +1,193 @@
+# Registre central des statistiques internes, lu par /perf
+import functools
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional
+import discord
+from discord import app_commands
+from .utils import db_instance, logger, percentile
+from .profiler import profiler
+
+# Durées conservées par commande pour les percentiles récents
+COMMAND_WINDOW = 500
+
+# Entrée de la tâche de fond en cours (job()), pour les erreurs absorbées par la boucle elle-même
+_current_job: ContextVar[Optional[Dict]] = ContextVar("current_job", default=None)
+
+class StatsRegistry:
+    """Les sous-systèmes y publient une source (fonction -> dict) ; /perf lit un instantané"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self._sources: Dict[str, Callable[[], Dict]] = {}
+        self.commands: Dict[str, Dict] = {}
+        self.jobs: Dict[str, Dict] = {}
+
+    def register(self, name: str, source: Callable[[], Dict]):
+        self._sources[name] = source
+
+    def snapshot(self) -> Dict[str, Dict]:
+        result = {}
+        for name, source in self._sources.items():
+            try:
+                result[name] = source()
+            except Exception as e:
+                logger.debug(f"Source de statistiques {name} indisponible: {e}")
+                result[name] = {"error": str(e)}
+        return result
+
+    # ──────────────── COMMANDES ────────────────
+
+    def record_command(self, name: str, seconds: float, ok: bool = True):
+        entry = self.commands.get(name)
+        if entry is None:
+            entry = self.commands[name] = {"durations": deque(maxlen=COMMAND_WINDOW), "count": 0, "errors": 0}
+        entry["durations"].append(seconds)
+        entry["count"] += 1
+        if not ok:
+            entry["errors"] += 1
+
+    def command_stats(self) -> List[Dict]:
+        """Percentiles récents par commande, les plus utilisées en premier"""
+        result = []
+        for name, entry in self.commands.items():
+            durations: Deque[float] = entry["durations"]
+            result.append({
+                "command": name,
+                "count": entry["count"],
+                "errors": entry["errors"],
+                "p50_ms": round(percentile(durations, 0.50) * 1000, 1),
+                "p95_ms": round(percentile(durations, 0.95) * 1000, 1),
+            })
+        return sorted(result, key=lambda item: item["count"], reverse=True)
+
+    # ──────────────── TÂCHES DE FOND ────────────────
+
+    @asynccontextmanager
+    async def job(self, name: str):
+        """Chronométrer une exécution de tâche de fond (dernière exécution, durée, erreurs)"""
+        entry = self.jobs.setdefault(name, {"runs": 0, "errors": 0, "last_run": None, "last_duration": None})
+        started = time.perf_counter()
+        entry["last_run"] = datetime.now()
+        token = _current_job.set(entry)
+        try:
+            yield
+        except Exception:
+            entry["errors"] += 1
+            raise
+        finally:
+            _current_job.reset(token)
+            entry["runs"] += 1
+            entry["last_duration"] = time.perf_counter() - started
+
+    def job_error(self):
+        """Compter une erreur que la tâche de fond en cours absorbe (bloc except qui journalise)"""
+        entry = _current_job.get()
+        if entry is not None:
+            entry["errors"] += 1
+
+    def timed_job(self, name: str):
+        """Décorateur de coroutine (sous @tasks.loop) équivalent à `async with job(name)`"""
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                async with self.job(name):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+# Instance globale
+stats_registry = StatsRegistry()
+
+# ──────────────── ARBRE DE COMMANDES ────────────────
+
+class TimedCommandTree(app_commands.CommandTree):
+    """Arbre de commandes qui chronomètre chaque commande slash pour /perf et /profile"""
+
+    async def _call(self, interaction: discord.Interaction):
+        started = time.perf_counter()
+        # Session /profile ciblée sur une commande : nom de premier niveau connu avant la résolution
+        target = (interaction.data or {}).get("name") \
+            if interaction.type is discord.InteractionType.application_command else None
+        if target:
+            profiler.command_started(target)
+        try:
+            await super()._call(interaction)
+        finally:
+            if target:
+                profiler.command_finished(target)
+            if interaction.type is discord.InteractionType.application_command:
+                command = interaction.command
+                name = command.qualified_name if command else (interaction.data or {}).get("name", "inconnue")
+                ok = not interaction.command_failed
+                seconds = time.perf_counter() - started
+                stats_registry.record_command(name, seconds, ok)
+                self.observe_command(name, seconds, ok)
+
+    def observe_command(self, name: str, seconds: float, ok: bool):
+        """Point d'extension appelé après chaque commande (histogramme Prometheus de cogs/metrics.py)"""
+
+# ──────────────── SOURCES DU PROCESSUS ────────────────
+
+def _current_rss() -> Optional[int]:
+    """RSS actuelle en octets (psutil, sinon /proc sous Linux), None si indisponible"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def process_stats() -> Dict:
+    rss = _current_rss()
+    if rss is not None:
+        memory = {"rss_mb": round(rss / 1024 / 1024, 1)}
+    else:
+        import resource
+        # Seul le pic est connu (Ko sous Linux, octets sous macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak *= 1 if sys.platform == "darwin" else 1024
+        memory = {"rss_peak_mb": round(peak / 1024 / 1024, 1)}
+    return {
+        **memory,
+        "threads": threading.active_count(),
+        "uptime_seconds": round(time.monotonic() - stats_registry.started),
+        "pid": os.getpid(),
+    }
+
+def db_stats() -> Dict:
+    connection = db_instance.connection
+    waiters = getattr(db_instance.write_lock, "_waiters", None)
+    return {
+        "connected": connection is not None,
+        "in_transaction": bool(connection and connection.in_transaction),
+        "write_locked": db_instance.write_lock.locked(),
+        "write_waiters": len(waiters) if waiters else 0,
+        "observers": len(db_instance.query_observers),
+    }
+
+def view_stats(bot) -> Dict:
+    """Vues et composants vivants dans le ViewStore de discord.py"""
+    store = bot._connection._view_store
+    views = {id(item.view) for items in store._views.values() for item in items.values() if item.view}
+    return {
+        "views": len(views),
+        "components": sum(len(items) for items in store._views.values()),
+        "persistent": len(store.persistent_views),
+        "message_views": len(store._synced_message_views),
+        "modals": len(store._modals),
+        "dynamic_items": len(store._dynamic_items),
+    }
+
+stats_registry.register("process", process_stats)
+stats_registry.register("db", db_stats)
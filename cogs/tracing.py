@@ -0,0 +1,184 @@
+"""Traces par étapes : arbre de spans chronométrés par interaction (contextvars).
+
+    with trace("findmatch", user=user_id):
+        with span("get_available_profiles"):
+            ...
+
+Une fraction des appels est échantillonnée (TRACE_SAMPLE_RATE) ; hors échantillon,
+span() ne coûte qu'une lecture de contextvar. Les traces plus lentes que TRACE_SLOW_MS
+sont ajoutées au fichier JSONL TRACE_FILE, résumé par étape avec :
+
+    python -m cogs.tracing logs/traces.jsonl [--name findmatch]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+from .utils import percentile
+
+# Fraction des appels tracés (0 désactive), seuil d'écriture et fichier des traces lentes
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "500"))
+TRACE_FILE = os.getenv("TRACE_FILE", "logs/traces.jsonl")
+
+class Span:
+    """Étape chronométrée ; les sous-étapes ouvertes pendant sa durée deviennent ses enfants"""
+
+    __slots__ = ("name", "attrs", "started", "duration", "children", "error")
+
+    def __init__(self, name: str, attrs: Dict):
+        self.name = name
+        self.attrs = attrs
+        self.started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.children: List["Span"] = []
+        self.error: Optional[str] = None
+
+    def finish(self):
+        self.duration = time.perf_counter() - self.started
+
+    def to_dict(self, origin: float) -> Dict:
+        data = {
+            "name": self.name,
+            "start_ms": round((self.started - origin) * 1000, 3),
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+        }
+        if self.attrs:
+            data["attrs"] = self.attrs
+        if self.error:
+            data["error"] = self.error
+        if self.children:
+            data["children"] = [child.to_dict(origin) for child in self.children]
+        return data
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+@contextmanager
+def span(name: str, **attrs):
+    """Sous-étape de la trace en cours ; sans trace échantillonnée, ne fait rien"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    child = Span(name, attrs)
+    parent.children.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = type(e).__name__
+        raise
+    finally:
+        child.finish()
+        _current_span.reset(token)
+
+@contextmanager
+def trace(name: str, sample_rate: Optional[float] = None, **attrs):
+    """Racine d'une trace (une interaction), échantillonnée ; écrite si plus lente que le seuil"""
+    rate = TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    if _current_span.get() is not None:
+        # Déjà dans une trace : simple sous-étape
+        with span(name, **attrs) as child:
+            yield child
+        return
+    if rate <= 0 or random.random() >= rate:
+        yield None
+        return
+
+    root = Span(name, attrs)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.error = type(e).__name__
+        raise
+    finally:
+        root.finish()
+        _current_span.reset(token)
+        if root.duration * 1000 >= TRACE_SLOW_MS:
+            _write(root)
+
+def _write(root: Span):
+    record = {"timestamp": datetime.now().isoformat(), **root.to_dict(root.started)}
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        _append(line)
+    else:
+        # Écriture hors de la boucle d'événements
+        loop.run_in_executor(None, _append, line)
+
+def _append(line: str):
+    directory = os.path.dirname(TRACE_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(TRACE_FILE, "a", encoding="utf-8") as f:
+        f.write(line)
+
+# ──────────────── RÉSUMÉ EN LIGNE DE COMMANDE ────────────────
+
+def _collect(node: Dict, path: str, durations: Dict[str, List[float]]):
+    path = f"{path}/{node['name']}" if path else node["name"]
+    durations[path].append(node["duration_ms"])
+    # Même étape répétée dans un parent (boucle) : une seule mesure cumulée par trace
+    grouped: Dict[str, Dict] = {}
+    for child in node.get("children", []):
+        if child["name"] in grouped:
+            grouped[child["name"]]["duration_ms"] += child["duration_ms"]
+        else:
+            grouped[child["name"]] = dict(child)
+    for child in grouped.values():
+        _collect(child, path, durations)
+
+def summarize(path: str, name: Optional[str] = None) -> str:
+    """p50/p95 par étape des traces d'un fichier JSONL"""
+    durations: Dict[str, List[float]] = defaultdict(list)
+    traces = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if name and record["name"] != name:
+                continue
+            traces += 1
+            _collect(record, "", durations)
+
+    if not traces:
+        return "Aucune trace."
+
+    width = max(len(p) for p in durations) + 2
+    lines = [f"{traces} trace(s) — {path}",
+             f"{'étape'.ljust(width)}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"]
+    for stage in durations:
+        values = durations[stage]
+        depth = stage.count("/")
+        label = ("  " * depth + stage.rsplit("/", 1)[-1]).ljust(width)
+        lines.append(f"{label}{len(values):>6}{statistics.median(values):>10.1f}"
+                     f"{percentile(values, 0.95):>10.1f}{max(values):>10.1f}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Résumé des traces lentes par étape")
+    parser.add_argument("file", nargs="?", default=TRACE_FILE)
+    parser.add_argument("--name", help="Ne garder que les traces de cette racine (ex. findmatch)")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.file):
+        print(f"❌ Fichier introuvable : {args.file}")
+        return 1
+    print(summarize(args.file, args.name))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
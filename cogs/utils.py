@@ -1,27 +1,322 @@
 import aiosqlite
+import asyncio
 import logging
 import os
+import queue
+import atexit
+import copy
 import json
+import time
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime
-from typing import Optional, List, Dict, Any
-
-# Configuration du logger
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/bot.log'),
-        logging.StreamHandler()
-    ]
-)
+from typing import Optional, List, Dict, Any, Tuple, Callable
+
+# Configuration du logger : fichier tournant, JSON optionnel, niveaux par module
+LOG_FILE = os.getenv("LOG_FILE", "logs/bot.log")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_JSON = os.getenv("LOG_JSON", "false").lower() in ("1", "true", "yes")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Ex. "discord=WARNING,discord.gateway=INFO,cogs.utils=DEBUG"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement (ingestion par un collecteur de logs)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+        }
+        exception = self.formatException(record.exc_info) if record.exc_info else record.exc_text
+        if exception:
+            data["exception"] = exception
+        return json.dumps(data, ensure_ascii=False)
+
+class LogQueueHandler(QueueHandler):
+    """Message résolu dans le fil appelant ; la trace reste à part pour le format JSON"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def setup_logging() -> QueueListener:
+    """Les handlers lents (fichier, console) tournent dans le fil du QueueListener :
+    un appel logger.info() sur la boucle ne fait qu'ajouter l'enregistrement à une file."""
+    directory = os.path.dirname(LOG_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    formatter = JsonFormatter() if LOG_JSON else logging.Formatter(LOG_FORMAT)
+    file_handler = RotatingFileHandler(LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT,
+                                       encoding="utf-8")
+    console_handler = logging.StreamHandler()
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.addHandler(LogQueueHandler(log_queue))
+
+    # Niveau invalide : avertissement une fois les handlers en place, plutôt qu'un arrêt au démarrage
+    invalid = []
+    try:
+        root.setLevel(LOG_LEVEL)
+    except ValueError:
+        root.setLevel(logging.INFO)
+        invalid.append(f"LOG_LEVEL={LOG_LEVEL}")
+    for entry in filter(None, (part.strip() for part in LOG_LEVELS.split(","))):
+        name, _, level = entry.partition("=")
+        try:
+            logging.getLogger(name.strip()).setLevel(level.strip().upper())
+        except ValueError:
+            invalid.append(f"LOG_LEVELS: {entry}")
+
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    for setting in invalid:
+        logging.getLogger(__name__).warning(f"⚠️ Niveau de log invalide ignoré ({setting})")
+    # Vider la file à l'arrêt du processus
+    atexit.register(listener.stop)
+    return listener
+
+log_listener = setup_logging()
 logger = logging.getLogger(__name__)
 
+# Colonnes ajoutées aux tables existantes (table, colonne, déclaration)
+COLUMN_MIGRATIONS = [
+    ("passed_profiles", "expires_at", "TEXT"),
+    ("profile_likes", "expires_at", "TEXT"),
+    ("profiles", "avatar_url", "TEXT"),
+]
+
+# Triggers qui maintiennent user_counters / global_counters à chaque écriture
+COUNTER_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_likes_insert AFTER INSERT ON profile_likes
+    BEGIN
+        INSERT INTO user_counters (user_id, likes_given) VALUES (NEW.liker_id, 1)
+            ON CONFLICT(user_id) DO UPDATE SET likes_given = likes_given + 1;
+        INSERT INTO user_counters (user_id, likes_received) VALUES (NEW.liked_profile_id, 1)
+            ON CONFLICT(user_id) DO UPDATE SET likes_received = likes_received + 1;
+        UPDATE global_counters SET total_likes = total_likes + 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_likes_delete AFTER DELETE ON profile_likes
+    BEGIN
+        UPDATE user_counters SET likes_given = likes_given - 1 WHERE user_id = OLD.liker_id;
+        UPDATE user_counters SET likes_received = likes_received - 1 WHERE user_id = OLD.liked_profile_id;
+        UPDATE global_counters SET total_likes = total_likes - 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_passes_insert AFTER INSERT ON passed_profiles
+    BEGIN
+        INSERT INTO user_counters (user_id, profiles_passed) VALUES (NEW.user_id, 1)
+            ON CONFLICT(user_id) DO UPDATE SET profiles_passed = profiles_passed + 1;
+        UPDATE global_counters SET total_passes = total_passes + 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_passes_delete AFTER DELETE ON passed_profiles
+    BEGIN
+        UPDATE user_counters SET profiles_passed = profiles_passed - 1 WHERE user_id = OLD.user_id;
+        UPDATE global_counters SET total_passes = total_passes - 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_matches_insert AFTER INSERT ON matches
+    BEGIN
+        INSERT INTO user_counters (user_id, matches)
+            SELECT NEW.user1_id, 1 WHERE NEW.status = 'matched'
+            ON CONFLICT(user_id) DO UPDATE SET matches = matches + 1;
+        INSERT INTO user_counters (user_id, matches)
+            SELECT NEW.user2_id, 1 WHERE NEW.status = 'matched'
+            ON CONFLICT(user_id) DO UPDATE SET matches = matches + 1;
+        UPDATE global_counters SET total_matches = total_matches + 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_matches_delete AFTER DELETE ON matches
+    BEGIN
+        UPDATE user_counters SET matches = matches - 1
+            WHERE OLD.status = 'matched' AND user_id IN (OLD.user1_id, OLD.user2_id);
+        UPDATE global_counters SET total_matches = total_matches - 1 WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_matches_status AFTER UPDATE OF status ON matches
+    WHEN (OLD.status = 'matched') != (NEW.status = 'matched')
+    BEGIN
+        UPDATE user_counters
+            SET matches = matches + (CASE WHEN NEW.status = 'matched' THEN 1 ELSE -1 END)
+            WHERE user_id IN (NEW.user1_id, NEW.user2_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_profiles_insert AFTER INSERT ON profiles
+    BEGIN
+        UPDATE global_counters SET
+            total_profiles = total_profiles + 1,
+            age_sum = age_sum + NEW.age,
+            age_min = CASE WHEN age_min IS NULL OR NEW.age < age_min THEN NEW.age ELSE age_min END,
+            age_max = CASE WHEN age_max IS NULL OR NEW.age > age_max THEN NEW.age ELSE age_max END
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_profiles_delete AFTER DELETE ON profiles
+    BEGIN
+        UPDATE global_counters SET
+            total_profiles = total_profiles - 1,
+            age_sum = age_sum - OLD.age,
+            age_min = (SELECT MIN(age) FROM profiles),
+            age_max = (SELECT MAX(age) FROM profiles)
+        WHERE id = 1;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_profiles_age AFTER UPDATE OF age ON profiles
+    BEGIN
+        UPDATE global_counters SET
+            age_sum = age_sum - OLD.age + NEW.age,
+            age_min = (SELECT MIN(age) FROM profiles),
+            age_max = (SELECT MAX(age) FROM profiles)
+        WHERE id = 1;
+    END
+    """,
+]
+
+# Like réciproque : le match et l'historique sont créés dans la même écriture que le like
+MATCH_TRIGGER_BODY = """
+    BEGIN
+        INSERT INTO matches (user1_id, user2_id, status, created_at)
+            SELECT NEW.liker_id, NEW.liked_profile_id, 'matched', NEW.liked_at
+            WHERE NOT EXISTS (
+                SELECT 1 FROM matches
+                WHERE (user1_id = NEW.liker_id AND user2_id = NEW.liked_profile_id)
+                   OR (user1_id = NEW.liked_profile_id AND user2_id = NEW.liker_id)
+            );
+        INSERT INTO match_history (user1_id, user2_id, action, timestamp)
+            SELECT NEW.liker_id, NEW.liked_profile_id, 'matched', NEW.liked_at WHERE changes() > 0
+            UNION ALL
+            SELECT NEW.liked_profile_id, NEW.liker_id, 'matched', NEW.liked_at WHERE changes() > 0;
+        UPDATE profile_likes SET status = 'matched'
+            WHERE (liker_id = NEW.liker_id AND liked_profile_id = NEW.liked_profile_id)
+               OR (liker_id = NEW.liked_profile_id AND liked_profile_id = NEW.liker_id);
+    END
+"""
+
+MATCH_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_likes_mutual_insert AFTER INSERT ON profile_likes
+    WHEN EXISTS (
+        SELECT 1 FROM profile_likes
+        WHERE liker_id = NEW.liked_profile_id AND liked_profile_id = NEW.liker_id
+    )
+    {MATCH_TRIGGER_BODY}
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_likes_mutual_update AFTER UPDATE OF liked_at ON profile_likes
+    WHEN EXISTS (
+        SELECT 1 FROM profile_likes
+        WHERE liker_id = NEW.liked_profile_id AND liked_profile_id = NEW.liker_id
+    )
+    {MATCH_TRIGGER_BODY}
+    """,
+]
+
+# Observateur de requête : (sql, paramètres, durée en secondes, exception éventuelle)
+QueryObserver = Callable[[str, Any, float, Optional[BaseException]], None]
+
+class _ObservedResult:
+    """Résultat de execute() chronométré, utilisable avec await ou async with"""
+
+    def __init__(self, connection: "ObservedConnection", result, sql: str, params):
+        self._connection = connection
+        self._result = result
+        self._sql = sql
+        self._params = params
+        self._cursor = None
+
+    async def _run(self):
+        started = time.perf_counter()
+        error = None
+        try:
+            return await self._result
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._connection._notify(self._sql, self._params, time.perf_counter() - started, error)
+
+    def __await__(self):
+        return self._run().__await__()
+
+    async def __aenter__(self):
+        self._cursor = await self._run()
+        return self._cursor
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._cursor.close()
+
+class ObservedConnection:
+    """Connexion aiosqlite qui signale chaque requête aux observateurs (métriques, profilage)"""
+
+    def __init__(self, connection: aiosqlite.Connection, observers: List[QueryObserver]):
+        self._connection = connection
+        self._observers = observers
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def _notify(self, sql: str, params, seconds: float, error: Optional[BaseException]):
+        for observer in self._observers:
+            try:
+                observer(sql, params, seconds, error)
+            except Exception as e:
+                logger.debug(f"Observateur de requête en échec: {e}")
+
+    def execute(self, sql: str, parameters=None):
+        return _ObservedResult(self, self._connection.execute(sql, parameters), sql, parameters)
+
+    def executemany(self, sql: str, parameters):
+        return _ObservedResult(self, self._connection.executemany(sql, parameters), sql, None)
+
 class DatabaseManager:
     """Gestionnaire de base de données SQLite avec aiosqlite"""
 
     def __init__(self, db_path: str = "data/matching_bot.db"):
         self.db_path = db_path
         self.connection: Optional[aiosqlite.Connection] = None
+        self.write_lock = asyncio.Lock()
+        self.query_observers: List[QueryObserver] = []
+
+    def add_query_observer(self, observer: QueryObserver):
+        """Être notifié de chaque requête ; la connexion n'est enveloppée que s'il y a des observateurs"""
+        if observer not in self.query_observers:
+            self.query_observers.append(observer)
+        self._wrap_connection()
+
+    def remove_query_observer(self, observer: QueryObserver):
+        if observer in self.query_observers:
+            self.query_observers.remove(observer)
+
+    def _wrap_connection(self):
+        if self.query_observers and self.connection and not isinstance(self.connection, ObservedConnection):
+            self.connection = ObservedConnection(self.connection, self.query_observers)
 
     async def connect(self):
         """Établir la connexion à la base de données"""
@@ -31,6 +326,7 @@ class DatabaseManager:
 
             self.connection = await aiosqlite.connect(self.db_path)
             self.connection.row_factory = aiosqlite.Row
+            self._wrap_connection()
             await self.create_tables()
             logger.info("✅ Connexion à la base de données établie")
             return True
@@ -63,7 +359,7 @@ class DatabaseManager:
     async def create_tables(self):
         """Créer toutes les tables nécessaires"""
         try:
-            # Table des profils
+            # Table des profils (colonnes lues par position : 4 intérêts, 6 description, 7 avatar)
             await self.connection.execute("""
                 CREATE TABLE IF NOT EXISTS profiles (
                     user_id TEXT PRIMARY KEY,
@@ -71,10 +367,11 @@ class DatabaseManager:
                     pronoms TEXT,
                     age INTEGER NOT NULL,
                     interets TEXT,
-                    ville TEXT,
+                    interets_canonical TEXT,
                     description TEXT,
-                    created_at TEXT NOT NULL,
-                    updated_at TEXT
+                    avatar_url TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
                 )
             """)
 
@@ -108,6 +405,7 @@ class DatabaseManager:
                     user_id TEXT NOT NULL,
                     passed_profile_id TEXT NOT NULL,
                     passed_at TEXT NOT NULL,
+                    expires_at TEXT,
                     UNIQUE(user_id, passed_profile_id)
                 )
             """)
@@ -120,6 +418,7 @@ class DatabaseManager:
                     liked_profile_id TEXT NOT NULL,
                     liked_at TEXT NOT NULL,
                     status TEXT DEFAULT 'pending',
+                    expires_at TEXT,
                     UNIQUE(liker_id, liked_profile_id)
                 )
             """)
@@ -136,12 +435,299 @@ class DatabaseManager:
                 )
             """)
 
+            # Utilisateurs dont les DM sont fermés (cache négatif de cogs/resolver.py)
+            await self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS dm_closed (
+                    user_id TEXT PRIMARY KEY,
+                    closed_at TEXT NOT NULL,
+                    expires_at TEXT NOT NULL
+                )
+            """)
+
+            # État des carrousels /findmatch, relu à chaque clic sur un bouton persistant
+            await self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS match_carousels (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    candidates TEXT NOT NULL,
+                    position INTEGER NOT NULL DEFAULT 0,
+                    handled TEXT NOT NULL DEFAULT '{}',
+                    created_at TEXT NOT NULL
+                )
+            """)
+            await self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_carousels_created ON match_carousels(created_at)"
+            )
+
+            # Empreinte des commandes slash synchronisées (cogs/command_sync.py)
+            await self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS command_sync_state (
+                    scope TEXT PRIMARY KEY,
+                    hash TEXT NOT NULL,
+                    command_count INTEGER NOT NULL,
+                    synced_at TEXT NOT NULL
+                )
+            """)
+
+            # DM abandonnés par la file d'envoi (cogs/outbound.py)
+            await self.connection.execute("""
+                CREATE TABLE IF NOT EXISTS outbound_dead_letters (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    priority TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    error TEXT,
+                    attempts INTEGER NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            """)
+
+            await self.migrate_columns()
+
+            # Index d'expiration (moteur TTL de cogs/expiry.py)
+            await self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_passed_expires ON passed_profiles(expires_at)"
+            )
+            await self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_likes_expires ON profile_likes(status, expires_at)"
+            )
+
+            await self.create_counters()
+
+            for trigger in MATCH_TRIGGERS:
+                await self.connection.execute(trigger)
+
             await self.connection.commit()
             logger.info("✅ Tables créées/vérifiées")
 
         except Exception as e:
             logger.error(f"❌ Erreur création tables: {e}")
 
+    async def migrate_columns(self):
+        """Ajouter aux bases existantes les colonnes apparues après leur création"""
+        for table, column, declaration in COLUMN_MIGRATIONS:
+            async with self.connection.execute(f"PRAGMA table_info({table})") as cursor:
+                columns = {row[1] for row in await cursor.fetchall()}
+
+            if column not in columns:
+                await self.connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+                logger.info(f"🔧 Colonne ajoutée: {table}.{column}")
+
+    async def create_counters(self):
+        """Créer les compteurs matérialisés et les triggers qui les maintiennent"""
+        # Compteurs par utilisateur (lus par /match_stats)
+        await self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS user_counters (
+                user_id TEXT PRIMARY KEY,
+                likes_given INTEGER NOT NULL DEFAULT 0,
+                likes_received INTEGER NOT NULL DEFAULT 0,
+                profiles_passed INTEGER NOT NULL DEFAULT 0,
+                matches INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+
+        # Ligne unique de compteurs globaux (lue par /stats et /setup_bot)
+        await self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS global_counters (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total_profiles INTEGER NOT NULL DEFAULT 0,
+                age_sum INTEGER NOT NULL DEFAULT 0,
+                age_min INTEGER,
+                age_max INTEGER,
+                total_matches INTEGER NOT NULL DEFAULT 0,
+                total_likes INTEGER NOT NULL DEFAULT 0,
+                total_passes INTEGER NOT NULL DEFAULT 0,
+                reconciled_at TEXT
+            )
+        """)
+
+        # MIN/MAX(age) recalculés par les triggers : l'index les rend instantanés
+        await self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_profiles_age ON profiles(age)"
+        )
+
+        for trigger in COUNTER_TRIGGERS:
+            await self.connection.execute(trigger)
+
+        async with self.connection.execute(
+            "INSERT OR IGNORE INTO global_counters (id) VALUES (1)"
+        ) as cursor:
+            first_run = cursor.rowcount > 0
+
+        # Première création : initialiser depuis les tables sources
+        if first_run:
+            await self.reconcile_counters()
+            logger.info("🔢 Compteurs initialisés depuis les tables existantes")
+
+    async def reconcile_counters(self) -> int:
+        """Reconstruire les compteurs depuis les tables sources.
+
+        Retourne le nombre d'écarts corrigés : utilisateurs divergents, +1 si la ligne globale l'était.
+        """
+        # Sous le verrou d'écriture : aucun autre écrivain ne s'intercale entre le calcul et le remplacement
+        async with self.transaction():
+            await self.connection.execute("DROP TABLE IF EXISTS temp.fresh_user_counters")
+            await self.connection.execute("""
+                CREATE TEMP TABLE fresh_user_counters AS
+                SELECT user_id,
+                       SUM(lg) AS likes_given,
+                       SUM(lr) AS likes_received,
+                       SUM(pp) AS profiles_passed,
+                       SUM(m) AS matches
+                FROM (
+                    SELECT liker_id AS user_id, 1 AS lg, 0 AS lr, 0 AS pp, 0 AS m FROM profile_likes
+                    UNION ALL
+                    SELECT liked_profile_id, 0, 1, 0, 0 FROM profile_likes
+                    UNION ALL
+                    SELECT user_id, 0, 0, 1, 0 FROM passed_profiles
+                    UNION ALL
+                    SELECT user1_id, 0, 0, 0, 1 FROM matches WHERE status = 'matched'
+                    UNION ALL
+                    SELECT user2_id, 0, 0, 0, 1 FROM matches WHERE status = 'matched'
+                )
+                GROUP BY user_id
+            """)
+
+            # Compter les lignes divergentes avant de les remplacer
+            async with self.connection.execute("""
+                WITH current AS (
+                    SELECT user_id, likes_given, likes_received, profiles_passed, matches
+                    FROM user_counters
+                    WHERE likes_given + likes_received + profiles_passed + matches > 0
+                )
+                SELECT COUNT(*) FROM (
+                    SELECT user_id FROM (SELECT * FROM fresh_user_counters EXCEPT SELECT * FROM current)
+                    UNION
+                    SELECT user_id FROM (SELECT * FROM current EXCEPT SELECT * FROM fresh_user_counters)
+                )
+            """) as cursor:
+                drift = (await cursor.fetchone())[0]
+
+            await self.connection.execute("DELETE FROM user_counters")
+            await self.connection.execute("""
+                INSERT INTO user_counters (user_id, likes_given, likes_received, profiles_passed, matches)
+                SELECT user_id, likes_given, likes_received, profiles_passed, matches
+                FROM fresh_user_counters
+            """)
+            await self.connection.execute("DROP TABLE temp.fresh_user_counters")
+
+            async with self.connection.execute("""
+                SELECT (SELECT COUNT(*) FROM profiles),
+                       (SELECT COALESCE(SUM(age), 0) FROM profiles),
+                       (SELECT MIN(age) FROM profiles),
+                       (SELECT MAX(age) FROM profiles),
+                       (SELECT COUNT(*) FROM matches),
+                       (SELECT COUNT(*) FROM profile_likes),
+                       (SELECT COUNT(*) FROM passed_profiles)
+            """) as cursor:
+                fresh_global = tuple(await cursor.fetchone())
+            async with self.connection.execute("""
+                SELECT total_profiles, age_sum, age_min, age_max, total_matches, total_likes, total_passes
+                FROM global_counters WHERE id = 1
+            """) as cursor:
+                current_global = await cursor.fetchone()
+            if current_global is None or tuple(current_global) != fresh_global:
+                drift += 1
+
+            await self.connection.execute("""
+                UPDATE global_counters SET
+                    total_profiles = ?, age_sum = ?, age_min = ?, age_max = ?,
+                    total_matches = ?, total_likes = ?, total_passes = ?,
+                    reconciled_at = ?
+                WHERE id = 1
+            """, fresh_global + (datetime.now().isoformat(),))
+        return drift
+
+    @asynccontextmanager
+    async def transaction(self):
+        """Transaction BEGIN IMMEDIATE : le verrou d'écriture est pris dès le début"""
+        async with self.write_lock:
+            # Transaction implicite laissée ouverte hors verrou (démarrage) : la valider d'abord
+            if self.connection.in_transaction:
+                await self.connection.commit()
+            await self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.connection
+            except BaseException:
+                await self.connection.rollback()
+                raise
+            else:
+                await self.connection.commit()
+
+    @asynccontextmanager
+    async def writing(self):
+        """Écriture simple sur la connexion partagée, validée à la sortie.
+
+        Toute écriture passe par le verrou d'écriture : un commit() ou un rollback() ne peut
+        ni valider ni annuler une transaction() en cours.
+        """
+        async with self.write_lock:
+            try:
+                yield self.connection
+            except BaseException:
+                await self.connection.rollback()
+                raise
+            else:
+                await self.connection.commit()
+
+    async def like_profile(self, liker_id: str, liked_id: str,
+                           expires_at: Optional[str] = None) -> Tuple[Optional[aiosqlite.Row], Optional[aiosqlite.Row], bool]:
+        """Enregistrer un like et créer le match s'il est réciproque, en une seule transaction
+
+        Retourne (profil du liker, profil liké, match créé par ce like) : un like répété
+        sur un match existant (double clic, ancienne notification) renvoie False.
+        """
+        liked_at = datetime.now().isoformat()
+        async with self.transaction() as conn:
+            # Le like n'est écrit que si les deux profils existent ; les triggers créent le match
+            # avec created_at = liked_at, ce qui identifie un match créé par cette écriture
+            await conn.execute("""
+                INSERT INTO profile_likes (liker_id, liked_profile_id, liked_at, expires_at)
+                SELECT ?, ?, ?, ?
+                WHERE (SELECT COUNT(*) FROM profiles WHERE user_id IN (?, ?)) = 2
+                ON CONFLICT(liker_id, liked_profile_id) DO UPDATE SET
+                    liked_at = excluded.liked_at,
+                    expires_at = excluded.expires_at
+            """, (liker_id, liked_id, liked_at, expires_at, liker_id, liked_id))
+
+            async with conn.execute("""
+                SELECT p.*, EXISTS (
+                    SELECT 1 FROM matches
+                    WHERE status = 'matched' AND created_at = ?
+                      AND ((user1_id = ? AND user2_id = ?) OR (user1_id = ? AND user2_id = ?))
+                ) AS is_match
+                FROM profiles p
+                WHERE p.user_id IN (?, ?)
+            """, (liked_at, liker_id, liked_id, liked_id, liker_id, liker_id, liked_id)) as cursor:
+                rows = await cursor.fetchall()
+
+        profiles = {row['user_id']: row for row in rows}
+        liker_profile = profiles.get(liker_id)
+        liked_profile = profiles.get(liked_id)
+        is_match = bool(rows) and bool(rows[0]['is_match'])
+        return liker_profile, liked_profile, is_match
+
+    async def get_user_counters(self, user_id: str) -> Optional[aiosqlite.Row]:
+        """Profil + compteurs d'un utilisateur en une seule lecture par clé primaire"""
+        async with self.connection.execute("""
+            SELECT p.prenom,
+                   COALESCE(c.likes_given, 0) AS likes_given,
+                   COALESCE(c.likes_received, 0) AS likes_received,
+                   COALESCE(c.profiles_passed, 0) AS profiles_passed,
+                   COALESCE(c.matches, 0) AS matches
+            FROM profiles p
+            LEFT JOIN user_counters c ON c.user_id = p.user_id
+            WHERE p.user_id = ?
+        """, (user_id,)) as cursor:
+            return await cursor.fetchone()
+
+    async def get_global_counters(self) -> Optional[aiosqlite.Row]:
+        """Lire la ligne de compteurs globaux"""
+        async with self.connection.execute(
+            "SELECT * FROM global_counters WHERE id = 1"
+        ) as cursor:
+            return await cursor.fetchone()
+
 # Instance globale
 db_instance = DatabaseManager()
 
@@ -155,6 +741,13 @@ def serialize_interests(interests):
         return json.dumps(interests)
     return interests
 
+def percentile(samples, fraction: float) -> float:
+    """Percentile par rang le plus proche (0.0 sans échantillon), commun à toutes les statistiques"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
 def deserialize_interests(interests_str):
     """Désérialiser les intérêts depuis JSON"""
     if not interests_str:
@@ -0,0 +1 @@
+# Outils de test de charge hors ligne (client et objets Discord factices)
@@ -0,0 +1,252 @@
+"""Test de charge hors ligne : N utilisateurs synthétiques concurrents sur les vrais cogs.
+
+Aucune connexion réseau : StubShardedBot et les interactions factices de loadtest.stubs,
+base SQLite temporaire. Chaque utilisateur enchaîne un scénario complet :
+
+    ProfileModal.on_submit → (/findmatch → boutons du carrousel → /match_stats) × rounds
+
+Débit, percentiles de latence et erreurs sont rapportés par opération ; le détail est
+écrit en JSON dans benchmarks/results/.
+
+    python -m loadtest.harness --users 100 --rounds 3
+    python -m loadtest.harness --users 500 --concurrency 50 --dm-latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+PRENOMS = ["Camille", "Léa", "Hugo", "Inès", "Lucas", "Chloé", "Nathan", "Manon", "Théo", "Jade",
+           "Louis", "Emma", "Noé", "Zoé", "Jules", "Lina", "Enzo", "Sarah", "Tom", "Élise"]
+PRONOMS = ["il", "elle", "iel", "il/iel", "elle/iel"]
+INTERETS = ["jeux vidéo", "musique", "lecture", "manga", "cinéma", "dessin", "football", "danse",
+            "photographie", "cuisine", "randonnée", "programmation", "anime", "théâtre", "guitare",
+            "piano", "natation", "séries", "jeux de société", "voyage", "écriture", "skate", "rap", "k-pop"]
+DESCRIPTIONS = [
+    "", "Plutôt calme, j'aime les soirées jeux entre amis.",
+    "Fan de musique et de cinéma, toujours partant pour discuter de films.",
+    "Je dessine beaucoup et je lis des mangas le soir.",
+    "Sportif le week-end, geek la semaine.",
+]
+
+# Boutons du carrousel cliqués après chaque /findmatch (Suivant puis une réponse)
+CAROUSEL_ACTIONS = ("next", "like", "pass")
+
+class OperationStats:
+    """Durées et erreurs collectées pour une opération"""
+
+    def __init__(self):
+        self.durations: List[float] = []
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, seconds: float, error: Optional[str] = None):
+        self.durations.append(seconds)
+        if error:
+            self.errors[error] += 1
+
+    def summary(self, wall: float) -> Dict:
+        from cogs.utils import percentile
+
+        durations = self.durations
+        return {
+            "count": len(durations),
+            "errors": sum(self.errors.values()),
+            "error_kinds": dict(self.errors),
+            "throughput_per_s": round(len(durations) / wall, 2) if wall else 0.0,
+            "p50_ms": round(percentile(durations, 0.50) * 1000, 2),
+            "p95_ms": round(percentile(durations, 0.95) * 1000, 2),
+            "p99_ms": round(percentile(durations, 0.99) * 1000, 2),
+            "max_ms": round(max(durations, default=0.0) * 1000, 2),
+        }
+
+def response_error(interaction) -> Optional[str]:
+    """Réponse d'erreur des cogs (message ou embed commençant par ❌), sinon None"""
+    for message in interaction.sent:
+        text = message.content or (message.embed.title if message.embed else "") or ""
+        if text.startswith("❌"):
+            return text.splitlines()[0][:60]
+    return None
+
+class LoadHarness:
+    """Pilote les cogs chargés dans un StubShardedBot avec des interactions factices"""
+
+    def __init__(self, bot, rng: random.Random, think_time: float = 0.0):
+        self.bot = bot
+        self.rng = rng
+        self.think_time = think_time
+        self.stats: Dict[str, OperationStats] = defaultdict(OperationStats)
+
+    async def timed(self, operation: str, interaction, call):
+        started = time.perf_counter()
+        error = None
+        try:
+            await call
+            error = response_error(interaction)
+        except Exception as e:
+            error = type(e).__name__
+        self.stats[operation].record(time.perf_counter() - started, error)
+        if self.think_time:
+            await asyncio.sleep(self.rng.uniform(0, self.think_time))
+
+    async def submit_profile(self, user):
+        from cogs.profile import ProfileModal
+        from loadtest.stubs import StubInteraction
+
+        modal = ProfileModal()
+        values = {
+            modal.prenom: self.rng.choice(PRENOMS),
+            modal.pronoms: self.rng.choice(PRONOMS),
+            modal.age: str(self.rng.randint(13, 30)),
+            modal.interets: ", ".join(self.rng.sample(INTERETS, self.rng.randint(3, 8))),
+            modal.description: self.rng.choice(DESCRIPTIONS),
+        }
+        for text_input, value in values.items():
+            text_input._value = value
+        interaction = StubInteraction(self.bot, user)
+        await self.timed("profile_submit", interaction, modal.on_submit(interaction))
+
+    async def findmatch(self, user):
+        from loadtest.stubs import StubInteraction
+
+        cog = self.bot.get_cog("Match")
+        interaction = StubInteraction(self.bot, user)
+        before = len(user.dm_channel.messages)
+        await self.timed("findmatch", interaction, cog.findmatch.callback(cog, interaction))
+        # Carrousel envoyé en DM (absent si aucune correspondance)
+        return user.dm_channel.messages[-1] if len(user.dm_channel.messages) > before else None
+
+    async def click(self, user, message, action: str):
+        from cogs.match import CarouselButton
+        from loadtest.stubs import StubInteraction
+
+        button = next((item for item in message.view.children
+                       if isinstance(item, CarouselButton) and item.action == action), None)
+        if button is None or button.item.disabled:
+            return
+        interaction = StubInteraction(self.bot, user, message=message)
+        await self.timed(f"carousel_{action}", interaction, button.callback(interaction))
+
+    async def match_stats(self, user):
+        from loadtest.stubs import StubInteraction
+
+        cog = self.bot.get_cog("Match")
+        interaction = StubInteraction(self.bot, user)
+        await self.timed("match_stats", interaction, cog.match_stats.callback(cog, interaction))
+
+    async def scenario(self, user, rounds: int):
+        for _ in range(rounds):
+            message = await self.findmatch(user)
+            if message is not None and message.view is not None:
+                # Chaque clic édite le message : le suivant lit la vue mise à jour
+                for action in CAROUSEL_ACTIONS:
+                    await self.click(user, message, action)
+            await self.match_stats(user)
+
+async def run(args) -> Dict:
+    from cogs.utils import db_instance
+    from cogs.outbound import outbound_queue
+    from loadtest.stubs import StubShardedBot
+
+    db_instance.db_path = os.path.join("data", "loadtest.db")
+    if not await db_instance.connect():
+        raise RuntimeError("Connexion à la base temporaire impossible")
+
+    rng = random.Random(args.seed)
+    bot = StubShardedBot(dm_latency=args.dm_latency)
+    phases = {}
+    async with bot:
+        await bot.load_extension("cogs.profile")
+        await bot.load_extension("cogs.match")
+        harness = LoadHarness(bot, rng, args.think_time)
+        users = [bot.add_user(name=f"charge{i}") for i in range(args.users)]
+        limit = asyncio.Semaphore(args.concurrency or args.users)
+
+        async def bounded(coro):
+            async with limit:
+                await coro
+
+        started = time.perf_counter()
+        await asyncio.gather(*(bounded(harness.submit_profile(user)) for user in users))
+        phases["profiles"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        await asyncio.gather(*(bounded(harness.scenario(user, args.rounds)) for user in users))
+        phases["matching"] = time.perf_counter() - started
+
+        outbound = outbound_queue.metrics()
+        await bot.unload_extension("cogs.match")
+        await bot.unload_extension("cogs.profile")
+    await db_instance.disconnect()
+
+    operations = {}
+    for name, stats in harness.stats.items():
+        wall = phases["profiles"] if name == "profile_submit" else phases["matching"]
+        operations[name] = stats.summary(wall)
+    return {
+        "benchmark": "loadtest",
+        "timestamp": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "config": vars(args),
+        "phases": phases,
+        "operations": operations,
+        "dm_sent": sum(len(user.dm_channel.messages) for user in bot.users_by_id.values()),
+        "outbound": outbound,
+    }
+
+def print_report(result: Dict):
+    print(f"{result['config']['users']} utilisateurs · {result['config']['rounds']} tours · "
+          f"profils {result['phases']['profiles']:.2f}s · matching {result['phases']['matching']:.2f}s · "
+          f"{result['dm_sent']} DM envoyés")
+    print(f"{'opération':<18}{'n':>7}{'err':>6}{'op/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, op in result["operations"].items():
+        print(f"{name:<18}{op['count']:>7}{op['errors']:>6}{op['throughput_per_s']:>9.1f}"
+              f"{op['p50_ms']:>10.1f}{op['p95_ms']:>10.1f}{op['p99_ms']:>10.1f}{op['max_ms']:>10.1f}")
+        for kind, count in op["error_kinds"].items():
+            print(f"   ❌ {count}× {kind}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Test de charge hors ligne des cogs")
+    parser.add_argument("--users", type=int, default=50, help="Utilisateurs synthétiques")
+    parser.add_argument("--rounds", type=int, default=2, help="/findmatch par utilisateur")
+    parser.add_argument("--concurrency", type=int, default=0, help="Utilisateurs actifs simultanément (0 : tous)")
+    parser.add_argument("--dm-latency", type=float, default=0.0, help="Latence simulée d'un envoi de DM (s)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pause aléatoire max entre deux actions (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Fichier JSON (défaut : benchmarks/results/loadtest_<date>.json)")
+    args = parser.parse_args(argv)
+
+    # Base, logs et traces dans un dossier jetable ; seuls les avertissements sont affichés
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    output = os.path.abspath(args.output) if args.output else \
+        os.path.join(RESULTS_DIR, f"loadtest_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    workdir = tempfile.TemporaryDirectory()
+    os.chdir(workdir.name)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    try:
+        result = asyncio.run(run(args))
+    finally:
+        os.chdir(ROOT)
+        workdir.cleanup()
+
+    print_report(result)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    print(f"Résultats : {output}")
+    errors = sum(op["errors"] for op in result["operations"].values())
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""Client et objets Discord factices pour faire tourner les cogs hors ligne.
+
+Aucune connexion à la passerelle : les messages envoyés sont enregistrés sur les
+objets factices. StubShardedBot est un vrai AutoShardedBot (arbre de commandes,
+cogs, DynamicItem) dont les shards, les utilisateurs et les latences sont simulés.
+
+    python -m loadtest.stubs    # vérifie la répartition des tâches globales entre shards
+"""
+import asyncio
+import itertools
+import time
+from typing import Dict, List, Optional
+import discord
+from discord.ext import commands
+
+_ids = itertools.count(1_000_000_000_000_000_000)
+
+def next_id() -> int:
+    return next(_ids)
+
+class StubMessage:
+    """Message envoyé : contenu, embed et vue conservés pour inspection"""
+
+    def __init__(self, channel: "StubChannel", content=None, embed=None, view=None, ephemeral: bool = False):
+        self.id = next_id()
+        self.channel = channel
+        self.content = content
+        self.embed = embed
+        self.view = view
+        self.ephemeral = ephemeral
+        self.edits = 0
+
+    @property
+    def components(self) -> list:
+        if not self.view:
+            return []
+        return [discord.ActionRow(row) for row in self.view.to_components()]
+
+    async def edit(self, **kwargs):
+        self.edits += 1
+        self.content = kwargs.get("content", self.content)
+        self.embed = kwargs.get("embed", self.embed)
+        self.view = kwargs.get("view", self.view)
+        return self
+
+class StubChannel:
+    """Salon (DM) qui enregistre les messages reçus"""
+
+    def __init__(self, latency: float = 0.0, closed: bool = False):
+        self.id = next_id()
+        self.latency = latency
+        self.closed = closed
+        self.messages: List[StubMessage] = []
+
+    async def send(self, content=None, *, embed=None, view=None, **kwargs) -> StubMessage:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.closed:
+            raise discord.Forbidden(_StubResponse(403), "Cannot send messages to this user")
+        message = StubMessage(self, content, embed, view)
+        self.messages.append(message)
+        return message
+
+class _StubResponse:
+    """Réponse HTTP minimale pour construire les exceptions discord.py"""
+
+    def __init__(self, status: int):
+        self.status = status
+        self.reason = "stub"
+
+class StubUser:
+    """Utilisateur avec un salon DM factice"""
+
+    def __init__(self, user_id: Optional[int] = None, name: str = "stub", dm_latency: float = 0.0, dm_closed: bool = False):
+        self.id = user_id or next_id()
+        self.name = name
+        self.display_name = name
+        self.global_name = name
+        self.bot = False
+        self.mention = f"<@{self.id}>"
+        self.display_avatar = None
+        self.dm_channel = StubChannel(dm_latency, dm_closed)
+
+    async def create_dm(self) -> StubChannel:
+        return self.dm_channel
+
+    async def send(self, *args, **kwargs) -> StubMessage:
+        return await self.dm_channel.send(*args, **kwargs)
+
+class StubInteractionResponse:
+    """interaction.response : une seule réponse possible, comme sur Discord"""
+
+    def __init__(self, interaction: "StubInteraction"):
+        self._interaction = interaction
+        self._done = False
+        self.deferred = False
+        self.modal = None
+
+    def is_done(self) -> bool:
+        return self._done
+
+    def _respond(self):
+        if self._done:
+            raise discord.InteractionResponded(self._interaction)
+        self._done = True
+
+    async def defer(self, *, ephemeral: bool = False, thinking: bool = False):
+        self._respond()
+        self.deferred = True
+
+    async def send_message(self, content=None, *, embed=None, view=None, ephemeral: bool = False, **kwargs):
+        self._respond()
+        self._interaction.sent.append(StubMessage(self._interaction.channel, content, embed, view, ephemeral))
+
+    async def edit_message(self, *, content=None, embed=None, view=None, **kwargs):
+        self._respond()
+        if self._interaction.message:
+            await self._interaction.message.edit(content=content, embed=embed, view=view)
+
+    async def send_modal(self, modal):
+        self._respond()
+        self.modal = modal
+
+class StubFollowup:
+    def __init__(self, interaction: "StubInteraction"):
+        self._interaction = interaction
+
+    async def send(self, content=None, *, embed=None, view=None, ephemeral: bool = False, **kwargs):
+        message = StubMessage(self._interaction.channel, content, embed, view, ephemeral)
+        self._interaction.sent.append(message)
+        return message
+
+class StubInteraction:
+    """Interaction de commande slash ou de bouton"""
+
+    def __init__(self, client, user: StubUser, message: Optional[StubMessage] = None, guild=None):
+        self.id = next_id()
+        self.client = client
+        self.user = user
+        self.message = message
+        self.guild = guild
+        self.channel = message.channel if message else user.dm_channel
+        self.created_at = time.monotonic()
+        self.sent: List[StubMessage] = []
+        self.response = StubInteractionResponse(self)
+        self.followup = StubFollowup(self)
+
+    async def edit_original_response(self, **kwargs):
+        if self.sent:
+            return await self.sent[0].edit(**kwargs)
+
+class StubShardedBot(commands.AutoShardedBot):
+    """AutoShardedBot hors ligne : utilisateurs en mémoire, latences simulées par shard"""
+
+    def __init__(self, shard_count: int = 1, shard_ids: Optional[List[int]] = None,
+                 application_id: int = 1, dm_latency: float = 0.0):
+        super().__init__(
+            command_prefix="!", intents=discord.Intents.default(),
+            shard_count=shard_count, shard_ids=shard_ids
+        )
+        self._connection.application_id = application_id
+        self.dm_latency = dm_latency
+        self.users_by_id: Dict[int, StubUser] = {}
+        self.shard_latency: Dict[int, float] = {
+            shard_id: 0.040 + 0.005 * shard_id for shard_id in (shard_ids or range(shard_count))
+        }
+
+    def add_user(self, user_id: Optional[int] = None, name: str = "stub", dm_closed: bool = False) -> StubUser:
+        user = StubUser(user_id, name, self.dm_latency, dm_closed)
+        self.users_by_id[user.id] = user
+        return user
+
+    def get_user(self, user_id: int) -> Optional[StubUser]:
+        return self.users_by_id.get(int(user_id))
+
+    async def fetch_user(self, user_id: int) -> StubUser:
+        user = self.users_by_id.get(int(user_id))
+        if user is None:
+            # Utilisateur inconnu du cache : créé à la volée, comme un fetch HTTP réussi
+            user = self.add_user(int(user_id), f"user{user_id}")
+        return user
+
+    @property
+    def latencies(self):
+        return sorted(self.shard_latency.items())
+
+    @property
+    def latency(self) -> float:
+        values = list(self.shard_latency.values())
+        return sum(values) / len(values) if values else float("nan")
+
+async def shard_smoke():
+    """Deux processus simulés (shards 0 et 1 sur 2) : les tâches globales ne tournent qu'une fois"""
+    from cogs.sharding import is_primary_shard, shard_latencies
+
+    for shard_ids in ([0], [1], None):
+        bot = StubShardedBot(shard_count=2, shard_ids=shard_ids)
+        async with bot:
+            await bot.load_extension("cogs.match")
+            cog = bot.get_cog("Match")
+            running = cog.cleanup_passed_profiles.is_running()
+            print(f"shards {shard_ids or 'tous'}: principal={is_primary_shard(bot)} "
+                  f"nettoyage={running} latences={shard_latencies(bot)}")
+            await bot.unload_extension("cogs.match")
+
+if __name__ == "__main__":
+    asyncio.run(shard_smoke())
@@ -0,0 +1,37 @@
+"""Fixtures communes : une seule boucle d'événements pour toute la session.
+
+Les singletons des cogs (db_instance, outbound_queue, expiry_engine...) créent leurs
+verrous et files une fois pour toutes : ils restent attachés à cette boucle.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Journal hors du dépôt, avant le premier import de cogs.utils ; seuls les avertissements
+_logs = tempfile.TemporaryDirectory()
+os.environ.setdefault("LOG_FILE", os.path.join(_logs.name, "bot.log"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+@pytest.fixture(scope="session")
+def run():
+    """Exécuter une coroutine jusqu'au bout sur la boucle de la session"""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+@pytest.fixture
+def db(run, tmp_path):
+    """DatabaseManager neuf sur une base temporaire, au schéma réel"""
+    from cogs.utils import DatabaseManager
+
+    manager = DatabaseManager(str(tmp_path / "data" / "test.db"))
+    assert run(manager.connect())
+    yield manager
+    run(manager.disconnect())
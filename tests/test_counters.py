@@ -0,0 +1,84 @@
+"""Likes, matches et compteurs matérialisés (triggers + réconciliation)"""
+
+def add_profiles(run, db, *user_ids, age=17):
+    async def insert():
+        await db.connection.executemany(
+            "INSERT INTO profiles (user_id, prenom, pronoms, age, interets, description) VALUES (?, ?, 'iel', ?, '[]', '')",
+            [(user_id, f"Test{user_id}", age) for user_id in user_ids]
+        )
+        await db.connection.commit()
+    run(insert())
+
+def fetch(run, db, query, params=()):
+    async def read():
+        async with db.connection.execute(query, params) as cursor:
+            return await cursor.fetchall()
+    return [tuple(row) for row in run(read())]
+
+def user_counters(run, db):
+    return {row[0]: row[1:] for row in fetch(
+        run, db, "SELECT user_id, likes_given, likes_received, profiles_passed, matches FROM user_counters")}
+
+def global_counters(run, db):
+    return fetch(run, db, "SELECT total_profiles, total_likes, total_matches, total_passes FROM global_counters")[0]
+
+def test_like_then_like_back_creates_one_match(run, db):
+    add_profiles(run, db, "1", "2")
+
+    liker, liked, is_match = run(db.like_profile("1", "2"))
+    assert (liker["user_id"], liked["user_id"], is_match) == ("1", "2", False)
+
+    # Like répété : upsert, pas de seconde ligne ni de double comptage
+    run(db.like_profile("1", "2"))
+    assert user_counters(run, db) == {"1": (1, 0, 0, 0), "2": (0, 1, 0, 0)}
+
+    _, _, is_match = run(db.like_profile("2", "1"))
+    assert is_match
+    # Like répété après le match (double clic, ancienne notification) : pas de nouvelle révélation
+    assert run(db.like_profile("2", "1"))[2] is False
+    assert run(db.like_profile("1", "2"))[2] is False
+    assert fetch(run, db, "SELECT COUNT(*) FROM matches WHERE status = 'matched'") == [(1,)]
+    assert user_counters(run, db) == {"1": (1, 1, 0, 1), "2": (1, 1, 0, 1)}
+    assert global_counters(run, db) == (2, 2, 1, 0)
+
+def test_like_unknown_profile_writes_nothing(run, db):
+    add_profiles(run, db, "1")
+
+    liker, liked, is_match = run(db.like_profile("1", "404"))
+    assert liker["user_id"] == "1"
+    assert (liked, is_match) == (None, False)
+    assert fetch(run, db, "SELECT COUNT(*) FROM profile_likes") == [(0,)]
+    assert global_counters(run, db)[1] == 0
+
+def test_reconcile_counters_repairs_drift(run, db):
+    add_profiles(run, db, "1", "2", "3")
+    run(db.like_profile("1", "2"))
+    run(db.like_profile("2", "1"))
+    run(db.like_profile("3", "1"))
+    expected_users = user_counters(run, db)
+    expected_global = global_counters(run, db)
+
+    async def corrupt():
+        await db.connection.execute("UPDATE user_counters SET likes_given = 7 WHERE user_id = '1'")
+        await db.connection.execute("DELETE FROM user_counters WHERE user_id = '3'")
+        await db.connection.execute("UPDATE global_counters SET total_likes = 0, total_profiles = 99")
+        await db.connection.commit()
+    run(corrupt())
+
+    # Deux utilisateurs divergents + la ligne globale
+    assert run(db.reconcile_counters()) == 3
+    assert user_counters(run, db) == expected_users
+    assert global_counters(run, db) == expected_global
+    assert run(db.reconcile_counters()) == 0
+
+def test_reconcile_counters_reports_global_drift(run, db):
+    add_profiles(run, db, "1", "2")
+    assert run(db.reconcile_counters()) == 0
+
+    async def corrupt():
+        await db.connection.execute("UPDATE global_counters SET age_sum = age_sum + 5")
+        await db.connection.commit()
+    run(corrupt())
+
+    assert run(db.reconcile_counters()) == 1
+    assert global_counters(run, db) == (2, 0, 0, 0)
@@ -0,0 +1,59 @@
+"""Transactions de DatabaseManager face aux autres écrivains de la connexion partagée"""
+import asyncio
+
+
+def count(run, db, query):
+    async def read():
+        async with db.connection.execute(query) as cursor:
+            return (await cursor.fetchone())[0]
+    return run(read())
+
+def test_writer_does_not_commit_half_done_transaction(run, db):
+    async def scenario():
+        inside = asyncio.Event()
+
+        async def failing_transaction():
+            async with db.transaction() as conn:
+                await conn.execute("INSERT INTO dm_closed (user_id, closed_at, expires_at) VALUES ('tx', 'a', 'b')")
+                inside.set()
+                await asyncio.sleep(0.05)
+                raise RuntimeError("abandon")
+
+        async def direct_writer():
+            await inside.wait()
+            # Autre écrivain (lettres mortes, DM fermés...) : attend la fin de la transaction
+            async with db.writing() as conn:
+                await conn.execute("INSERT INTO dm_closed (user_id, closed_at, expires_at) VALUES ('direct', 'a', 'b')")
+
+        results = await asyncio.gather(failing_transaction(), direct_writer(), return_exceptions=True)
+        assert isinstance(results[0], RuntimeError) and results[1] is None
+
+    run(scenario())
+    assert count(run, db, "SELECT COUNT(*) FROM dm_closed WHERE user_id = 'tx'") == 0
+    assert count(run, db, "SELECT COUNT(*) FROM dm_closed WHERE user_id = 'direct'") == 1
+
+def test_transaction_commits_on_success(run, db):
+    async def write():
+        async with db.transaction() as conn:
+            await conn.execute("INSERT INTO dm_closed (user_id, closed_at, expires_at) VALUES ('ok', 'a', 'b')")
+    run(write())
+    assert count(run, db, "SELECT COUNT(*) FROM dm_closed") == 1
+
+def test_writing_rolls_back_on_error(run, db):
+    async def write():
+        try:
+            async with db.writing() as conn:
+                await conn.execute("INSERT INTO dm_closed (user_id, closed_at, expires_at) VALUES ('ko', 'a', 'b')")
+                raise RuntimeError("abandon")
+        except RuntimeError:
+            pass
+    run(write())
+    assert count(run, db, "SELECT COUNT(*) FROM dm_closed") == 0
+
+def test_transaction_commits_pending_shared_write_first(run, db):
+    async def write():
+        await db.connection.execute("INSERT INTO dm_closed (user_id, closed_at, expires_at) VALUES ('pending', 'a', 'b')")
+        async with db.transaction() as conn:
+            await conn.execute("INSERT INTO dm_closed (user_id, closed_at, expires_at) VALUES ('tx', 'a', 'b')")
+    run(write())
+    assert count(run, db, "SELECT COUNT(*) FROM dm_closed") == 2
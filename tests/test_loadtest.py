@@ -0,0 +1,16 @@
+"""Test de fumée : le scénario complet du test de charge sur une petite population"""
+import argparse
+
+def test_harness_small_population_has_no_errors(run, tmp_path, monkeypatch):
+    from loadtest.harness import run as run_harness
+
+    monkeypatch.chdir(tmp_path)
+    args = argparse.Namespace(users=15, rounds=2, concurrency=0, dm_latency=0.0, think_time=0.0, seed=42)
+    result = run(run_harness(args))
+
+    operations = result["operations"]
+    assert operations["profile_submit"]["count"] == 15
+    assert operations["findmatch"]["count"] == 30
+    assert operations["match_stats"]["count"] == 30
+    assert {name: op["error_kinds"] for name, op in operations.items() if op["errors"]} == {}
+    assert result["dm_sent"] > 0
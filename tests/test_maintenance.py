@@ -0,0 +1,34 @@
+"""Import de profils depuis un export JSON Lines gzip"""
+import gzip
+import json
+
+def test_import_handles_records_with_different_keys(run, db, tmp_path, monkeypatch):
+    from cogs import maintenance
+
+    monkeypatch.setattr(maintenance, "db_instance", db)
+    path = tmp_path / "profiles.jsonl.gz"
+    records = [
+        {"user_id": "1", "prenom": "Alex", "age": 20},
+        {"user_id": "2", "prenom": "Sam", "age": 22, "pronoms": "iel", "description": "Bonjour"},
+        {"user_id": "3", "description": "Sans prénom ni âge"},
+        {"user_id": "4", "description": "Profil inconnu"},
+        {"prenom": "Sans identifiant", "age": 30},
+    ]
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.writelines(json.dumps(record) + "\n" for record in records)
+
+    async def existing_profile():
+        await db.connection.execute("INSERT INTO profiles (user_id, prenom, age) VALUES ('3', 'Lou', 25)")
+        await db.connection.commit()
+    run(existing_profile())
+
+    assert run(maintenance.import_profiles(str(path))) == {"count": 3, "skipped": 2}
+
+    async def profiles():
+        async with db.connection.execute("SELECT user_id, prenom, age, description FROM profiles ORDER BY user_id") as cursor:
+            return [tuple(row) for row in await cursor.fetchall()]
+    assert run(profiles()) == [
+        ("1", "Alex", 20, None),
+        ("2", "Sam", 22, "Bonjour"),
+        ("3", "Lou", 25, "Sans prénom ni âge"),
+    ]
@@ -0,0 +1,22 @@
+"""Instrumentation des composants : points de dispatch internes de discord.py"""
+
+def test_component_hooks_wrap_once():
+    from cogs import metrics
+
+    metrics.install_component_hooks()
+    wrapped = metrics.BaseView._scheduled_task
+    original = metrics.BaseView._metrics_original__scheduled_task
+    metrics.install_component_hooks()
+
+    assert metrics.BaseView._metrics_original__scheduled_task is original
+    assert metrics.BaseView._scheduled_task is not original
+    assert metrics.BaseView._scheduled_task.__code__ is wrapped.__code__
+
+def test_missing_dispatch_point_is_skipped():
+    from cogs import metrics
+
+    class Dispatcher:
+        pass
+
+    assert metrics._hook(Dispatcher, "_scheduled_task", lambda original: original) is False
+    assert not hasattr(Dispatcher, "_scheduled_task")
@@ -0,0 +1,26 @@
+"""Arrêt de la file d'envoi pendant une remise en cours"""
+import asyncio
+
+def test_stop_releases_message_being_delivered(run, monkeypatch):
+    from cogs import outbound
+
+    delivering = asyncio.Event()
+
+    async def slow_send(client, user_id, user=None, **kwargs):
+        delivering.set()
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(outbound.dm_cache, "send", slow_send)
+
+    async def scenario():
+        queue = outbound.OutboundQueue(workers=1)
+        queue.start(client=None)
+        sent = asyncio.create_task(queue.send(None, 1, outbound.PRIORITY_MATCH, content="x"))
+        await delivering.wait()
+
+        queue.stop()
+        assert await asyncio.wait_for(sent, timeout=1) is None
+        return queue
+
+    queue = run(scenario())
+    assert all(depth == 0 for depth in queue._depth.values())